@@ -0,0 +1,370 @@
+"""
+Асинхронный режим бота (AsyncTeleBot).
+
+Обработчики, уведомления по расписанию и получение погоды работают
+корутинами в одном цикле событий. Построители сообщений из message.py
+используются без изменений: они выполняются в пуле потоков
+(asyncio.to_thread), чтобы чтение графика и запрос погоды
+не блокировали цикл событий.
+
+Запуск: python async_bot.py
+"""
+import asyncio
+import logging
+import os
+from logging.handlers import RotatingFileHandler
+
+from dotenv import load_dotenv
+from telebot.async_telebot import AsyncTeleBot
+
+from constants import (
+    CURRENT_MONTH,
+    DUTY_EMOJI,
+    GAIN_EMOJI,
+    LOG_BACKUP_COUNT,
+    LOG_MAX_BYTES,
+    NEXT_MONTH,
+    NOTIFICATION_CATCH_UP,
+    NOTIFICATION_TIME,
+    RENDER_WARM_UP_TIME,
+    VACATION_EMOJI,
+    WEATHER_NOTIFICATION_TIME,
+    WEATHER_PREFETCH_TIME
+)
+from message import (
+    KEYBOARD,
+    create_duty_message,
+    create_duty_notification_message,
+    create_gain_message,
+    create_gain_notification_message,
+    create_group_start_message,
+    create_month_message,
+    create_rate_limited_message,
+    create_schedule_change_message,
+    create_start_message,
+    create_stats_message,
+    create_unauthorized_message,
+    create_unknown_command_message,
+    create_vacation_message,
+    create_weather_notification_message,
+    warm_render_cache
+)
+from metrics import instrumented, start_metrics_server
+from roster import ROSTER
+from router import RateLimiter, Router, authorization
+from scheduler import AsyncScheduler, daily
+from startup import BootTimer
+from utils import (
+    check_department,
+    get_current_month,
+    get_next_month,
+    warm_start
+)
+from watcher import ScheduleWatcher
+from weather import WEATHER
+
+load_dotenv()
+bot_token = os.getenv('TOKEN')
+bot = AsyncTeleBot(bot_token)
+
+GROUP_ID = os.getenv('GROUP_CHAT_ID')
+# Сколько личных уведомлений отправляем одновременно.
+FANOUT_LIMIT = int(os.getenv('FANOUT_LIMIT', 10))
+
+
+async def deny_unauthorized(message):
+    """Ответ пользователю, которого нет в списке сотрудников."""
+    await bot.send_message(
+        message.chat.id, text=create_unauthorized_message())
+
+
+async def warn_rate_limited(message):
+    """Ответ пользователю, который пишет слишком часто."""
+    await bot.send_message(message.chat.id, create_rate_limited_message())
+
+
+# Те же маршруты и проверки, что и в bot.py. Время и ошибки
+# обработчиков учитывает instrumented.
+router = Router(middlewares=[
+    RateLimiter(on_limited=warn_rate_limited),
+    authorization(check_department, deny_unauthorized),
+])
+
+
+@bot.message_handler(func=lambda message: True)
+async def handle_message(message):
+    """Все текстовые сообщения обрабатываются через маршрутизатор."""
+    await router.dispatch_async(message)
+
+
+@router.route('/start', name='start', auth=False)
+@instrumented('start')
+async def start_command(message):
+    """Вывод сообщения и создание клавиатуры, если пользователь "одобрен"."""
+    # Если сообщение пришло из группы.
+    if message.chat.type in ['group', 'supergroup']:
+        await bot.send_message(message.chat.id, create_group_start_message())
+    # Если сообщение написано лично боту.
+    elif message.chat.type == 'private':
+        user_id = message.chat.id
+        if check_department(user_id):
+            await bot.send_message(
+                user_id,
+                create_start_message(),
+                reply_markup=KEYBOARD
+            )
+        else:
+            await bot.send_message(
+                user_id, text=create_unauthorized_message())
+
+
+async def reply(message, builder, *args):
+    """Собираем ответ в пуле потоков и отправляем его пользователю."""
+    user_id = message.chat.id
+    text = await asyncio.to_thread(builder, user_id, *args)
+    await bot.send_message(user_id, text, reply_markup=KEYBOARD)
+
+
+@router.route('/stats', name='stats', auth=False)
+@instrumented('stats')
+async def stats_command(message):
+    """Статистика бота - только для администраторов."""
+    user_id = message.chat.id
+    if ROSTER.is_admin(user_id):
+        text = await asyncio.to_thread(create_stats_message)
+    else:
+        text = create_unknown_command_message()
+    await bot.send_message(user_id, text)
+
+
+@router.route(GAIN_EMOJI, name='gain')
+@instrumented('gain')
+async def get_gain(message):
+    """Выдаем данные по сменам."""
+    await reply(message, create_gain_message)
+
+
+@router.route(DUTY_EMOJI, name='duty')
+@instrumented('duty')
+async def get_duty(message):
+    """Выдаем данные по дежурству."""
+    await reply(message, create_duty_message)
+
+
+@router.route(VACATION_EMOJI, name='vacation')
+@instrumented('vacation')
+async def get_vacation(message):
+    """Выдаем данные по отпуску."""
+    await reply(message, create_vacation_message)
+
+
+@router.route(CURRENT_MONTH, name='current_month')
+@instrumented('current_month')
+async def get_current_month_info(message):
+    """Выдаем всю информацию по текущему месяцу."""
+    await reply(message, create_month_message, get_current_month())
+
+
+@router.route(NEXT_MONTH, name='next_month')
+@instrumented('next_month')
+async def get_next_month_info(message):
+    """Выдаем всю информацию по следующему месяцу."""
+    await reply(message, create_month_message, get_next_month())
+
+
+@router.fallback()
+@instrumented('unknown')
+async def response_for_message(message):
+    """Обработчик любого текста от пользователя."""
+    await bot.send_message(message.chat.id, create_unknown_command_message())
+
+
+async def send_private_notification(semaphore, user_id, message):
+    """Отправляем личное уведомление."""
+    async with semaphore:
+        try:
+            await bot.send_message(user_id, message)
+            logging.info(
+                f'Пользователю {user_id} отправлено уведомление!')
+        except Exception as e:
+            logging.error(
+                f'Ошибка при отправке уведомления пользователю {user_id}: '
+                f'{e}')
+
+
+async def send_gain_notifications():
+    """
+    Отправка уведомлений о завтрашних сменах и дежурствах.
+
+    Уведомление о смене направляется в общую группу.
+    Уведомления о дежурстве направляются лично пользователям параллельно,
+    не больше FANOUT_LIMIT одновременно.
+    """
+    try:
+        (gain_message,
+         user_gain_list) = await asyncio.to_thread(
+            create_gain_notification_message)
+        (duty_message,
+         user_duty_list) = await asyncio.to_thread(
+            create_duty_notification_message)
+
+        # Если есть пользователи, у кого завтра смена:
+        if user_gain_list:
+            await bot.send_message(GROUP_ID, gain_message)
+            logging.info(
+                f'В группу {GROUP_ID} отправлено уведомление о сменах!')
+
+        # Если есть пользователи, у кого завтра дежурство:
+        if user_duty_list:
+            semaphore = asyncio.Semaphore(FANOUT_LIMIT)
+            await asyncio.gather(*(
+                # Дополнили сообщение о дежурстве: в день/ночь
+                send_private_notification(
+                    semaphore, ROSTER.get_id(user[0]),
+                    duty_message + user[1][2])
+                for user in user_duty_list
+                if ROSTER.get_id(user[0]) is not None
+            ))
+
+    except Exception as e:
+        logging.error(f'Ошибка при отправке уведомлений: {e}')
+
+
+async def notify_schedule_changes(month, year, changes):
+    """
+    Личные уведомления об изменении графика (после замены xlsx):
+    только сотрудникам, чей график изменился, не больше FANOUT_LIMIT
+    одновременно.
+    """
+    semaphore = asyncio.Semaphore(FANOUT_LIMIT)
+    await asyncio.gather(*(
+        send_private_notification(
+            semaphore, ROSTER.get_id(user_name),
+            create_schedule_change_message(month, year, user_changes))
+        for user_name, user_changes in changes.items()
+        if ROSTER.get_id(user_name) is not None
+    ))
+
+
+async def send_weather_notification():
+    """Отправка сообщения о погоде в групповые чаты."""
+    try:
+        # Загружаем прогнозы всех мест параллельно.
+        await asyncio.to_thread(WEATHER.get_all)
+        for chat_id in WEATHER.chats or [GROUP_ID]:
+            weather_message = await asyncio.to_thread(
+                create_weather_notification_message, chat_id)
+            if weather_message:
+                await bot.send_message(chat_id, weather_message)
+                logging.info(f'Уведомление о погоде отправлено в {chat_id}')
+    except Exception as e:
+        logging.error(f'Ошибка при отправке погоды: {e}')
+
+
+async def prefetch_weather():
+    """Загружаем прогноз погоды заранее (в отдельном потоке)."""
+    try:
+        WEATHER.start_prefetch()
+    except Exception as e:
+        logging.error(f'Ошибка при загрузке прогноза погоды: {e}')
+
+
+async def warm_up_replies():
+    """Заранее собираем ответы на кнопки для всех сотрудников."""
+    try:
+        await asyncio.to_thread(warm_render_cache)
+    except Exception as e:
+        logging.error(f'Ошибка при подготовке ответов: {e}')
+
+
+def create_scheduler(state_file=None, clock=None):
+    """Настройка асинхронного планировщика уведомлений."""
+    scheduler = AsyncScheduler(clock=clock, state_file=state_file)
+    scheduler.add_job(daily(
+        'gain_notification',
+        send_gain_notifications,
+        NOTIFICATION_TIME,
+        catch_up=NOTIFICATION_CATCH_UP,
+    ))
+    scheduler.add_job(daily(
+        'weather_prefetch',
+        prefetch_weather,
+        WEATHER_PREFETCH_TIME,
+        catch_up=NOTIFICATION_CATCH_UP,
+    ))
+    scheduler.add_job(daily(
+        'weather_notification',
+        send_weather_notification,
+        WEATHER_NOTIFICATION_TIME,
+        catch_up=NOTIFICATION_CATCH_UP,
+    ))
+    scheduler.add_job(daily(
+        'render_warm_up',
+        warm_up_replies,
+        RENDER_WARM_UP_TIME,
+        catch_up=NOTIFICATION_CATCH_UP,
+    ))
+    return scheduler
+
+
+async def main(bot_dir, boot):
+    """Запуск бота, планировщика и наблюдателя за графиками."""
+    # Графики текущего и следующего месяца - в кэш до приема сообщений.
+    await asyncio.to_thread(warm_start)
+    boot.mark('загрузка графиков')
+    scheduler = create_scheduler(
+        state_file=os.path.join(bot_dir, 'scheduler_state.json'))
+    # Компиляция xlsx остается в отдельном потоке, вне цикла событий;
+    # уведомления об изменениях графика передаются в цикл событий.
+    loop = asyncio.get_running_loop()
+    schedule_watcher = ScheduleWatcher(
+        on_change=lambda month, year, changes: (
+            asyncio.run_coroutine_threadsafe(
+                notify_schedule_changes(month, year, changes), loop)))
+    schedule_watcher.start()
+    metrics_server = start_metrics_server()
+    scheduler_task = asyncio.create_task(scheduler.run_async())
+    boot.mark('запуск задач')
+    logging.info(boot.report())
+    try:
+        await bot.infinity_polling(timeout=60)
+    finally:
+        scheduler.stop()
+        scheduler_task.cancel()
+        schedule_watcher.stop()
+        WEATHER.stop()
+        if metrics_server is not None:
+            metrics_server.stop()
+        await bot.close_session()
+        logging.info('Работа завершена.')
+
+
+if __name__ == "__main__":
+    boot = BootTimer()
+    bot_dir = os.path.dirname(os.path.abspath(__file__))
+    log_path = os.path.join(bot_dir, 'main.log')
+    # Настройки логирования:
+    logging.basicConfig(
+        format=(
+            '%(asctime)s - '
+            '%(levelname)s - '
+            '%(message)s - '
+            '%(name)s - '
+            '%(funcName)s - '
+            '%(lineno)d'
+        ),
+        level=logging.INFO,
+        # Журнал дописывается (а не перезаписывается при запуске)
+        # и делится на файлы по LOG_MAX_BYTES.
+        handlers=[RotatingFileHandler(
+            log_path,
+            maxBytes=LOG_MAX_BYTES,
+            backupCount=LOG_BACKUP_COUNT,
+            encoding='utf-8',
+        )],
+    )
+
+    try:
+        asyncio.run(main(bot_dir, boot))
+    except KeyboardInterrupt:
+        pass  # Игнорируем прерывание
@@ -0,0 +1 @@
+"""Бенчмарки горячих участков бота (запускаются без сети и токена)."""
@@ -0,0 +1,146 @@
+"""
+Сравнение сборки графика с прежним циклом по ячейкам.
+
+- сборка: compile_schedule против прежнего цикла по ячейкам;
+- чтение xlsx: потоковый openpyxl против pandas.read_excel
+  (если pandas установлен).
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_create_schedule [количество_сотрудников ...]
+"""
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+from benchmarks.synthetic import generate_rows, write_xlsx
+
+# utils читает настройки из окружения при импорте.
+os.environ.setdefault('DEPARTMENT_IDS', '{}')
+os.environ.setdefault('BOSS_LIST', '[]')
+
+from constants import DUTY_DAY, DUTY_NIGHT, WEEK_DAYS  # noqa: E402
+from utils import compile_schedule, iter_xlsx_rows  # noqa: E402
+from work_calendar import WORK_CALENDAR  # noqa: E402
+
+
+def legacy_schedule(file, month, year) -> dict:
+    """Прежняя сборка графика: перебор каждой ячейки в Python."""
+    schedule = {row['ФИО']: {'смена': [], 'дежурство': [], 'отпуск': []}
+                for row in file}
+    for line in file:
+        user_name = line.pop('ФИО')
+        for column, value in line.items():
+            if column.isdigit():
+                column_format = datetime(
+                    day=int(column), month=month, year=year,
+                ).strftime('%d.%m.%Y')
+                weekday = WEEK_DAYS[
+                    datetime.strptime(column_format, '%d.%m.%Y').weekday()]
+                if value == '+':
+                    # Выходные и праздники - по производственному
+                    # календарю, как и в compile_schedule.
+                    if WORK_CALENDAR.is_day_off(year, month, int(column)):
+                        schedule[user_name]['смена'].append(
+                            (int(column), weekday))
+                elif value in (DUTY_NIGHT+DUTY_DAY):
+                    if value in DUTY_NIGHT:
+                        duty_time = '🌑 в ночь'
+                    else:
+                        duty_time = '☀️ в день'
+                    schedule[user_name]['дежурство'].append(
+                        (int(column), weekday, duty_time))
+                elif 'отпуск' in str(value):
+                    schedule[user_name]['отпуск'].append((value))
+    return schedule
+
+
+def measure(func, repeat=3) -> float:
+    """Лучшее время выполнения функции (в секундах)."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def peak_memory(func) -> int:
+    """Пиковый объем памяти, выделенной при выполнении функции (в байтах)."""
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def pandas_records(filepath):
+    """Прежнее чтение xlsx через pandas (None, если pandas не установлен)."""
+    try:
+        import pandas as pd
+    except ImportError:
+        return None
+    return pd.read_excel(filepath).to_dict('records')
+
+
+def main(sizes):
+    now = datetime.now()
+    for users in sizes:
+        rows = generate_rows(users, now.month, now.year)
+        expected = legacy_schedule(
+            [dict(row) for row in rows], now.month, now.year)
+        result = compile_schedule(rows, now.month, now.year)
+        if result != expected:
+            raise AssertionError(
+                f'Результаты не совпадают для {users} сотрудников')
+
+        legacy_time = measure(lambda: legacy_schedule(
+            [dict(row) for row in rows], now.month, now.year))
+        compile_time = measure(
+            lambda: compile_schedule(rows, now.month, now.year))
+        print(
+            f'{users:>6} сотрудников, сборка: '
+            f'цикл {legacy_time * 1000:9.2f} мс, '
+            f'новая {compile_time * 1000:9.2f} мс, '
+            f'ускорение x{legacy_time / compile_time:.1f}'
+        )
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            filepath = os.path.join(tmpdir, 'schedule.xlsx')
+            write_xlsx(rows, filepath)
+            if compile_schedule(
+                iter_xlsx_rows(filepath), now.month, now.year
+            ) != expected:
+                raise AssertionError(
+                    f'Чтение xlsx не совпадает для {users} сотрудников')
+
+            def stream():
+                return compile_schedule(
+                    iter_xlsx_rows(filepath), now.month, now.year)
+
+            stream_time = measure(stream, repeat=1)
+            stream_memory = peak_memory(stream)
+            line = (
+                f'{users:>6} сотрудников, xlsx: '
+                f'openpyxl {stream_time * 1000:9.2f} мс '
+                f'({stream_memory / 2 ** 20:.1f} МБ)'
+            )
+            if pandas_records(filepath) is not None:
+                def legacy():
+                    return legacy_schedule(
+                        pandas_records(filepath), now.month, now.year)
+
+                legacy_time = measure(legacy, repeat=1)
+                legacy_memory = peak_memory(legacy)
+                line += (
+                    f', pandas {legacy_time * 1000:9.2f} мс '
+                    f'({legacy_memory / 2 ** 20:.1f} МБ)'
+                )
+            print(line)
+
+
+if __name__ == '__main__':
+    main([int(size) for size in sys.argv[1:]] or [20, 200, 2000, 10000])
@@ -0,0 +1,47 @@
+"""
+Проверка очереди отправки на локальной замене Bot API.
+
+Рассылаем личные уведомления и сообщения в группу и смотрим,
+сколько запросов API отклонил с ответом 429 и все ли сообщения
+доставлены.
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_sender [количество_чатов]
+"""
+import sys
+import time
+
+from benchmarks.fake_telegram import RateLimitedApi
+from sender import SENT, SendQueue
+
+
+def main(chats):
+    api = RateLimitedApi(latency=0.01)
+    queue = SendQueue(api.send_message, workers=8)
+
+    started = time.perf_counter()
+    deliveries = [
+        queue.send(chat_id, f'Уведомление {chat_id}')
+        for chat_id in range(1, chats + 1)
+    ]
+    # Несколько сообщений подряд в один чат и в группу.
+    deliveries += [queue.send(1, f'Повтор {number}') for number in range(3)]
+    deliveries += [queue.send(-100, f'Группа {number}') for number in range(3)]
+    for delivery in deliveries:
+        delivery.wait()
+    elapsed = time.perf_counter() - started
+    queue.stop()
+
+    delivered = sum(delivery.status == SENT for delivery in deliveries)
+    print(
+        f'Сообщений: {len(deliveries)}, доставлено: {delivered}, '
+        f'ответов 429: {api.rejected}, повторов: {queue.stats["retried"]}, '
+        f'время: {elapsed:.2f} c'
+    )
+    chat_texts = [text for _, chat_id, text in api.sent if chat_id == 1]
+    if chat_texts != ['Уведомление 1'] + [f'Повтор {n}' for n in range(3)]:
+        raise AssertionError('Нарушен порядок сообщений в чате.')
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100)
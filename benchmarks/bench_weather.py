@@ -0,0 +1,98 @@
+"""
+Сравнение разбора страницы погоды с прежним парсером BeautifulSoup.
+
+Для каждой сохраненной страницы из benchmarks/fixtures сравниваем
+процессорное время и пиковую память (tracemalloc). Новый разбор
+удаляет прочитанные элементы lxml, поэтому дерево страницы целиком
+не строится ни в Python, ни внутри lxml.
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_weather [страница.html ...]
+"""
+import glob
+import os
+import sys
+import time
+import tracemalloc
+
+from weather import parse_forecast
+
+try:
+    from bs4 import BeautifulSoup
+except ImportError:  # Прежний парсер для сравнения не обязателен.
+    BeautifulSoup = None
+
+FIXTURES = os.path.join(os.path.dirname(__file__), 'fixtures')
+REPEAT = 20
+
+
+def legacy_parse(html):
+    """Прежний разбор страницы целиком через BeautifulSoup."""
+    soup = BeautifulSoup(html, 'lxml')
+    weather_elements = soup.find_all('div', class_='row-item')
+    weather = []
+    for elem in weather_elements:
+        condition = elem.get('data-tooltip')
+        if condition:
+            weather.append(condition)
+    weather_list = weather[0:8]
+
+    temperature_widget = soup.find(
+        'div',
+        'widget-row widget-row-chart widget-row-chart-temperature-air'
+        ' row-with-caption')
+    if temperature_widget is None:
+        return None
+    temperature_widget_values = temperature_widget.find('div', 'values')
+    temperatures_list = []
+    for widget_value in temperature_widget_values:
+        temperature_value = widget_value.find('temperature-value')
+        if temperature_value:
+            temperature = temperature_value.get('value')
+            temperatures_list.append(temperature)
+    if weather_list and temperatures_list:
+        return weather_list[2:], temperatures_list[2:]
+    return None
+
+
+def cpu_time(func, repeat=REPEAT) -> float:
+    """Среднее процессорное время выполнения функции (в секундах)."""
+    start = time.process_time()
+    for _ in range(repeat):
+        func()
+    return (time.process_time() - start) / repeat
+
+
+def peak_memory(func) -> int:
+    """Пиковый объем памяти, выделенной при выполнении функции (в байтах)."""
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def main(filepaths):
+    for filepath in filepaths:
+        with open(filepath, 'r', encoding='utf-8') as file:
+            html = file.read()
+        name = os.path.basename(filepath)
+        result = parse_forecast(html)
+        line = (
+            f'{name} ({len(html) / 1024:.0f} КБ): '
+            f'lxml {cpu_time(lambda: parse_forecast(html)) * 1000:7.2f} мс '
+            f'({peak_memory(lambda: parse_forecast(html)) / 2 ** 20:.2f} МБ)'
+        )
+        if BeautifulSoup is not None:
+            if legacy_parse(html) != result:
+                raise AssertionError(f'Результаты не совпадают: {name}')
+            line += (
+                f', bs4 {cpu_time(lambda: legacy_parse(html)) * 1000:7.2f} мс '
+                f'({peak_memory(lambda: legacy_parse(html)) / 2 ** 20:.2f} МБ)'
+            )
+        print(line)
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:] or sorted(glob.glob(os.path.join(FIXTURES, '*.html'))))
@@ -0,0 +1,121 @@
+"""
+Проверка компактного формата графика (compact_schedule.py).
+
+Синтетический график компилируется в словарь (compile_schedule)
+и в компактный формат (compile_compact). Компактный график,
+записанный в файл и прочитанный через mmap и из буфера, должен
+совпасть со словарем - в том числе у сотрудника с несколькими
+строками графика, чьи коды по дням сливает codes_of.
+
+Запуск из корня проекта:
+    python -m benchmarks.check_compact
+"""
+import json
+import os
+import tempfile
+
+from benchmarks.synthetic import generate_rows, user_name
+
+# utils читает настройки из окружения при импорте.
+os.environ.setdefault('DEPARTMENT_IDS', '{}')
+os.environ.setdefault('BOSS_LIST', '[]')
+
+from compact_schedule import (  # noqa: E402
+    CODE_GAIN,
+    CODE_NONE,
+    CODE_VACATION,
+    DUTY_TIME_BY_CODE,
+    CompactSchedule
+)
+from utils import compile_compact, compile_schedule  # noqa: E402
+
+USERS = 40
+YEAR, MONTH = 2025, 12
+# Код дежурства по времени из словаря графика.
+DUTY_CODE_BY_TIME = {time: code for code, time in DUTY_TIME_BY_CODE.items()}
+
+
+def check(condition, message):
+    if not condition:
+        raise AssertionError(message)
+    print(f'ok: {message}')
+
+
+def as_json(schedule) -> dict:
+    """Словарь графика в том виде, в каком он хранится в JSON."""
+    return json.loads(json.dumps(dict(schedule), ensure_ascii=False))
+
+
+def expected_codes(user_schedule, rows) -> bytes:
+    """
+    Коды сотрудника по дням: по событиям словаря графика и дням
+    отпуска в его строках. В день с несколькими событиями - старший код.
+    """
+    days = len(rows[0]) - 1
+    codes = [CODE_NONE] * days
+    for gain in user_schedule['смена']:
+        codes[gain[0] - 1] = max(codes[gain[0] - 1], CODE_GAIN)
+    for duty in user_schedule['дежурство']:
+        codes[duty[0] - 1] = max(
+            codes[duty[0] - 1], DUTY_CODE_BY_TIME[duty[2]])
+    for row in rows:
+        for day in range(1, days + 1):
+            if 'отпуск' in str(row[str(day)]):
+                codes[day - 1] = CODE_VACATION
+    return bytes(codes)
+
+
+def main():
+    rows = generate_rows(USERS, MONTH, YEAR)
+    # Вторая строка графика у первого сотрудника - в конце таблицы.
+    extra = generate_rows(1, MONTH, YEAR, seed=1)[0]
+    extra['ФИО'] = user_name(0)
+    rows.append(extra)
+
+    schedule = compile_schedule(rows, MONTH, YEAR)
+    compact = compile_compact(rows, MONTH, YEAR)
+    expected = as_json(schedule)
+    check(len(compact.names) == USERS + 1 and len(compact) == USERS,
+          'строки одного сотрудника - одна запись графика')
+    check(list(compact) == list(schedule), 'порядок сотрудников совпадает')
+    check(as_json(compact) == expected,
+          'компактный график совпадает со словарем')
+    check(compact.codes_of(user_name(0)) != bytes(compact.user_codes(0)),
+          'у сотрудника с двумя строками коды отличаются от первой строки')
+
+    with tempfile.TemporaryDirectory() as workdir:
+        filepath = os.path.join(workdir, f'{MONTH}_{YEAR}.bin')
+        with open(filepath, 'wb') as file:
+            file.write(compact.to_bytes())
+        loaded = {
+            'mmap': CompactSchedule.load(filepath),
+            'файл': CompactSchedule.load(filepath, use_mmap=False),
+            'буфер': CompactSchedule.from_buffer(compact.to_bytes()),
+        }
+        for source, restored in loaded.items():
+            check((restored.year, restored.month, restored.n_days)
+                  == (YEAR, MONTH, 31), f'{source}: заголовок прочитан')
+            check(as_json(restored) == expected,
+                  f'{source}: график совпадает со словарем')
+            check(restored.codes_of(user_name(0)) == expected_codes(
+                schedule[user_name(0)], [rows[0], extra]),
+                f'{source}: коды двух строк сотрудника слиты')
+            check(restored.vacations_of(user_name(0))
+                  == schedule[user_name(0)]['отпуск'],
+                  f'{source}: отпуска двух строк сотрудника')
+            check(all(
+                restored.codes_of(row['ФИО']) == expected_codes(
+                    schedule[row['ФИО']], [row])
+                for row in rows[1:USERS]
+            ), f'{source}: коды остальных сотрудников')
+
+    try:
+        CompactSchedule.from_buffer(b'JSON' + compact.to_bytes()[4:])
+    except ValueError:
+        check(True, 'чужой формат файла отклонен')
+    else:
+        check(False, 'чужой формат файла отклонен')
+
+
+if __name__ == '__main__':
+    main()
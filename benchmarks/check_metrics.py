@@ -0,0 +1,98 @@
+"""
+Проверка метрик (metrics.py) в текстовом формате Prometheus.
+
+В отдельном наборе метрик увеличивается счетчик и записываются
+значения гистограммы. Текст Registry.render должен совпасть
+с ожидаемым построчно, а HTTP-сервер метрик - отдать тот же текст
+по GET /metrics (и 404 на другой адрес).
+
+Запуск из корня проекта:
+    python -m benchmarks.check_metrics
+"""
+import urllib.error
+import urllib.request
+
+from metrics import CONTENT_TYPE, METRICS_PATH, Metric, MetricsServer, Registry
+
+TIMEOUT = 5
+EXPECTED = '''\
+# HELP check_requests_total Запросы по результату
+# TYPE check_requests_total counter
+check_requests_total{result="error"} 1
+check_requests_total{result="ok"} 3
+# HELP check_seconds Время запроса
+# TYPE check_seconds histogram
+check_seconds_bucket{handler="start",le="0.1"} 1
+check_seconds_bucket{handler="start",le="1"} 3
+check_seconds_bucket{handler="start",le="+Inf"} 4
+check_seconds_sum{handler="start"} 7.05
+check_seconds_count{handler="start"} 4
+'''
+
+
+def check(condition, message):
+    if not condition:
+        raise AssertionError(message)
+    print(f'ok: {message}')
+
+
+def fetch(url) -> tuple:
+    """GET: (HTTP-статус, тип содержимого, текст ответа)."""
+    try:
+        with urllib.request.urlopen(url, timeout=TIMEOUT) as response:
+            return (response.status, response.headers['Content-Type'],
+                    response.read().decode('utf-8'))
+    except urllib.error.HTTPError as e:
+        return e.code, None, ''
+
+
+def main():
+    try:
+        Metric('check_untyped', 'Метрика без samples')
+    except TypeError:
+        check(True, 'метрику без samples не создать')
+    else:
+        check(False, 'метрику без samples не создать')
+
+    registry = Registry()
+    requests = registry.counter(
+        'check_requests_total', 'Запросы по результату', ('result',))
+    seconds = registry.histogram(
+        'check_seconds', 'Время запроса', ('handler',), buckets=(1, 0.1))
+    requests.inc(result='ok')
+    requests.inc(2, result='ok')
+    requests.inc(result='error')
+    for value in (0.05, 0.5, 1, 5.5):
+        seconds.observe(value, handler='start')
+
+    check(requests.value(result='ok') == 3, 'счетчик увеличен')
+    check(registry.render() == EXPECTED,
+          'текст Prometheus: счетчик и накопленные корзины гистограммы')
+    try:
+        registry.counter('check_requests_total', 'Повтор')
+    except ValueError:
+        check(True, 'повторная регистрация метрики отклонена')
+    else:
+        check(False, 'повторная регистрация метрики отклонена')
+
+    server = MetricsServer(host='127.0.0.1', port=0, registry=registry)
+    server.start()
+    host, port = server.address
+    try:
+        status, content_type, text = fetch(
+            f'http://{host}:{port}{METRICS_PATH}')
+        check(status == 200 and content_type == CONTENT_TYPE,
+              'сервер отдает метрики')
+        check(text == EXPECTED, 'сервер отдает тот же текст, что render')
+        check(fetch(f'http://{host}:{port}/other')[0] == 404,
+              'чужой адрес - 404')
+    finally:
+        server.stop()
+
+    registry.clear()
+    check(registry.render().count('\n') == 4,
+          'после очистки остаются только описания метрик')
+
+
+if __name__ == '__main__':
+    main()
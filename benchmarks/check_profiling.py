@@ -0,0 +1,104 @@
+"""
+Проверка профилирования (profiling.py) во временной папке.
+
+Проверяется, что профиль пишется для вызовов из выборки и для вызовов
+дольше порога, что в папке остаются только последние keep профилей
+(и сводка по ним), а выключенный профилировщик и корутины возвращаются
+декоратором без обертки.
+
+Запуск из корня проекта:
+    python -m benchmarks.check_profiling
+"""
+import glob
+import os
+import random
+import tempfile
+import time
+
+from profiling import SUMMARY_FILE, Profiler, profiled
+
+SLOW_MS = 30
+CALLS = 20
+SEED = 1
+
+
+def check(condition, message):
+    if not condition:
+        raise AssertionError(message)
+    print(f'ok: {message}')
+
+
+def profiles(directory) -> list:
+    return glob.glob(os.path.join(directory, '*.prof'))
+
+
+def work(seconds=0):
+    if seconds:
+        time.sleep(seconds)
+    return sum(range(1000))
+
+
+async def async_work():
+    return work()
+
+
+def check_passthrough(directory):
+    disabled = Profiler(directory, sample_rate=0, slow_ms=0)
+    check(profiled('work', disabled)(work) is work,
+          'выключенный профилировщик не оборачивает функцию')
+    enabled = Profiler(directory, sample_rate=1)
+    check(profiled('async_work', enabled)(async_work) is async_work,
+          'корутина не оборачивается')
+    wrapped = profiled('work', enabled)(work)
+    check(wrapped is not work and wrapped.__name__ == 'work'
+          and wrapped() == work(), 'функция обернута с тем же результатом')
+
+
+def check_sampling(directory):
+    profiler = Profiler(directory, sample_rate=0.5, keep=CALLS)
+    rnd = random.Random(SEED)
+    expected = sum(rnd.random() < 0.5 for _ in range(CALLS))
+    random.seed(SEED)
+    for _ in range(CALLS):
+        profiler.call('sampled', work)
+    check(len(profiles(directory)) == expected,
+          f'в выборку попали {expected} вызовов из {CALLS}')
+
+
+def check_slow(directory):
+    profiler = Profiler(directory, slow_ms=SLOW_MS)
+    profiler.call('fast', work)
+    check(profiles(directory) == [], 'быстрый вызов не записан')
+    profiler.call('slow', work, SLOW_MS * 2 / 1000)
+    names = [os.path.basename(path) for path in profiles(directory)]
+    check(len(names) == 1 and names[0].startswith('slow-'),
+          'вызов дольше порога записан')
+
+
+def check_rotation(directory):
+    keep = 3
+    profiler = Profiler(directory, sample_rate=1, keep=keep)
+    for number in range(keep + 2):
+        profiler.call(f'call{number}', work)
+    names = sorted(
+        os.path.basename(path).split('-')[0]
+        for path in profiles(directory))
+    check(names == ['call2', 'call3', 'call4'],
+          f'хранятся только последние {keep} профиля')
+    with open(os.path.join(directory, SUMMARY_FILE), 'r',
+              encoding='utf-8') as file:
+        summary = file.read()
+    check(summary.startswith(f'Профилей: {keep} ')
+          and 'call4:' in summary and 'call0:' not in summary,
+          'сводка - по последним профилям')
+
+
+def main():
+    for step in (check_passthrough, check_sampling, check_slow,
+                 check_rotation):
+        with tempfile.TemporaryDirectory() as directory:
+            step(directory)
+
+
+if __name__ == '__main__':
+    main()
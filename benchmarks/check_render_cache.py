@@ -0,0 +1,76 @@
+"""
+Проверка кэша ответов на кнопки после подготовки (warm_render_cache).
+
+Справочник больше RENDER_CACHE_SIZE / RENDER_VIEWS сотрудников:
+после подготовки кэш должен вмещать ответы всех сотрудников, и все
+нажатия кнопок - попадания в кэш.
+
+Запуск из корня проекта:
+    python -m benchmarks.check_render_cache [--users N]
+"""
+import argparse
+import os
+import tempfile
+
+from benchmarks.run import prepare_environment
+from benchmarks.synthetic import generate_rows, write_xlsx
+
+USERS = 2500
+
+
+def check(condition, message):
+    if not condition:
+        raise AssertionError(message)
+    print(f'ok: {message}')
+
+
+def check_warm_up(users):
+    # Модули бота импортируются после подготовки окружения.
+    import message
+    import utils
+    from roster import ROSTER
+
+    for month in (utils.get_current_month(), utils.get_next_month()):
+        number = utils.MONTH_NUMBERS[month]
+        year = utils.get_month_year(month)
+        write_xlsx(generate_rows(users, number, year, seed=number),
+                   f'schedule/{month}_{year}.xlsx')
+
+    message.clear_render_cache()
+    count = message.warm_render_cache()
+    check(count == users * message.RENDER_VIEWS,
+          f'подготовлено {count} ответов для {users} сотрудников')
+    check(count > message.RENDER_CACHE_SIZE,
+          'ответов больше наименьшего размера кэша')
+
+    before = message.get_render_cache_stats()
+    for user_id in ROSTER.users:
+        message.create_gain_message(user_id)
+        message.create_duty_message(user_id)
+        message.create_vacation_message(user_id)
+        message.create_month_message(user_id, utils.get_current_month())
+        message.create_month_message(user_id, utils.get_next_month())
+    after = message.get_render_cache_stats()
+    check(after['misses'] == before['misses'],
+          f'после подготовки все ответы отданы из кэша '
+          f'(промахов: {after["misses"] - before["misses"]})')
+    check(after['hits'] - before['hits'] == count,
+          f'попаданий в кэш: {after["hits"] - before["hits"]}')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--users', type=int, default=USERS)
+    args = parser.parse_args(argv)
+
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as workdir:
+        prepare_environment(workdir, args.users)
+        try:
+            check_warm_up(args.users)
+        finally:
+            os.chdir(cwd)
+
+
+if __name__ == '__main__':
+    main()
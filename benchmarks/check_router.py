@@ -0,0 +1,109 @@
+"""
+Проверка маршрутизации сообщений (router.py) без Telegram.
+
+Одни и те же маршруты проверяются с обычными обработчиками (dispatch)
+и с корутинами (dispatch_async): команда '/cmd@bot аргументы' находит
+свой маршрут, незнакомый текст уходит в обработчик по умолчанию,
+неодобренный пользователь получает отказ, а о превышении частоты
+запросов пользователь узнает один раз.
+
+Запуск из корня проекта:
+    python -m benchmarks.check_router
+"""
+import asyncio
+from types import SimpleNamespace
+
+from router import RateLimiter, Router, authorization, error_capture
+
+ALLOWED = 1
+STRANGER = 2
+BURST = 3
+
+
+def check(condition, message):
+    if not condition:
+        raise AssertionError(message)
+    print(f'ok: {message}')
+
+
+def make_message(text, user_id=ALLOWED):
+    user = SimpleNamespace(id=user_id)
+    return SimpleNamespace(text=text, chat=SimpleNamespace(id=user_id),
+                           from_user=user)
+
+
+def build_router(is_async) -> tuple:
+    """Маршрутизатор с обработчиками-корутинами или обычными функциями."""
+    now = [0.0]
+    calls = []
+
+    def reply(name):
+        if is_async:
+            async def handler(message):
+                calls.append((name, message.chat.id))
+                return name
+        else:
+            def handler(message):
+                calls.append((name, message.chat.id))
+                return name
+        return handler
+
+    limiter = RateLimiter(on_limited=reply('limited'), rate=1, burst=BURST,
+                          clock=lambda: now[0])
+    router = Router([
+        error_capture,
+        limiter,
+        authorization(lambda user_id: user_id == ALLOWED, reply('denied')),
+    ])
+    router.add(['/start'], 'start', reply('start'), auth=False)
+    router.add(['/cmd', 'Кнопка'], 'cmd', reply('cmd'))
+    router.fallback()(reply('unknown'))
+    return router, calls, now
+
+
+def check_paths(kind, dispatch, is_async):
+    router, calls, now = build_router(is_async)
+
+    check(router.resolve(make_message('/cmd@notification_bot 1 2')).name
+          == 'cmd', f'{kind}: /cmd@bot с аргументами - маршрут cmd')
+    check(dispatch(router, make_message('/cmd@notification_bot 1 2'))
+          == 'cmd', f'{kind}: команда обработана')
+    check(dispatch(router, make_message('Кнопка')) == 'cmd',
+          f'{kind}: текст кнопки обработан')
+    check(dispatch(router, make_message('что-то')) == 'unknown',
+          f'{kind}: незнакомый текст - обработчик по умолчанию')
+
+    now[0] += BURST
+    check(dispatch(router, make_message('/cmd', STRANGER)) == 'denied',
+          f'{kind}: неодобренному пользователю - отказ')
+    check(dispatch(router, make_message('/start', STRANGER)) == 'start',
+          f'{kind}: /start доступен всем')
+
+    now[0] += BURST
+    calls.clear()
+    results = [dispatch(router, make_message('/cmd'))
+               for _ in range(BURST + 3)]
+    check(results == ['cmd'] * BURST + ['limited', None, None],
+          f'{kind}: сверх {BURST} запросов подряд - отказ')
+    check([name for name, _ in calls].count('limited') == 1,
+          f'{kind}: о превышении частоты предупреждаем один раз')
+    now[0] += 1
+    check(dispatch(router, make_message('/cmd')) == 'cmd',
+          f'{kind}: через секунду запрос снова обработан')
+
+
+def dispatch_sync(router, message):
+    return router.dispatch(message)
+
+
+def dispatch_async(router, message):
+    return asyncio.run(router.dispatch_async(message))
+
+
+def main():
+    check_paths('sync', dispatch_sync, is_async=False)
+    check_paths('async', dispatch_async, is_async=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+"""
+Проверка сравнения версий графика (schedule_diff.py).
+
+Во второй версии синтетического графика у одного сотрудника изменено
+дежурство, у другого - текст отпуска, один сотрудник добавлен и один
+удален. В результате сравнения должны быть только эти четыре
+сотрудника - и для словарей графика, и для компактных графиков.
+
+Запуск из корня проекта:
+    python -m benchmarks.check_schedule_diff
+"""
+import copy
+import os
+
+from benchmarks.synthetic import generate_rows, user_name
+
+# utils читает настройки из окружения при импорте.
+os.environ.setdefault('DEPARTMENT_IDS', '{}')
+os.environ.setdefault('BOSS_LIST', '[]')
+
+from compact_schedule import (  # noqa: E402
+    CODE_DUTY_DAY,
+    CODE_DUTY_NIGHT,
+    CODE_NONE
+)
+from schedule_diff import diff_schedules  # noqa: E402
+from utils import compile_compact, compile_schedule  # noqa: E402
+
+USERS = 30
+YEAR, MONTH = 2026, 3
+DUTY_USER = user_name(3)
+VACATION_USER = user_name(5)
+REMOVED_USER = user_name(7)
+ADDED_USER = user_name(USERS)
+
+
+def check(condition, message):
+    if not condition:
+        raise AssertionError(message)
+    print(f'ok: {message}')
+
+
+def make_versions() -> tuple:
+    """Строки графика двух версий."""
+    old = generate_rows(USERS, MONTH, YEAR)
+    old[3]['10'] = 'Нн'
+    old[5]['20'] = 'отпуск с 16 по 29'
+    new = copy.deepcopy(old)
+    new[3]['10'] = 'Нд'
+    new[5]['20'] = 'отпуск с 16 по 31'
+    del new[7]
+    added = generate_rows(1, MONTH, YEAR, seed=1)[0]
+    added['ФИО'] = ADDED_USER
+    new.append(added)
+    return old, new
+
+
+def check_changes(old, new, kind):
+    changes = diff_schedules(old, new, YEAR, MONTH)
+    check(set(changes) == {
+        DUTY_USER, VACATION_USER, REMOVED_USER, ADDED_USER},
+        f'{kind}: в изменениях только затронутые сотрудники')
+    check(changes[DUTY_USER] == {
+        'days': [(10, CODE_DUTY_NIGHT, CODE_DUTY_DAY)], 'vacations': None},
+        f'{kind}: изменено время дежурства')
+    old_vacations, new_vacations = changes[VACATION_USER]['vacations']
+    check(changes[VACATION_USER]['days'] == []
+          and 'отпуск с 16 по 29' in old_vacations
+          and 'отпуск с 16 по 31' in new_vacations,
+          f'{kind}: изменен текст отпуска')
+    removed = changes[REMOVED_USER]['days']
+    check(removed and all(code == CODE_NONE for _, _, code in removed),
+          f'{kind}: события удаленного сотрудника сняты')
+    added = changes[ADDED_USER]['days']
+    check(added and all(code == CODE_NONE for _, code, _ in added),
+          f'{kind}: события добавленного сотрудника появились')
+    check(diff_schedules(new, copy.deepcopy(new), YEAR, MONTH) == {},
+          f'{kind}: одинаковые версии - изменений нет')
+
+
+def main():
+    old_rows, new_rows = make_versions()
+    check_changes(compile_schedule(old_rows, MONTH, YEAR),
+                  compile_schedule(new_rows, MONTH, YEAR), 'словари')
+    old = compile_compact(old_rows, MONTH, YEAR)
+    new = compile_compact(new_rows, MONTH, YEAR)
+    check_changes(old, new, 'компактные графики')
+    check(diff_schedules(compile_schedule(old_rows, MONTH, YEAR), new,
+                         YEAR, MONTH)
+          == diff_schedules(old, new, YEAR, MONTH),
+          'словарь и компактный график сравниваются так же')
+
+
+if __name__ == '__main__':
+    main()
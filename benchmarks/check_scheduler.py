@@ -0,0 +1,109 @@
+"""
+Проверка планировщика на имитации часов (SimulatedClock).
+
+Месяц расписания прогоняется за доли секунды: ежедневная и
+еженедельная задачи должны выполниться нужное число раз и точно
+по расписанию, а после перезапуска пропущенный запуск выполняется,
+только если он не старше catch_up.
+
+Запуск из корня проекта:
+    python -m benchmarks.check_scheduler
+"""
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+# utils читает настройки из окружения при импорте.
+os.environ.setdefault('DEPARTMENT_IDS', '{}')
+os.environ.setdefault('BOSS_LIST', '[]')
+
+from scheduler import Scheduler, SimulatedClock, daily, weekly  # noqa: E402
+
+# Март 2026: 31 день, понедельники - 2, 9, 16, 23 и 30 число.
+MONTH_START = datetime(2026, 3, 1)
+MONTH_END = datetime(2026, 3, 31, 23, 59)
+MONDAYS = 5
+DAILY_AT = datetime.strptime('22:00', '%H:%M').time()
+WEEKLY_AT = datetime.strptime('09:00', '%H:%M').time()
+CATCH_UP = timedelta(hours=1)
+
+
+def check(condition, message):
+    if not condition:
+        raise AssertionError(message)
+    print(f'ok: {message}')
+
+
+def run_until(start, until, state_file=None) -> dict:
+    """
+    Прогоняем планировщик от start до until на имитации часов.
+    Возвращаем {задача: [время запусков]}.
+    """
+    clock = SimulatedClock(start)
+    scheduler = Scheduler(clock=clock, state_file=state_file)
+    runs = {'daily': [], 'weekly': []}
+
+    def stop_at_end():
+        if clock.now() >= until:
+            scheduler.stop()
+
+    scheduler.add_job(daily(
+        'daily', lambda: runs['daily'].append(clock.now()), DAILY_AT,
+        catch_up=CATCH_UP))
+    scheduler.add_job(weekly(
+        'weekly', lambda: runs['weekly'].append(clock.now()), [0],
+        WEEKLY_AT))
+    # Останавливает прогон в день until.
+    scheduler.add_job(daily('stop', stop_at_end, until.time()))
+    scheduler.run()
+    return runs
+
+
+def check_month():
+    started = time.perf_counter()
+    runs = run_until(MONTH_START, MONTH_END)
+    elapsed = time.perf_counter() - started
+    check(len(runs['daily']) == 31, 'ежедневная задача: 31 запуск')
+    check(len(runs['weekly']) == MONDAYS,
+          f'еженедельная задача: {MONDAYS} запусков')
+    check(all(moment.time() == DAILY_AT for moment in runs['daily']),
+          'ежедневная задача выполнена точно по расписанию')
+    check(all(moment.weekday() == 0 and moment.time() == WEEKLY_AT
+              for moment in runs['weekly']),
+          'еженедельная задача - по понедельникам')
+    check(elapsed < 1, f'месяц прогнан за {elapsed * 1000:.0f} мс')
+
+
+def check_catch_up():
+    with tempfile.TemporaryDirectory() as workdir:
+        state_file = os.path.join(workdir, 'scheduler_state.json')
+        # Бот работал до 10 марта и был выключен.
+        run_until(MONTH_START, datetime(2026, 3, 10, 23, 59), state_file)
+
+        # Перезапуск через 30 минут после пропущенного запуска 11 марта.
+        restart = datetime(2026, 3, 11, 22, 30)
+        runs = run_until(restart, datetime(2026, 3, 11, 23, 59), state_file)
+        check(runs['daily'] == [restart],
+              'пропущенный запуск выполнен сразу после перезапуска')
+
+        # Повторный перезапуск в тот же вечер: запуск уже выполнен.
+        restart = datetime(2026, 3, 11, 22, 45)
+        runs = run_until(restart, datetime(2026, 3, 11, 23, 59), state_file)
+        check(runs['daily'] == [],
+              'выполненный запуск не повторяется после перезапуска')
+
+        # Перезапуск 12 марта позже catch_up: запуск пропускается.
+        restart = datetime(2026, 3, 12, 23, 30)
+        runs = run_until(restart, datetime(2026, 3, 13, 23, 59), state_file)
+        check(runs['daily'] == [datetime(2026, 3, 13, 22, 0)],
+              'запуск старше catch_up пропущен, следующий - по расписанию')
+
+
+def main():
+    check_month()
+    check_catch_up()
+
+
+if __name__ == '__main__':
+    main()
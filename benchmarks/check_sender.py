@@ -0,0 +1,79 @@
+"""
+Проверка очереди отправки (sender.py) на ответах 429 и ошибках сети.
+
+Функция отправки отвечает ошибкой на первое сообщение в чат 1.
+После ответа 429 очередь ждет retry_after секунд для всех чатов,
+после ошибки сети - повторяет только сообщение своего чата. Сообщения
+одного чата уходят по порядку.
+
+Запуск из корня проекта:
+    python -m benchmarks.check_sender
+"""
+import threading
+import time
+
+from benchmarks.fake_telegram import TooManyRequests
+from sender import SENT, SendQueue
+
+RETRY_AFTER = 1
+TIMEOUT = 10
+
+
+def check(condition, message):
+    if not condition:
+        raise AssertionError(message)
+    print(f'ok: {message}')
+
+
+class FailingOnce:
+    """Функция отправки: первое сообщение в чат chat_id - ошибка error."""
+
+    def __init__(self, error, chat_id):
+        self.error = error
+        self.chat_id = chat_id
+        self.sent = []  # (время, чат, текст)
+        self._lock = threading.Lock()
+
+    def __call__(self, chat_id, text):
+        with self._lock:
+            if chat_id == self.chat_id and self.error is not None:
+                error, self.error = self.error, None
+                raise error
+            self.sent.append((time.monotonic(), chat_id, text))
+
+
+def run(error, chats=2) -> tuple:
+    """
+    Отправляем по два сообщения в чаты 1..chats (первым - в чат 1).
+    Возвращаем (время начала, отправленные сообщения, доставки).
+    """
+    api = FailingOnce(error, chat_id=1)
+    queue = SendQueue(api, workers=1, private_rate=100)
+    started = time.monotonic()
+    deliveries = [
+        queue.send(chat_id, f'{chat_id}:{number}')
+        for chat_id in range(1, chats + 1) for number in range(2)
+    ]
+    queue.stop(timeout=TIMEOUT)
+    return started, api.sent, deliveries
+
+
+def main():
+    started, sent, deliveries = run(TooManyRequests(RETRY_AFTER))
+    check(all(delivery.status == SENT for delivery in deliveries),
+          '429: все сообщения отправлены')
+    check(all(moment - started >= RETRY_AFTER for moment, _, _ in sent),
+          '429: другие чаты ждут retry_after')
+    check([text for _, chat_id, text in sent if chat_id == 1]
+          == ['1:0', '1:1'], '429: порядок сообщений чата сохранен')
+
+    started, sent, deliveries = run(ConnectionError('сеть недоступна'))
+    check(all(delivery.status == SENT for delivery in deliveries),
+          'ошибка сети: все сообщения отправлены')
+    check(all(moment - started < RETRY_AFTER / 2
+              for moment, chat_id, _ in sent if chat_id == 2),
+          'ошибка сети: другие чаты не ждут')
+
+
+if __name__ == '__main__':
+    main()
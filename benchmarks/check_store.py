@@ -0,0 +1,111 @@
+"""
+Проверка хранилища графиков SQLite (schedule_store.py).
+
+Синтетические графики двух соседних месяцев (через границу года)
+записываются в базу в памяти. График сотрудника и события дня
+из базы должны совпасть с исходным словарем графика, ближайшее
+событие ищется через границу месяцев, а повторная загрузка месяца
+заменяет его события, не трогая соседний месяц.
+
+Запуск из корня проекта:
+    python -m benchmarks.check_store
+"""
+import calendar
+import os
+from datetime import date
+
+from benchmarks.synthetic import generate_rows
+
+# utils читает настройки из окружения при импорте.
+os.environ.setdefault('DEPARTMENT_IDS', '{}')
+os.environ.setdefault('BOSS_LIST', '[]')
+
+from schedule_store import ScheduleStore  # noqa: E402
+from utils import compile_schedule  # noqa: E402
+
+USERS = 50
+# Декабрь и январь следующего года.
+MONTHS = ((2025, 12), (2026, 1))
+
+
+def check(condition, message):
+    if not condition:
+        raise AssertionError(message)
+    print(f'ok: {message}')
+
+
+def as_lists(user_schedule) -> dict:
+    """График сотрудника с событиями-списками (как из базы)."""
+    return {
+        kind: [
+            list(event) if isinstance(event, tuple) else event
+            for event in events
+        ]
+        for kind, events in user_schedule.items()
+    }
+
+
+def expected_day(schedule, day) -> dict:
+    """События дня по словарю графика (в порядке строк графика)."""
+    events = {'смена': [], 'дежурство': []}
+    for user_name, value in schedule.items():
+        for gain in value['смена']:
+            if gain[0] == day.day:
+                events['смена'].append(user_name)
+        for duty in value['дежурство']:
+            if duty[0] == day.day:
+                events['дежурство'].append((user_name, list(duty)))
+    return events
+
+
+def main():
+    store = ScheduleStore()
+    schedules = {}
+    for seed, (year, month) in enumerate(MONTHS):
+        schedule = compile_schedule(
+            generate_rows(USERS, month, year, seed=seed), month, year)
+        schedules[(year, month)] = schedule
+        store.replace_month(year, month, schedule, version=seed + 1)
+
+    for (year, month), schedule in schedules.items():
+        check(all(
+            store.user_month(user_name, year, month) == as_lists(value)
+            for user_name, value in schedule.items()
+        ), f'графики сотрудников за {month:02}.{year} совпадают')
+        days = calendar.monthrange(year, month)[1]
+        check(all(
+            store.day_events(day) == expected_day(schedule, day)
+            for day in (date(year, month, number)
+                        for number in range(1, days + 1))
+        ), f'события дней за {month:02}.{year} совпадают')
+    check(store.month_state(2026, 1)[1:] == (2, True),
+          'версия и признак загрузки месяца')
+
+    # Ближайшее дежурство после последнего в декабре - уже в январе.
+    user_name, value = next(
+        (name, value) for name, value in schedules[(2025, 12)].items()
+        if value['дежурство'])
+    last_duty = value['дежурство'][-1][0]
+    after = date(2025, 12, last_duty + 1) if last_duty < 31 else (
+        date(2026, 1, 1))
+    january = schedules[(2026, 1)][user_name]['дежурство']
+    expected = (date(2026, 1, january[0][0]), january[0][2]) if (
+        january) else None
+    check(store.next_event(user_name, 'дежурство', after) == expected,
+          'ближайшее дежурство найдено через границу года')
+
+    # Повторная загрузка января заменяет его события.
+    store.replace_month(2026, 1, {}, version=3)
+    check(store.day_events(date(2026, 1, 15)) == {
+        'смена': [], 'дежурство': []}, 'события месяца заменены')
+    check(store.month_state(2026, 1)[1:] == (3, False),
+          'пустой график - месяц не загружен')
+    check(all(
+        store.user_month(user_name, 2025, 12) == as_lists(value)
+        for user_name, value in schedules[(2025, 12)].items()
+    ), 'соседний месяц не изменился')
+    store.close()
+
+
+if __name__ == '__main__':
+    main()
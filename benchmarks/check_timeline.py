@@ -0,0 +1,90 @@
+"""
+Проверка ленты событий (timeline.py).
+
+Синтетические графики декабря и января следующего года загружаются
+в ленту: ближайшие события сотрудника идут через границу года,
+события дня совпадают с графиком, а повторная загрузка месяца
+заменяет только его события.
+
+Запуск из корня проекта:
+    python -m benchmarks.check_timeline
+"""
+import os
+from datetime import date
+
+from benchmarks.synthetic import generate_rows
+
+# utils читает настройки из окружения при импорте.
+os.environ.setdefault('DEPARTMENT_IDS', '{}')
+os.environ.setdefault('BOSS_LIST', '[]')
+
+from timeline import KIND_DUTY, KIND_GAIN, Timeline  # noqa: E402
+from utils import compile_schedule  # noqa: E402
+
+USERS = 30
+DECEMBER = (2025, 12)
+JANUARY = (2026, 1)
+
+
+def check(condition, message):
+    if not condition:
+        raise AssertionError(message)
+    print(f'ok: {message}')
+
+
+def user_duties(schedules, user_name) -> list:
+    """Все дежурства сотрудника по графикам: (дата, время)."""
+    return [
+        (date(year, month, duty[0]), duty[2])
+        for (year, month), schedule in sorted(schedules.items())
+        for duty in schedule[user_name][KIND_DUTY]
+    ]
+
+
+def main():
+    timeline = Timeline()
+    schedules = {}
+    for seed, (year, month) in enumerate((DECEMBER, JANUARY)):
+        schedule = compile_schedule(
+            generate_rows(USERS, month, year, seed=seed), month, year)
+        schedules[(year, month)] = schedule
+        timeline.update_month(year, month, schedule, version=seed + 1)
+
+    check(timeline.has_month(*JANUARY, version=2)
+          and not timeline.has_month(*JANUARY, version=1),
+          'месяц загружен с версией графика')
+
+    user_name = next(iter(schedules[DECEMBER]))
+    duties = user_duties(schedules, user_name)
+    check(timeline.next_events(user_name, KIND_DUTY, len(duties),
+                               after=date(2025, 12, 1)) == duties,
+          'все дежурства сотрудника по порядку дат')
+    after = date(2025, 12, 31)
+    expected = [duty for duty in duties if duty[0] >= after][:3]
+    check(timeline.next_events(user_name, KIND_DUTY, 3, after=after)
+          == expected and expected[-1][0].year == 2026,
+          'ближайшие дежурства - через границу года')
+
+    day = date(2026, 1, 15)
+    check(timeline.on_day(day, KIND_GAIN) == [
+        (name, '') for name, value in schedules[JANUARY].items()
+        if any(gain[0] == day.day for gain in value[KIND_GAIN])
+    ], 'смены дня совпадают с графиком (в порядке строк)')
+
+    # Январь заменен графиком, где у сотрудника нет событий.
+    version = timeline.version
+    january = dict(schedules[JANUARY])
+    january[user_name] = {KIND_GAIN: [], KIND_DUTY: [], 'отпуск': []}
+    timeline.update_month(*JANUARY, january, version=3)
+    check(timeline.version == version + 1, 'версия ленты выросла')
+    check(timeline.next_events(user_name, KIND_DUTY, 100,
+                               after=date(2026, 1, 1)) == [],
+          'события месяца заменены')
+    check(timeline.next_events(user_name, KIND_DUTY, 100,
+                               after=date(2025, 12, 1))
+          == user_duties({DECEMBER: schedules[DECEMBER]}, user_name),
+          'события соседнего месяца не изменились')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,218 @@
+"""
+Проверка прогноза погоды на сохраненных страницах (без сети).
+
+Локальный HTTP-сервер отдает страницы из benchmarks/fixtures:
+рабочую страницу, страницу без прогноза, ошибку 503 и ответ,
+который не укладывается в таймаут.
+
+Запуск из корня проекта:
+    python -m benchmarks.check_weather
+"""
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from weather import (
+    GismeteoProvider,
+    WeatherLocations,
+    WeatherService,
+    parse_forecast
+)
+
+FIXTURES = os.path.join(os.path.dirname(__file__), 'fixtures')
+FORECAST_PAGE = os.path.join(FIXTURES, 'gismeteo_shkotovo.html')
+UNAVAILABLE_PAGE = os.path.join(FIXTURES, 'gismeteo_unavailable.html')
+EXPECTED = (
+    ['Облачно, без осадков', 'Пасмурно, небольшой дождь',
+     'Облачно, небольшой дождь', 'Малооблачно', 'Ясно', 'Пасмурно'],
+    ['-1', '4', '7', '6', '2', '0'],
+)
+SLOW_DELAY = 2
+LOCATIONS = 6
+LOCATION_DELAY = 0.3
+
+
+def read_fixture(filepath) -> str:
+    with open(filepath, 'r', encoding='utf-8') as file:
+        return file.read()
+
+
+class FixtureServer:
+    """Локальный сайт погоды. Режим ответа меняется полем mode."""
+
+    def __init__(self):
+        self.mode = 'ok'
+        self.requests = 0
+        pages = {
+            'ok': read_fixture(FORECAST_PAGE).encode('utf-8'),
+            'unavailable': read_fixture(UNAVAILABLE_PAGE).encode('utf-8'),
+        }
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                server.requests += 1
+                if server.mode == 'down':
+                    self.send_error(503)
+                    return
+                if server.mode == 'slow':
+                    time.sleep(SLOW_DELAY)
+                body = pages.get(server.mode, pages['ok'])
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/html; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                try:
+                    self.wfile.write(body)
+                except ConnectionError:
+                    pass  # Клиент не дождался ответа (таймаут).
+
+            def log_message(self, format, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.httpd.daemon_threads = True
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f'http://{host}:{port}/weather-shkotovo-189197/'
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def check(condition, message):
+    if not condition:
+        raise AssertionError(message)
+    print(f'ok: {message}')
+
+
+def main():
+    check(parse_forecast(read_fixture(FORECAST_PAGE)) == EXPECTED,
+          'прогноз разобран со страницы')
+    check(parse_forecast(read_fixture(UNAVAILABLE_PAGE)) is None,
+          'страница без прогноза не разбирается')
+
+    site = FixtureServer()
+    now = [0.0]
+    service = WeatherService(
+        GismeteoProvider(site.url), ttl=60, max_age=600, timeout=(1, 0.5),
+        clock=lambda: now[0])
+    try:
+        check(service.get() == EXPECTED, 'прогноз загружен')
+        service.get()
+        check(site.requests == 1, 'повторный запрос отдан из кэша')
+
+        now[0] += 120
+        site.mode = 'down'
+        check(service.get() == EXPECTED,
+              'сайт недоступен - отдан прошлый прогноз')
+        check(site.requests == 2, 'после TTL прогноз запрошен заново')
+
+        site.mode = 'slow'
+        started = time.perf_counter()
+        check(service.get() == EXPECTED,
+              'медленный ответ - отдан прошлый прогноз')
+        check(time.perf_counter() - started < SLOW_DELAY,
+              'медленный ответ прерван по таймауту')
+
+        now[0] += 1000
+        site.mode = 'unavailable'
+        check(service.get() is None, 'слишком старый прогноз не отдан')
+
+        site.mode = 'ok'
+        check(service.prefetch(attempts=1), 'прогноз загружен заранее')
+        requests_before = site.requests
+        service.get()
+        check(site.requests == requests_before,
+              'после загрузки заранее прогноз отдан из кэша')
+    finally:
+        site.stop()
+
+    check_locations()
+
+
+def check_locations():
+    """Несколько мест загружаются параллельно, у каждого свой срок."""
+    config = {
+        'locations': {
+            f'town{number}': {
+                'name': f'Город {number}', 'provider': 'fixture',
+                'path': FORECAST_PAGE, 'delay': LOCATION_DELAY,
+            }
+            for number in range(LOCATIONS)
+        },
+        'chats': {'-100': ['town0', 'town1'], '-200': ['town2']},
+    }
+    config['locations']['stuck'] = {
+        'name': 'Зависший', 'provider': 'fixture', 'path': FORECAST_PAGE,
+        'delay': SLOW_DELAY, 'deadline': LOCATION_DELAY * 2,
+    }
+    locations = WeatherLocations(config, workers=LOCATIONS + 1)
+    try:
+        started = time.perf_counter()
+        results = locations.get_all()
+        elapsed = time.perf_counter() - started
+        check(all(results[f'town{number}'] == EXPECTED
+                  for number in range(LOCATIONS)),
+              'прогнозы всех мест загружены')
+        check(results['stuck'] is None,
+              'место, не уложившееся в срок, пропущено')
+        check(elapsed < LOCATION_DELAY * 3,
+              f'{LOCATIONS + 1} мест загружены параллельно '
+              f'за {elapsed:.2f} c')
+        check(locations.forecasts('-100') == [
+            ('Город 0', EXPECTED), ('Город 1', EXPECTED)],
+            'прогнозы по списку мест чата')
+        check(sorted(locations.chats) == ['-100', '-200'],
+              'чаты с настроенной погодой')
+    finally:
+        locations.stop()
+
+    check_prefetch()
+
+
+def check_prefetch():
+    """Загрузка заранее идет в своем потоке, ошибки повторяются."""
+    town = {
+        'name': 'Город', 'provider': 'fixture',
+        'path': FORECAST_PAGE, 'delay': LOCATION_DELAY,
+    }
+    locations = WeatherLocations({'locations': {'town': town}})
+    try:
+        started = time.perf_counter()
+        thread = locations.start_prefetch()
+        check(time.perf_counter() - started < LOCATION_DELAY,
+              'загрузка заранее не задерживает планировщик')
+        check(locations.start_prefetch() is thread,
+              'повторный запуск не начинает вторую загрузку')
+        thread.join(LOCATION_DELAY * 10)
+        check(not thread.is_alive(), 'загрузка заранее завершена')
+        started = time.perf_counter()
+        check(locations.get_all()['town'] == EXPECTED
+              and time.perf_counter() - started < LOCATION_DELAY,
+              'после загрузки заранее прогноз отдан из кэша')
+    finally:
+        locations.stop()
+
+    broken = {
+        'name': 'Без страницы', 'provider': 'fixture',
+        'path': os.path.join(FIXTURES, 'missing.html'),
+    }
+    locations = WeatherLocations({'locations': {'broken': broken}})
+    try:
+        started = time.perf_counter()
+        check(not locations.prefetch(attempts=3, delay=LOCATION_DELAY),
+              'место с ошибкой не загружено и после повторов')
+        check(time.perf_counter() - started >= LOCATION_DELAY * 2,
+              'повторы - через заданную паузу')
+    finally:
+        locations.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,108 @@
+"""
+Проверка webhook-сервера без Telegram.
+
+Сервер запускается на свободном порту, вместо бота обновления
+получает функция-заглушка. Проверяется, что обновление с верным
+секретом передается боту, а с неверным секретом, на чужой адрес или
+с испорченными заголовками - отклоняется. Без секрета сервер
+не запускается.
+
+Запуск из корня проекта:
+    python -m benchmarks.check_webhook
+"""
+import http.client
+import json
+import threading
+
+from webhook import SECRET_HEADER, WebhookServer, post_updates
+
+SECRET = 'check-secret'
+PATH = '/webhook'
+TIMEOUT = 5
+UPDATE = {
+    'update_id': 1,
+    'message': {
+        'message_id': 10,
+        'date': 1767225600,
+        'chat': {'id': 1, 'type': 'private'},
+        'from': {'id': 1, 'is_bot': False, 'first_name': 'Тест'},
+        'text': '/start',
+    },
+}
+
+
+def check(condition, message):
+    if not condition:
+        raise AssertionError(message)
+    print(f'ok: {message}')
+
+
+class FakeBot:
+    """Заглушка бота: запоминает полученные обновления."""
+
+    def __init__(self):
+        self.updates = []
+        self.received = threading.Event()
+
+    def process_new_updates(self, updates):
+        self.updates.extend(updates)
+        self.received.set()
+
+
+def raw_post(host, port, headers) -> int:
+    """POST с заголовками как есть (байтами). Возвращаем HTTP-статус."""
+    body = json.dumps(UPDATE).encode('utf-8')
+    connection = http.client.HTTPConnection(host, port, timeout=TIMEOUT)
+    try:
+        connection.putrequest('POST', PATH)
+        for name, value in headers.items():
+            connection.putheader(name, value)
+        connection.endheaders(body)
+        return connection.getresponse().status
+    finally:
+        connection.close()
+
+
+def main():
+    try:
+        WebhookServer(FakeBot().process_new_updates, port=0, secret='')
+    except ValueError:
+        check(True, 'без секрета сервер не запускается')
+    else:
+        check(False, 'без секрета сервер не запускается')
+
+    bot = FakeBot()
+    server = WebhookServer(
+        bot.process_new_updates, host='127.0.0.1', port=0, path=PATH,
+        secret=SECRET, workers=1)
+    server.start()
+    host, port = server.address
+    url = f'http://{host}:{port}{PATH}'
+    try:
+        check(post_updates(url, [UPDATE], secret=SECRET) == [200],
+              'обновление с верным секретом принято')
+        check(bot.received.wait(TIMEOUT), 'обновление передано боту')
+        update = bot.updates[0]
+        check(update.update_id == 1 and update.message.text == '/start',
+              'обновление разобрано')
+
+        check(post_updates(url, [UPDATE], secret='wrong') == [403],
+              'неверный секрет - 403')
+        check(post_updates(f'http://{host}:{port}/other', [UPDATE],
+                           secret=SECRET) == [404],
+              'чужой адрес - 404')
+        check(raw_post(host, port, {
+            SECRET_HEADER: 'секрет'.encode('utf-8'),
+            'Content-Length': '10',
+        }) == 403, 'секрет с не-ASCII символами - 403')
+        check(raw_post(host, port, {
+            SECRET_HEADER: SECRET,
+            'Content-Length': 'ten',
+        }) == 400, 'нечисловой Content-Length - 400')
+    finally:
+        server.stop()
+    check(len(bot.updates) == 1, 'отклоненные обновления не переданы боту')
+
+
+if __name__ == '__main__':
+    main()
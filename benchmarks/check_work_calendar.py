@@ -0,0 +1,104 @@
+"""
+Проверка производственного календаря (work_calendar.py).
+
+Календарь на 2025 и 2026 годы читается из временного файла. Маски
+нерабочих дней должны учитывать праздники и рабочие субботы
+(переносы), январь после декабря берется из календаря следующего
+года, а для года без данных - праздники из HOLIDAYS и одно
+предупреждение. Отсутствующий и испорченный файл дают календарь
+без переносов.
+
+Запуск из корня проекта:
+    python -m benchmarks.check_work_calendar
+"""
+import json
+import logging
+import os
+import tempfile
+
+from constants import HOLIDAYS
+from work_calendar import WorkCalendar
+
+YEARS = {
+    '2025': {
+        'holidays': {'1': [1, 2, 3, 6, 7, 8], '11': [3, 4], '12': [31]},
+        'workdays': {'11': [1]},
+    },
+    '2026': {
+        'holidays': {'1': [1, 2, 5, 6, 7, 8, 9]},
+        'workdays': {},
+    },
+}
+
+
+def check(condition, message):
+    if not condition:
+        raise AssertionError(message)
+    print(f'ok: {message}')
+
+
+class Records(logging.Handler):
+    """Записи журнала календаря: (уровень, сообщение)."""
+
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append((record.levelno, record.getMessage()))
+
+
+def days_off(work_calendar, year, month) -> list:
+    mask = work_calendar.month_mask(year, month)
+    return [day for day in range(1, 32) if mask >> (day - 1) & 1]
+
+
+def main():
+    records = Records()
+    logging.getLogger('work_calendar').addHandler(records)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        filepath = os.path.join(workdir, 'holidays.json')
+        with open(filepath, 'w', encoding='utf-8') as file:
+            json.dump(YEARS, file)
+        work_calendar = WorkCalendar.load(filepath)
+
+        # Ноябрь 2025: суббота 1-го - рабочая, 3 и 4 - праздники.
+        check(days_off(work_calendar, 2025, 11)
+              == [2, 3, 4, 8, 9, 15, 16, 22, 23, 29, 30],
+              'маска с праздниками и рабочей субботой')
+        check(not work_calendar.is_day_off(2025, 11, 1)
+              and work_calendar.is_day_off(2025, 11, 2),
+              'рабочая суббота - не выходной')
+
+        # Декабрь 2025 -> январь 2026: праздники следующего года.
+        check(work_calendar.is_day_off(2025, 12, 31),
+              '31 декабря - праздник')
+        check(work_calendar.is_day_off(2026, 1, 9)
+              and not work_calendar.is_day_off(2025, 1, 9),
+              'январь после декабря - по календарю следующего года')
+
+        # Декабрь 2026 -> январь 2027: года нет в файле.
+        check(days_off(work_calendar, 2027, 1) == sorted(
+            set(HOLIDAYS['1']) | {2, 3, 9, 10, 16, 17, 23, 24, 30, 31}),
+            'год без данных - праздники из HOLIDAYS')
+        work_calendar.month_mask(2027, 2)
+        check([level for level, _ in records.records]
+              == [logging.WARNING], 'о годе без данных - одно предупреждение')
+
+        records.records.clear()
+        check(WorkCalendar.load(
+            os.path.join(workdir, 'missing.json')).years == {}
+            and records.records[0][0] == logging.WARNING,
+            'нет файла - предупреждение и календарь без переносов')
+
+        records.records.clear()
+        with open(filepath, 'w', encoding='utf-8') as file:
+            file.write('{"2026": ')
+        check(WorkCalendar.load(filepath).years == {}
+              and records.records[0][0] == logging.ERROR,
+              'испорченный файл - ошибка в журнале календаря')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+"""
+Локальная замена Bot API для проверок без сети.
+
+RateLimitedApi.send_message соблюдает те же лимиты, что и Telegram:
+при превышении отвечает ошибкой 429 с параметром retry_after.
+"""
+import threading
+import time
+from collections import deque
+
+GLOBAL_LIMIT = (30, 1)  # 30 сообщений за 1 секунду на бота.
+PRIVATE_LIMIT = (1, 1)  # 1 сообщение за 1 секунду в личный чат.
+GROUP_LIMIT = (20, 60)  # 20 сообщений за 60 секунд в группу.
+
+
+class TooManyRequests(Exception):
+    """Ответ 429 в формате ApiTelegramException из telebot."""
+
+    def __init__(self, retry_after):
+        super().__init__(f'Too Many Requests: retry after {retry_after}')
+        self.error_code = 429
+        self.result_json = {
+            'ok': False,
+            'error_code': 429,
+            'parameters': {'retry_after': retry_after},
+        }
+
+
+class RateLimitedApi:
+    """Имитация Bot API: скользящее окно отправок на бота и на чат."""
+
+    def __init__(self, latency=0.0, clock=time.monotonic):
+        self.latency = latency
+        self.clock = clock
+        self.sent = []  # (время, чат, текст)
+        self.rejected = 0
+        self._global = deque()
+        self._chats = {}
+        self._lock = threading.Lock()
+
+    def send_message(self, chat_id, text, **kwargs):
+        if self.latency:
+            time.sleep(self.latency)
+        with self._lock:
+            now = self.clock()
+            chat_limit = (
+                GROUP_LIMIT if str(chat_id).startswith(('-', '@'))
+                else PRIVATE_LIMIT
+            )
+            chat_window = self._chats.setdefault(chat_id, deque())
+            retry_after = max(
+                self._retry_after(self._global, GLOBAL_LIMIT, now),
+                self._retry_after(chat_window, chat_limit, now),
+            )
+            if retry_after:
+                self.rejected += 1
+                raise TooManyRequests(retry_after)
+            self._global.append(now)
+            chat_window.append(now)
+            self.sent.append((now, chat_id, text))
+            return {'chat_id': chat_id, 'text': text}
+
+    @staticmethod
+    def _retry_after(window, limit, now) -> int:
+        """0 - отправка разрешена, иначе через сколько секунд повторить."""
+        count, period = limit
+        while window and now - window[0] >= period:
+            window.popleft()
+        if len(window) < count:
+            return 0
+        return max(1, int(period - (now - window[0]) + 0.999))
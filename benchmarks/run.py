@@ -0,0 +1,207 @@
+"""
+Замеры горячих путей бота на синтетических графиках.
+
+Для каждого размера отдела (по умолчанию 10, 100, 1000 и 10000
+сотрудников) во временной папке создаются xlsx текущего и следующего
+месяца и замеряются:
+- read_xlsx и create_schedule;
+- get_schedule: компиляция xlsx, холодный (с диска) и теплый (из кэша);
+- create_notification_list;
+- все сборщики сообщений message.py: без кэша ответов и из кэша;
+- разбор страницы погоды на сохраненных страницах (benchmarks/fixtures).
+
+Сеть и токен бота не нужны. Результаты печатаются (или записываются)
+в JSON, чтобы сравнивать прогоны между собой.
+
+Запуск из корня проекта:
+    python -m benchmarks.run [--users 10 100 ...] [--output results.json]
+                             [--compare previous.json [--threshold 1.2]]
+"""
+import argparse
+import glob
+import json
+import os
+import platform
+import sys
+import tempfile
+import timeit
+from datetime import datetime
+
+from benchmarks.synthetic import generate_rows, write_roster, write_xlsx
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                        'fixtures')
+SIZES = [10, 100, 1000, 10000]
+REPEAT = 3
+# Во сколько раз замер может быть медленнее прошлого прогона.
+THRESHOLD = 1.2
+
+
+def measure(func, setup=None, repeat=REPEAT) -> dict:
+    """
+    Лучшее время одного вызова функции (в секундах).
+    setup вызывается перед каждым вызовом и в замер не входит.
+    """
+    if setup is None:
+        timer = timeit.Timer(func)
+        number = timer.autorange()[0]
+        best = min(timer.repeat(repeat=repeat, number=number)) / number
+        return {'seconds': best, 'calls': number}
+
+    best = float('inf')
+    for _ in range(repeat):
+        setup()
+        best = min(best, timeit.Timer(func).timeit(number=1))
+    return {'seconds': best, 'calls': 1}
+
+
+def prepare_environment(workdir, users):
+    """
+    Готовим окружение до импорта модулей бота: справочник на users
+    сотрудников, рабочая папка с графиками, без сети и токена.
+    """
+    roster_file = os.path.join(workdir, 'roster.json')
+    write_roster(users, roster_file)
+    os.environ['ROSTER_FILE'] = roster_file
+    os.environ.setdefault('TOKEN', 'benchmark')
+    os.makedirs(os.path.join(workdir, 'schedule', 'json'), exist_ok=True)
+    os.chdir(workdir)
+
+
+def bench_schedule(users, results):
+    """Замеры по графику на users сотрудников."""
+    # Модули бота импортируются после подготовки окружения.
+    import message
+    import utils
+    from notification import create_notification_list
+
+    now = datetime.now()
+    month = utils.get_current_month()
+    next_month = utils.get_next_month()
+    next_month_number = now.month % 12 + 1
+    # В декабре график на январь - следующего года.
+    next_year = utils.get_month_year(next_month)
+    write_xlsx(generate_rows(users, now.month, now.year),
+               f'schedule/{month}_{now.year}.xlsx')
+    write_xlsx(generate_rows(users, next_month_number, next_year, seed=1),
+               f'schedule/{next_month}_{next_year}.xlsx')
+    compiled_file = utils._compiled_path(month, now.year)
+
+    def add(name, result):
+        result.update(name=name, users=users)
+        results.append(result)
+        print(f'{users:>6} {name:<40} {result["seconds"] * 1000:10.3f} мс',
+              file=sys.stderr)
+
+    def remove_compiled():
+        utils.clear_schedule_cache()
+        if os.path.exists(compiled_file):
+            os.remove(compiled_file)
+
+    add('read_xlsx', measure(lambda: list(utils.read_xlsx(month))))
+    add('create_schedule', measure(lambda: utils.create_schedule(month)))
+    add('get_schedule_compile', measure(
+        lambda: utils.get_schedule(month), setup=remove_compiled))
+    add('get_schedule_cold', measure(
+        lambda: utils.get_schedule(month),
+        setup=utils.clear_schedule_cache))
+    utils.get_schedule(month)
+    add('get_schedule_warm', measure(lambda: utils.get_schedule(month)))
+    add('create_notification_list', measure(create_notification_list))
+
+    user_id = str(users // 2)
+    builders = {
+        'create_gain_message': lambda: message.create_gain_message(user_id),
+        'create_duty_message': lambda: message.create_duty_message(user_id),
+        'create_vacation_message': (
+            lambda: message.create_vacation_message(user_id)),
+        'create_month_message': (
+            lambda: message.create_month_message(user_id, month)),
+        'create_month_message_next': (
+            lambda: message.create_month_message(user_id, next_month)),
+    }
+    for name, builder in builders.items():
+        add(f'{name}_cold', measure(
+            builder, setup=message.clear_render_cache))
+        builder()
+        add(f'{name}_warm', measure(builder))
+    add('create_gain_notification_message', measure(
+        message.create_gain_notification_message))
+    add('create_duty_notification_message', measure(
+        message.create_duty_notification_message))
+
+
+def bench_weather(results):
+    """Замеры разбора страницы погоды на сохраненных страницах."""
+    from weather import parse_forecast
+
+    for filepath in sorted(glob.glob(os.path.join(FIXTURES, '*.html'))):
+        with open(filepath, 'r', encoding='utf-8') as file:
+            html = file.read()
+        result = measure(lambda: parse_forecast(html))
+        result.update(name=f'parse_forecast:{os.path.basename(filepath)}',
+                      users=None)
+        results.append(result)
+
+
+def compare(results, previous, threshold) -> list:
+    """Замеры, которые стали медленнее прошлого прогона в threshold раз."""
+    before = {
+        (result['name'], result['users']): result['seconds']
+        for result in previous['results']
+    }
+    regressions = []
+    for result in results:
+        old = before.get((result['name'], result['users']))
+        if old and result['seconds'] > old * threshold:
+            regressions.append({
+                'name': result['name'],
+                'users': result['users'],
+                'before': old,
+                'after': result['seconds'],
+                'ratio': result['seconds'] / old,
+            })
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--users', type=int, nargs='+', default=SIZES)
+    parser.add_argument('--output', help='файл для результатов (JSON)')
+    parser.add_argument('--compare', help='результаты прошлого прогона')
+    parser.add_argument('--threshold', type=float, default=THRESHOLD)
+    args = parser.parse_args(argv)
+
+    results = []
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as workdir:
+        prepare_environment(workdir, max(args.users))
+        try:
+            for users in args.users:
+                bench_schedule(users, results)
+            bench_weather(results)
+        finally:
+            os.chdir(cwd)
+
+    report = {
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'results': results,
+    }
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as file:
+            report['regressions'] = compare(
+                results, json.load(file), args.threshold)
+
+    content = json.dumps(report, ensure_ascii=False, indent=4)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            file.write(content)
+    else:
+        print(content)
+    return 1 if report.get('regressions') else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,58 @@
+"""
+Синтетические данные в формате бота: строки графика, xlsx и справочник.
+
+Строки графика - как в рабочих xlsx: столбец 'ФИО' и столбцы-дни
+1..31 с кодами '+', Нн/Нд, 'отпуск ...' и пустыми ячейками.
+"""
+import calendar
+import json
+import random
+
+from openpyxl import Workbook
+
+CODES = ['+', '+', '+', None, None, 'Нн', 'Нд', '+Нн', 'Нд+', 8,
+         'отпуск с 1 по 14']
+
+
+def user_name(number) -> str:
+    """Ф.И.О синтетического сотрудника."""
+    return f'Сотрудник {number}'
+
+
+def generate_rows(users, month, year, seed=0) -> list:
+    """Создаем строки графика в формате xlsx-файла."""
+    rnd = random.Random(seed)
+    days_in_month = calendar.monthrange(year, month)[1]
+    rows = []
+    for number in range(users):
+        row = {'ФИО': user_name(number)}
+        for day in range(1, days_in_month + 1):
+            row[str(day)] = rnd.choice(CODES)
+        rows.append(row)
+    return rows
+
+
+def write_xlsx(rows, filepath):
+    """Записываем строки графика в xlsx-файл."""
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet()
+    header = list(rows[0].keys())
+    sheet.append(header)
+    for row in rows:
+        sheet.append([row[column] for column in header])
+    workbook.save(filepath)
+
+
+def write_roster(users, filepath, bosses=3, group_id='-100'):
+    """
+    Записываем справочник (формат ROSTER_FILE) на users сотрудников:
+    id сотрудника - его номер, первые bosses сотрудников - ответственные.
+    """
+    department = {str(number): user_name(number) for number in range(users)}
+    content = {
+        'department': department,
+        'bosses': [user_name(number) for number in range(bosses)],
+        'groups': {group_id: list(department.values())},
+    }
+    with open(filepath, 'w', encoding='utf-8') as file:
+        json.dump(content, file, ensure_ascii=False)
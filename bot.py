@@ -1,336 +1,426 @@
-import json
-import logging
-import os
-import threading
-import time
-from datetime import datetime, timedelta
-
-from dotenv import load_dotenv
-from telebot import TeleBot
-from telebot.types import KeyboardButton, ReplyKeyboardMarkup
-
-from constants import (
-    CURRENT_MONTH,
-    DUTY_EMOJI,
-    GAIN_EMOJI,
-    MONTHS,
-    NEXT_MONTH,
-    NOTIFICATION_TIME,
-    VACATION_EMOJI,
-    WEATHER_NOTIFICATION_TIME
-)
-from message import (
-    create_duty_message,
-    create_duty_notification_message,
-    create_gain_message,
-    create_gain_notification_message,
-    create_month_message,
-    create_vacation_message,
-    create_weather_notification_message
-)
-from utils import check_department
-
-load_dotenv()
-bot_token = os.getenv('TOKEN')
-bot = TeleBot(bot_token)
-
-GROUP_ID = os.getenv('GROUP_CHAT_ID')
-DEPARTMENT = json.loads(os.environ['DEPARTMENT_IDS'])
-exit_flag = False  # Флаг для остановки потоков.
-
-
-def create_keyboard():
-    """
-    Оформление клавиатуры.
-    Параметр exlude - строка с названием кнопки, которую надо исключить.
-    """
-    keyboard = ReplyKeyboardMarkup(resize_keyboard=True)
-    button_gain = KeyboardButton(GAIN_EMOJI)
-    button_duty = KeyboardButton(DUTY_EMOJI)
-    button_vacation = KeyboardButton(VACATION_EMOJI)
-    button_current_month = KeyboardButton(CURRENT_MONTH)
-    button_next_month = KeyboardButton(NEXT_MONTH)
-    keyboard.row(button_gain, button_duty, button_vacation)
-    keyboard.row(button_current_month, button_next_month)
-
-    return keyboard
-
-
-@bot.message_handler(commands=['start'])
-def start_command(message):
-    """Вывод сообщения и создание клавиатуры, если пользователь "одобрен"."""
-    # Если сообщение пришло из группы.
-    if message.chat.type in ['group', 'supergroup']:
-        group_id = message.chat.id
-        response = (
-            'Привет! 👋\n'
-            '🤖: Мои возможности в групповом чате ограничены.\n\n'
-            '⏱️ Если завтра на работу, то пришлю тебе уведомление '
-            f'в {NOTIFICATION_TIME.strftime("%H:%M")}\n'
-            f'⏱️ Утром, в {WEATHER_NOTIFICATION_TIME.strftime("%H:%M")} '
-            'пришлю текущую погоду.\n\n'
-            'Чтобы посмотреть личную информацию из графика,\n'
-            'напишите мне в личном сообщении: 📲 @grafik_4o_bot'
-        )
-        bot.send_message(group_id, response)
-    # Если сообщение написано лично боту.
-    elif message.chat.type == 'private':
-        user_id = message.chat.id
-        if check_department(user_id):
-            response = (
-                '👋 Добро пожаловать в главный интерфейс бота.\n\n'
-
-                'Вот список доступных команд:\n'
-                f'- {GAIN_EMOJI} Узнать когда будущие смены\n'
-                f'- {DUTY_EMOJI} Посмотреть данные о планируемом дежурстве\n'
-                f'- {VACATION_EMOJI} Проверить наличие отпуска в этом месяце\n'
-                f'- {CURRENT_MONTH} Увидеть свой график на текущий месяц\n'
-                f'- {NEXT_MONTH} И на следующий месяц, если он подготовлен\n'
-            )
-            bot.send_message(user_id, response, reply_markup=create_keyboard())
-        else:
-            bot.send_message(
-                user_id,
-                text=(
-                    'Этот 🤖 бот доступен только ограниченному кругу лиц.'
-                    'Чтобы тебя авторизовали, обратись к @Zulfat_Gafurzyanov'
-                )
-            )
-
-
-@bot.message_handler(func=lambda message: message.text == GAIN_EMOJI)
-def get_gain(message):
-    """Выдаем данные по сменам."""
-    user_id = message.chat.id
-    text = create_gain_message(user_id)
-
-    bot.send_message(
-        user_id,
-        text,
-        reply_markup=create_keyboard()
-    )
-
-
-@bot.message_handler(func=lambda message: message.text == DUTY_EMOJI)
-def get_duty(message):
-    """Выдаем данные по дежурству."""
-    user_id = message.chat.id
-    text = create_duty_message(user_id)
-
-    bot.send_message(
-        user_id,
-        text,
-        reply_markup=create_keyboard()
-    )
-
-
-@bot.message_handler(func=lambda message: message.text == VACATION_EMOJI)
-def get_vacation(message):
-    """Выдаем данные по отпуску."""
-    user_id = message.chat.id
-    text = create_vacation_message(user_id)
-
-    bot.send_message(
-        user_id,
-        text,
-        reply_markup=create_keyboard()
-    )
-
-
-@bot.message_handler(
-        func=lambda message: message.text == CURRENT_MONTH)
-def get_current_month_info(message):
-    """Выдаем всю информацию по текущему месяцу."""
-    current_month = MONTHS.get(str(datetime.now().month))
-    user_id = message.chat.id
-    text = create_month_message(user_id, current_month)
-
-    bot.send_message(
-        user_id,
-        text,
-        reply_markup=create_keyboard()
-    )
-
-
-@bot.message_handler(
-        func=lambda message: message.text == NEXT_MONTH)
-def get_next_month_info(message):
-    """Выдаем всю информацию по следующему месяцу."""
-    current_month_num = str(datetime.now().month)
-    if current_month_num == '12':
-        next_month = MONTHS['1']  # Январь
-    else:
-        next_month_num = str(int(current_month_num) + 1)
-        next_month = MONTHS[next_month_num]
-
-    user_id = message.chat.id
-    text = create_month_message(user_id, next_month)
-
-    bot.send_message(
-        user_id,
-        text,
-        reply_markup=create_keyboard()
-    )
-
-
-@bot.message_handler(func=lambda message: True)
-def response_for_message(message):
-    """Обработчик любого текста от пользователя."""
-    bot.send_message(
-        message.chat.id,
-        '🤖: Я могу отвечать только на команды, которые есть в меню.'
-    )
-
-
-def scheduler_gain_thread():
-    """
-    Настройка потока на отправку сообщений.
-
-    Уведомление о смене направляется в общую группу.
-    Уведомление о дежурстве направляется лично пользователю.
-    """
-    while not exit_flag:
-        now = datetime.now().time()
-        # Проверяем, наступило ли время отправки уведомлений
-        # о смене или дежурстве.
-        if now >= NOTIFICATION_TIME:
-            try:
-                (gain_message,
-                 user_gain_list) = create_gain_notification_message()
-                (duty_message,
-                 user_duty_list) = create_duty_notification_message()
-
-                # Если есть пользователи, у кого завтра смена:
-                if user_gain_list:
-                    bot.send_message(
-                        GROUP_ID,
-                        gain_message
-                    )
-                    logging.info(
-                        f'В группу {GROUP_ID} отправлено '
-                        'уведомление о сменах!'
-                    )
-
-                # Если есть пользователь, у кого завтра дежурство:
-                if user_duty_list:
-                    # Ищем его id и направляем сообщение.
-                    for user in user_duty_list:
-                        message = duty_message
-                        for key, value in DEPARTMENT.items():
-                            if user[0] == value:
-                                user_id = int(key)
-                                # Дополнили сообщение о дежурстве: в день/ночь
-                                message += user[1][2]
-                                bot.send_message(
-                                    user_id,
-                                    message
-                                )
-                                logging.info(
-                                    f'Пользователю {user_id} отправлено '
-                                    'уведомление о дежурстве!'
-                                )
-
-            except Exception as e:
-                logging.error(f'Ошибка при отправке уведомлений: {e}')
-
-            next_day = datetime.now() + timedelta(days=1)
-            # Комбинируем дату и время:
-            next_send_time = datetime.combine(
-                next_day.date(), NOTIFICATION_TIME)
-            # Задержка до следующей проверки (в секундах):
-            delay_seconds = (next_send_time - datetime.now()
-                             ).total_seconds()
-            time.sleep(delay_seconds)
-
-        else:
-            # Если время ещё не пришло, делаем паузу перед следующей проверкой.
-            time.sleep(1)
-
-
-def scheduler_weather_thread():
-    """Настройка потока на отправку сообщений о погоде."""
-    while not exit_flag:
-        now = datetime.now().time()
-        # Проверяем, наступило ли время отправки информации о погоде.
-        if now >= WEATHER_NOTIFICATION_TIME:
-            try:
-                weather_message = create_weather_notification_message()
-                if weather_message:
-                    bot.send_message(
-                        GROUP_ID,
-                        weather_message
-                    )
-                    logging.info('Уведомление о погоде отправлено')
-            except Exception as e:
-                logging.error(f'Ошибка при отправке погоды: {e}')
-
-            next_day = datetime.now() + timedelta(days=1)
-            # Комбинируем дату и время:
-            next_send_time = datetime.combine(
-                next_day.date(), WEATHER_NOTIFICATION_TIME)
-            # Задержка до следующей проверки (в секундах):
-            delay_seconds = (next_send_time - datetime.now()
-                             ).total_seconds()
-            time.sleep(delay_seconds)
-        else:
-            # Если время ещё не пришло, делаем паузу перед следующей проверкой.
-            time.sleep(1)
-
-
-def main_polling_thread():
-    """Настройка потока на обработку сообщений от пользователей."""
-    global exit_flag  # По умолчанию False.
-    try:
-        while not exit_flag:
-            bot.infinity_polling(timeout=20, long_polling_timeout=60)
-    except Exception as e:
-        logging.error(f'Ошибка polling: {e}')
-
-
-if __name__ == "__main__":
-    bot_dir = os.path.dirname(os.path.abspath(__file__))
-    log_path = os.path.join(bot_dir, 'main.log')
-    # Настройки логирования:
-    logging.basicConfig(
-        format=(
-            '%(asctime)s - '
-            '%(levelname)s - '
-            '%(message)s - '
-            '%(name)s - '
-            '%(funcName)s - '
-            '%(lineno)d'
-        ),
-        level=logging.INFO,
-        filename=log_path,
-        filemode='w',
-        encoding='utf-8',
-    )
-
-    # Создание потоков.
-    thread_gain_scheduler = threading.Thread(target=scheduler_gain_thread)
-    thread_weather_scheduler = threading.Thread(
-         target=scheduler_weather_thread)
-    thread_polling = threading.Thread(target=main_polling_thread)
-
-    # Формируем демон-потоки, которые будут завершены автоматически.
-    thread_gain_scheduler.daemon = True
-    thread_weather_scheduler.daemon = True
-    thread_polling.daemon = True
-
-    # Запуск потоков.
-    thread_gain_scheduler.start()
-    thread_weather_scheduler.start()
-    thread_polling.start()
-
-    try:
-        # Программа ожидает ввода от пользователя для продолжения.
-        input('Нажмите Enter для остановки...\n')
-    except KeyboardInterrupt:
-        pass  # Игнорируем прерывание
-    finally:
-        # Устанавливаем флаг завершения и ждем завершения потоков.
-        exit_flag = True
-        # thread_gain_scheduler.join(timeout=5)
-        # thread_weather_scheduler.join(timeout=5)
-        thread_polling.join(timeout=5)
-        logging.info('Работа завершена.')
+import logging
+import os
+import threading
+from logging.handlers import RotatingFileHandler
+
+from dotenv import load_dotenv
+from telebot import TeleBot
+
+from constants import (
+    CURRENT_MONTH,
+    DUTY_EMOJI,
+    GAIN_EMOJI,
+    LOG_BACKUP_COUNT,
+    LOG_MAX_BYTES,
+    NEXT_MONTH,
+    NOTIFICATION_CATCH_UP,
+    NOTIFICATION_TIME,
+    RENDER_WARM_UP_TIME,
+    VACATION_EMOJI,
+    WEATHER_NOTIFICATION_TIME,
+    WEATHER_PREFETCH_TIME
+)
+from message import (
+    KEYBOARD,
+    create_duty_message,
+    create_duty_notification_message,
+    create_gain_message,
+    create_gain_notification_message,
+    create_group_start_message,
+    create_month_message,
+    create_rate_limited_message,
+    create_schedule_change_message,
+    create_start_message,
+    create_stats_message,
+    create_unauthorized_message,
+    create_unknown_command_message,
+    create_vacation_message,
+    create_weather_notification_message,
+    warm_render_cache
+)
+from metrics import start_metrics_server
+from profiling import profiled
+from roster import ROSTER
+from router import RateLimiter, Router, authorization, error_capture, timing
+from scheduler import Scheduler, daily
+from sender import SendQueue
+from startup import BootTimer
+from utils import (
+    check_department,
+    get_current_month,
+    get_next_month,
+    warm_start
+)
+from watcher import ScheduleWatcher
+from weather import WEATHER
+from webhook import WEBHOOK_SECRET, WEBHOOK_URL, WebhookServer
+
+load_dotenv()
+bot_token = os.getenv('TOKEN')
+bot = TeleBot(bot_token)
+# Все исходящие сообщения идут через очередь с ограничением скорости.
+sender = SendQueue(bot.send_message)
+
+GROUP_ID = os.getenv('GROUP_CHAT_ID')
+# Способ получения обновлений: 'polling' или 'webhook'.
+BOT_MODE = os.getenv('BOT_MODE', 'polling')
+exit_flag = False  # Флаг для остановки потоков.
+# Сколько ждем доставки уведомления (в секундах).
+DELIVERY_TIMEOUT = 600
+
+
+def deny_unauthorized(message):
+    """Ответ пользователю, которого нет в списке сотрудников."""
+    sender.send(message.chat.id, text=create_unauthorized_message())
+
+
+def warn_rate_limited(message):
+    """Ответ пользователю, который пишет слишком часто."""
+    sender.send(message.chat.id, create_rate_limited_message())
+
+
+# Маршруты по тексту команды или кнопки; middleware - снаружи внутрь.
+router = Router(middlewares=[
+    error_capture,
+    timing,
+    RateLimiter(on_limited=warn_rate_limited),
+    authorization(check_department, deny_unauthorized),
+])
+
+
+@bot.message_handler(func=lambda message: True)
+def handle_message(message):
+    """Все текстовые сообщения обрабатываются через маршрутизатор."""
+    router.dispatch(message)
+
+
+@router.route('/start', name='start', auth=False)
+@profiled('start')
+def start_command(message):
+    """Вывод сообщения и создание клавиатуры, если пользователь "одобрен"."""
+    # Если сообщение пришло из группы.
+    if message.chat.type in ['group', 'supergroup']:
+        group_id = message.chat.id
+        sender.send(group_id, create_group_start_message())
+    # Если сообщение написано лично боту.
+    elif message.chat.type == 'private':
+        user_id = message.chat.id
+        if check_department(user_id):
+            sender.send(
+                user_id,
+                create_start_message(),
+                reply_markup=KEYBOARD
+            )
+        else:
+            sender.send(user_id, text=create_unauthorized_message())
+
+
+@router.route('/stats', name='stats', auth=False)
+@profiled('stats')
+def stats_command(message):
+    """Статистика бота - только для администраторов."""
+    user_id = message.chat.id
+    if ROSTER.is_admin(user_id):
+        sender.send(user_id, create_stats_message())
+    else:
+        sender.send(user_id, create_unknown_command_message())
+
+
+@router.route(GAIN_EMOJI, name='gain')
+@profiled('gain')
+def get_gain(message):
+    """Выдаем данные по сменам."""
+    user_id = message.chat.id
+    text = create_gain_message(user_id)
+
+    sender.send(
+        user_id,
+        text,
+        reply_markup=KEYBOARD
+    )
+
+
+@router.route(DUTY_EMOJI, name='duty')
+@profiled('duty')
+def get_duty(message):
+    """Выдаем данные по дежурству."""
+    user_id = message.chat.id
+    text = create_duty_message(user_id)
+
+    sender.send(
+        user_id,
+        text,
+        reply_markup=KEYBOARD
+    )
+
+
+@router.route(VACATION_EMOJI, name='vacation')
+@profiled('vacation')
+def get_vacation(message):
+    """Выдаем данные по отпуску."""
+    user_id = message.chat.id
+    text = create_vacation_message(user_id)
+
+    sender.send(
+        user_id,
+        text,
+        reply_markup=KEYBOARD
+    )
+
+
+@router.route(CURRENT_MONTH, name='current_month')
+@profiled('current_month')
+def get_current_month_info(message):
+    """Выдаем всю информацию по текущему месяцу."""
+    current_month = get_current_month()
+    user_id = message.chat.id
+    text = create_month_message(user_id, current_month)
+
+    sender.send(
+        user_id,
+        text,
+        reply_markup=KEYBOARD
+    )
+
+
+@router.route(NEXT_MONTH, name='next_month')
+@profiled('next_month')
+def get_next_month_info(message):
+    """Выдаем всю информацию по следующему месяцу."""
+    next_month = get_next_month()
+    user_id = message.chat.id
+    text = create_month_message(user_id, next_month)
+
+    sender.send(
+        user_id,
+        text,
+        reply_markup=KEYBOARD
+    )
+
+
+@router.fallback()
+@profiled('unknown')
+def response_for_message(message):
+    """Обработчик любого текста от пользователя."""
+    sender.send(message.chat.id, create_unknown_command_message())
+
+
+def send_gain_notifications():
+    """
+    Отправка уведомлений о завтрашних сменах и дежурствах.
+
+    Уведомление о смене направляется в общую группу.
+    Уведомление о дежурстве направляется лично пользователю.
+    Сообщения уходят через очередь отправки; дожидаемся доставки
+    и записываем в журнал статус каждого сообщения.
+    """
+    try:
+        (gain_message,
+         user_gain_list) = create_gain_notification_message()
+        (duty_message,
+         user_duty_list) = create_duty_notification_message()
+
+        deliveries = []
+        # Если есть пользователи, у кого завтра смена:
+        if user_gain_list:
+            deliveries.append(sender.send(GROUP_ID, gain_message))
+
+        # Если есть пользователь, у кого завтра дежурство:
+        if user_duty_list:
+            # Ищем его id и направляем сообщение.
+            for user in user_duty_list:
+                user_id = ROSTER.get_id(user[0])
+                if user_id is None:
+                    continue
+                # Дополнили сообщение о дежурстве: в день/ночь
+                message = duty_message + user[1][2]
+                deliveries.append(sender.send(user_id, message))
+
+        for delivery in deliveries:
+            if delivery.wait(timeout=DELIVERY_TIMEOUT):
+                logging.info(
+                    f'В чат {delivery.chat_id} отправлено уведомление '
+                    f'(попыток: {delivery.attempts}).'
+                )
+            else:
+                logging.error(
+                    f'Уведомление в чат {delivery.chat_id} не доставлено: '
+                    f'{delivery.status}, {delivery.error}'
+                )
+
+    except Exception as e:
+        logging.error(f'Ошибка при отправке уведомлений: {e}')
+
+
+def notify_schedule_changes(month, year, changes):
+    """
+    Личные уведомления об изменении графика (после замены xlsx).
+    Сообщения получают только сотрудники, чей график изменился;
+    они уходят через очередь отправки, не дожидаясь доставки.
+    """
+    sent = 0
+    for user_name, user_changes in changes.items():
+        user_id = ROSTER.get_id(user_name)
+        if user_id is None:
+            continue
+        sender.send(
+            user_id,
+            create_schedule_change_message(month, year, user_changes))
+        sent += 1
+    logging.info(
+        f'Уведомления об изменении графика на {month} поставлены '
+        f'в очередь: {sent}.')
+
+
+def send_weather_notification():
+    """Отправка сообщения о погоде в групповые чаты."""
+    try:
+        # Загружаем прогнозы всех мест параллельно.
+        WEATHER.get_all()
+        deliveries = []
+        for chat_id in WEATHER.chats or [GROUP_ID]:
+            weather_message = create_weather_notification_message(chat_id)
+            if weather_message:
+                deliveries.append(sender.send(chat_id, weather_message))
+        for delivery in deliveries:
+            if delivery.wait(timeout=DELIVERY_TIMEOUT):
+                logging.info(
+                    f'Уведомление о погоде отправлено в {delivery.chat_id}')
+            else:
+                logging.error(
+                    f'Уведомление о погоде в {delivery.chat_id} '
+                    f'не доставлено: {delivery.error}')
+    except Exception as e:
+        logging.error(f'Ошибка при отправке погоды: {e}')
+
+
+def create_scheduler(state_file=None, clock=None):
+    """
+    Настройка планировщика уведомлений.
+    Пропущенное (пока бот был выключен) уведомление отправляется,
+    если с момента его запланированной отправки прошло не больше
+    NOTIFICATION_CATCH_UP.
+    """
+    scheduler = Scheduler(clock=clock, state_file=state_file)
+    scheduler.add_job(daily(
+        'gain_notification',
+        send_gain_notifications,
+        NOTIFICATION_TIME,
+        catch_up=NOTIFICATION_CATCH_UP,
+    ))
+    scheduler.add_job(daily(
+        'weather_prefetch',
+        WEATHER.start_prefetch,
+        WEATHER_PREFETCH_TIME,
+        catch_up=NOTIFICATION_CATCH_UP,
+    ))
+    scheduler.add_job(daily(
+        'weather_notification',
+        send_weather_notification,
+        WEATHER_NOTIFICATION_TIME,
+        catch_up=NOTIFICATION_CATCH_UP,
+    ))
+    scheduler.add_job(daily(
+        'render_warm_up',
+        warm_render_cache,
+        RENDER_WARM_UP_TIME,
+        catch_up=NOTIFICATION_CATCH_UP,
+    ))
+    return scheduler
+
+
+def main_polling_thread():
+    """Настройка потока на обработку сообщений от пользователей."""
+    global exit_flag  # По умолчанию False.
+    try:
+        while not exit_flag:
+            bot.infinity_polling(timeout=20, long_polling_timeout=60)
+    except Exception as e:
+        logging.error(f'Ошибка polling: {e}')
+
+
+def start_webhook():
+    """
+    Режим webhook: регистрируем адрес в Telegram и запускаем
+    встроенный HTTP-сервер вместо polling.
+    """
+    # Без WEBHOOK_SECRET сервер не создается (ValueError).
+    server = WebhookServer(bot.process_new_updates)
+    bot.remove_webhook()
+    bot.set_webhook(url=WEBHOOK_URL, secret_token=WEBHOOK_SECRET)
+    server.start()
+    return server
+
+
+if __name__ == "__main__":
+    boot = BootTimer()
+    bot_dir = os.path.dirname(os.path.abspath(__file__))
+    log_path = os.path.join(bot_dir, 'main.log')
+    # Настройки логирования:
+    logging.basicConfig(
+        format=(
+            '%(asctime)s - '
+            '%(levelname)s - '
+            '%(message)s - '
+            '%(name)s - '
+            '%(funcName)s - '
+            '%(lineno)d'
+        ),
+        level=logging.INFO,
+        # Журнал дописывается (а не перезаписывается при запуске)
+        # и делится на файлы по LOG_MAX_BYTES.
+        handlers=[RotatingFileHandler(
+            log_path,
+            maxBytes=LOG_MAX_BYTES,
+            backupCount=LOG_BACKUP_COUNT,
+            encoding='utf-8',
+        )],
+    )
+
+    # Графики текущего и следующего месяца - в кэш до приема сообщений.
+    warm_start()
+    boot.mark('загрузка графиков')
+
+    # Создание потоков.
+    scheduler = create_scheduler(
+        state_file=os.path.join(bot_dir, 'scheduler_state.json'))
+    thread_polling = threading.Thread(target=main_polling_thread)
+    webhook_server = None
+    # Фоновая компиляция графиков: запросы пользователей не читают xlsx.
+    schedule_watcher = ScheduleWatcher(on_change=notify_schedule_changes)
+
+    # Формируем демон-потоки, которые будут завершены автоматически.
+    thread_polling.daemon = True
+
+    # Запуск потоков.
+    schedule_watcher.start()
+    metrics_server = start_metrics_server()
+    scheduler.start()
+    if BOT_MODE == 'webhook':
+        webhook_server = start_webhook()
+    else:
+        thread_polling.start()
+    boot.mark('запуск потоков')
+    logging.info(boot.report())
+
+    try:
+        # Программа ожидает ввода от пользователя для продолжения.
+        input('Нажмите Enter для остановки...\n')
+    except KeyboardInterrupt:
+        pass  # Игнорируем прерывание
+    finally:
+        # Устанавливаем флаг завершения и ждем завершения потоков.
+        exit_flag = True
+        schedule_watcher.stop()
+        scheduler.stop(timeout=5)
+        if webhook_server is not None:
+            webhook_server.stop()
+            bot.remove_webhook()
+        else:
+            bot.stop_polling()
+            thread_polling.join(timeout=5)
+        sender.stop(timeout=5)
+        WEATHER.stop()
+        if metrics_server is not None:
+            metrics_server.stop()
+        logging.info('Работа завершена.')
@@ -0,0 +1,190 @@
+"""
+Компактный бинарный формат скомпилированного графика.
+
+Структура файла:
+- заголовок: сигнатура, версия, год, месяц, количество дней и строк;
+- массив кодов: по одному байту на пару (строка графика, день);
+- таблица Ф.И.О: длина (uint16) + строка в UTF-8 для каждой строки;
+- таблица отпусков: количество записей (uint16) для каждой строки,
+  затем длина (uint16) + строка в UTF-8 для каждой записи.
+
+Файл читается через mmap: массив кодов не копируется в память.
+"""
+import mmap
+import struct
+from collections.abc import Mapping
+from datetime import datetime
+
+from constants import WEEK_DAYS
+
+MAGIC = b'NBSC'
+VERSION = 1
+# Сигнатура, версия, год, месяц, количество дней, количество строк.
+HEADER = struct.Struct('<4sHHBBI')
+LENGTH = struct.Struct('<H')
+
+# Коды событий дня.
+CODE_NONE = 0
+CODE_GAIN = 1
+CODE_DUTY_DAY = 2
+CODE_DUTY_NIGHT = 3
+CODE_VACATION = 4
+
+DUTY_TIME_BY_CODE = {
+    CODE_DUTY_DAY: '☀️ в день',
+    CODE_DUTY_NIGHT: '🌑 в ночь',
+}
+
+
+class CompactSchedule(Mapping):
+    """
+    График в виде массива кодов (строка x день).
+
+    Ведет себя как словарь графика из JSON:
+    {ФИО: {'смена': [...], 'дежурство': [...], 'отпуск': [...]}},
+    поэтому построители сообщений работают с ним без изменений.
+    """
+
+    def __init__(self, year, month, n_days, names, codes, vacations):
+        self.year = year
+        self.month = month
+        self.n_days = n_days
+        self.names = names  # Ф.И.О для каждой строки графика.
+        self.codes = codes  # bytes-подобный объект длиной rows * n_days.
+        self.vacations = vacations  # Тексты отпусков для каждой строки.
+        self.weekdays = [
+            WEEK_DAYS[datetime(year, month, day).weekday()]
+            for day in range(1, n_days + 1)
+        ]
+        # Строки графика одного сотрудника (в порядке таблицы).
+        self._rows = {}
+        for row, name in enumerate(names):
+            self._rows.setdefault(name, []).append(row)
+        self._users = {}  # Уже собранные записи сотрудников.
+        self._mmap = None
+
+    def __getitem__(self, name) -> dict:
+        user = self._users.get(name)
+        if user is None:
+            user = self._build_user(self._rows[name])
+            self._users[name] = user
+        return user
+
+    def __contains__(self, name) -> bool:
+        # Без сборки записи сотрудника (как в Mapping.__contains__).
+        return name in self._rows
+
+    def __iter__(self):
+        return iter(self._rows)
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def user_codes(self, row) -> memoryview:
+        """Коды событий по дням для строки графика."""
+        start = row * self.n_days
+        return memoryview(self.codes)[start:start + self.n_days]
+
+    def codes_of(self, name) -> bytes:
+        """
+        Коды событий сотрудника по дням. Если у сотрудника несколько
+        строк графика, в каждый день берем старший код из его строк.
+        """
+        rows = self._rows[name]
+        if len(rows) == 1:
+            return bytes(self.user_codes(rows[0]))
+        return bytes(map(max, *(self.user_codes(row) for row in rows)))
+
+    def vacations_of(self, name) -> list:
+        """Тексты отпусков сотрудника (по всем его строкам графика)."""
+        return [
+            text for row in self._rows[name] for text in self.vacations[row]
+        ]
+
+    def _build_user(self, rows) -> dict:
+        """Собираем запись сотрудника в формате JSON графика."""
+        user = {'смена': [], 'дежурство': [], 'отпуск': []}
+        for row in rows:
+            for index, code in enumerate(self.user_codes(row)):
+                if code == CODE_GAIN:
+                    user['смена'].append([index + 1, self.weekdays[index]])
+                elif code in DUTY_TIME_BY_CODE:
+                    user['дежурство'].append([
+                        index + 1,
+                        self.weekdays[index],
+                        DUTY_TIME_BY_CODE[code],
+                    ])
+            user['отпуск'].extend(self.vacations[row])
+        return user
+
+    def to_dict(self) -> dict:
+        """Экспорт в словарь графика (для записи в JSON)."""
+        return {name: self[name] for name in self}
+
+    def to_bytes(self) -> bytes:
+        """Сериализуем график в бинарный формат."""
+        parts = [
+            HEADER.pack(MAGIC, VERSION, self.year, self.month,
+                        self.n_days, len(self.names)),
+            bytes(self.codes),
+        ]
+        for name in self.names:
+            parts.append(_pack_string(name))
+        for vacations in self.vacations:
+            parts.append(LENGTH.pack(len(vacations)))
+            parts.extend(_pack_string(str(text)) for text in vacations)
+        return b''.join(parts)
+
+    @classmethod
+    def from_buffer(cls, buffer) -> 'CompactSchedule':
+        """Читаем график из буфера (bytes или mmap) без копирования кодов."""
+        magic, version, year, month, n_days, n_rows = (
+            HEADER.unpack_from(buffer, 0))
+        if magic != MAGIC or version != VERSION:
+            raise ValueError('Неизвестный формат файла графика.')
+
+        offset = HEADER.size
+        codes = memoryview(buffer)[offset:offset + n_rows * n_days]
+        offset += n_rows * n_days
+
+        names = []
+        for _ in range(n_rows):
+            name, offset = _unpack_string(buffer, offset)
+            names.append(name)
+
+        vacations = []
+        for _ in range(n_rows):
+            (count,) = LENGTH.unpack_from(buffer, offset)
+            offset += LENGTH.size
+            row_vacations = []
+            for _ in range(count):
+                text, offset = _unpack_string(buffer, offset)
+                row_vacations.append(text)
+            vacations.append(row_vacations)
+
+        return cls(year, month, n_days, names, codes, vacations)
+
+    @classmethod
+    def load(cls, filepath, use_mmap=True) -> 'CompactSchedule':
+        """Загружаем график из файла (по умолчанию - через mmap)."""
+        with open(filepath, 'rb') as file:
+            if not use_mmap:
+                return cls.from_buffer(file.read())
+            buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        schedule = cls.from_buffer(buffer)
+        schedule._mmap = buffer
+        return schedule
+
+
+def _pack_string(text) -> bytes:
+    """Строка в UTF-8 с длиной в начале."""
+    data = text.encode('utf-8')
+    return LENGTH.pack(len(data)) + data
+
+
+def _unpack_string(buffer, offset) -> tuple:
+    """Читаем строку с длиной в начале. Возвращаем строку и новое смещение."""
+    (length,) = LENGTH.unpack_from(buffer, offset)
+    offset += LENGTH.size
+    text = bytes(buffer[offset:offset + length]).decode('utf-8')
+    return text, offset + length
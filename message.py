@@ -1,239 +1,515 @@
-import json
-import os
-from datetime import datetime, timedelta
-
-from dotenv import load_dotenv
-
-from constants import (
-    DUTY_EMOJI,
-    GAIN_EMOJI,
-    MONTHS,
-    VACATION_EMOJI,
-    WEATHER_TIMES
-)
-from notification import create_notification_list, parse_weather_notification
-from utils import get_schedule
-
-load_dotenv()
-DEPARTMENT = json.loads(os.environ['DEPARTMENT_IDS'])
-BOSS_LIST = json.loads(os.environ['BOSS_LIST'])
-
-
-def create_gain_message(user_id) -> str:
-    """Создаем сообщение по сменам."""
-    today = datetime.now().day
-    current_month = MONTHS.get(str(datetime.now().month))
-    schedule = get_schedule(current_month)
-
-    # Получаем Ф.И.О пользователя, который написал боту:
-    user_name = DEPARTMENT.get(str(user_id))
-    user_gains = []
-    if schedule:
-        user_gains = schedule[user_name]['смена']
-        boss_gains = {}  # Создали словарь смен босов.
-        for boss in BOSS_LIST:
-            boss_gains[boss] = schedule[boss]['смена']
-    else:
-        message = f'График на {current_month} не загружен'
-        return message
-
-    # Составляем сообщение:
-    future_gains = False  # Флаг для определения будущих смен.
-    message = f'{GAIN_EMOJI} Cмены на {current_month}:\n'
-
-    if user_gains:
-        for [date, weekday] in user_gains:
-            formated_date = f'- {int(date)} ({weekday}) '
-
-            if int(date) >= today:  # Прошедшие дни не учитываем.
-                future_gains = True
-                message += f'\n{formated_date}, ответственный: '
-                for boss, gains in boss_gains.items():
-                    if [date, weekday] in gains:
-                        message += f'{boss}, '
-                # Убираем: ", " у крайнего ответственного.
-                message = message[:-2]
-
-    else:
-        future_gains = False
-
-    if not future_gains:
-        message += '✅ закончились.'
-    return message
-
-
-def create_duty_message(user_id) -> str:
-    """Создаем сообщение по дежурствам."""
-    today = datetime.now().day
-    current_month = MONTHS.get(str(datetime.now().month))
-    schedule = get_schedule(current_month)
-
-    # Получаем Ф.И.О пользователя, который написал боту:
-    user_name = DEPARTMENT.get(str(user_id))
-    user_duties = []
-    if schedule:
-        user_duties = schedule[user_name]['дежурство']
-    else:
-        message = f'График на {current_month} не загружен'
-        return message
-
-    # Составляем сообщение:
-    future_duties = False  # Флаг для определения будущих смен.
-    message = f'{DUTY_EMOJI} Дежурства на {current_month}:\n\n'
-
-    if user_duties:
-        for (date, weekday, time) in user_duties:
-            formated_date = f'- {int(date)} ({weekday}), {time} '
-
-            if int(date) >= today:  # Прошедшие дни не учитываем.
-                future_duties = True
-                message += f'{formated_date}\n'
-    else:
-        future_duties = False
-
-    if not future_duties:
-        message += '✅ закончились.'
-    return message
-
-
-def create_vacation_message(user_id) -> str:
-    """Создаем сообщение с информацией об отпуске."""
-    current_month = MONTHS.get(str(datetime.now().month))
-    schedule = get_schedule(current_month)
-
-    # Получаем Ф.И.О пользователя, который написал боту:
-    user_name = DEPARTMENT.get(str(user_id))
-    if schedule:
-        user_vacation = schedule[user_name]['отпуск']
-    else:
-        message = f'График на {current_month} не загружен'
-        return message
-
-    # Формируем сообщение:
-    message = str()
-    if not user_vacation:
-        message += f'{current_month}: 😔 отпуска нет.'
-    else:
-        for vacation in user_vacation:
-            message += f'{VACATION_EMOJI} {vacation.capitalize()}\n'
-
-    return message
-
-
-def create_month_message(user_id, month):
-    """
-    Создаем сообщение с графиком текущего месяца.
-    """
-    schedule = get_schedule(month)  # Получаем график.
-    if not schedule:
-        message = f'График на {month} еще не подготовлен'
-        return message
-
-    # Получаем Ф.И.О пользователя, который написал боту:
-    user_name = DEPARTMENT.get(str(user_id))
-    user_shedule = schedule[user_name]
-
-    message = f'График на {month}:\n'
-
-    # Перебираем смены:
-    gain_list = user_shedule['смена']
-    if gain_list:
-        message += f'\n{GAIN_EMOJI} Cмены:\n'
-        for (date, weekday) in gain_list:
-            formated_date = f'- {int(date)} ({weekday}) '
-            message += f'{formated_date}\n'
-    else:
-        message += f'{GAIN_EMOJI} Cмены:✅ отсутствуют\n\n'
-
-    # Перебираем дежурства:
-    duty_list = user_shedule['дежурство']
-    if duty_list:
-        message += f'\n{DUTY_EMOJI} Дежурства:\n'
-        for (date, weekday, time) in duty_list:
-            formated_date = f'- {int(date)} ({weekday}), {time} '
-            message += f'{formated_date}\n'
-    else:
-        message += f'\n{DUTY_EMOJI} Дежурства:✅ отсутствуют\n'
-
-    # Перебираем отпуска:
-    vacation_list = user_shedule['отпуск']
-    if vacation_list:
-        for vacation in vacation_list:
-            message += f'\n{VACATION_EMOJI} {vacation.capitalize()}\n'
-    else:
-        message += '\n😔 отпуска нет.'
-
-    return message
-
-
-def create_gain_notification_message():
-    """
-    Создаем сообщение для уведомления о смене.
-    """
-    next_day = datetime.now() + timedelta(days=1)  # Например: 16
-    next_day_format = next_day.strftime('%d.%m.%Y')  # Например: 16.04.2025
-    # Получаем список у кого завтра смена.
-    user_list, _ = create_notification_list()
-
-    # Cообщение c ответственным:
-    boss_list = []
-    employee_list = []
-    for user in user_list:
-        if user in BOSS_LIST:
-            boss_list.append(user)
-        else:
-            employee_list.append(user)
-    message_with_boss = ', '.join(boss_list)
-
-    # Основное сообщение:
-    message = (f'{GAIN_EMOJI} Завтра {next_day_format}\n\n'
-               'Cмена у следующих лиц:\n')
-    message += '\n'.join(f'- {name}' for name in employee_list)
-    message += f'\n\nОтветственный: {message_with_boss}'
-    return message, user_list
-
-
-def create_duty_notification_message():
-    """
-    Создаем сообщение для уведомления о дежурстве.
-    """
-    next_day = datetime.now() + timedelta(days=1)  # Например: 16
-    next_day_format = next_day.strftime('%d.%m.%Y')  # Например: 16.04.2025
-    # Получаем список у кого завтра дежурство.
-    _, user_list = create_notification_list()
-
-    # Основное сообщение:
-    message = (f'{DUTY_EMOJI} Завтра {next_day_format}\n\n '
-               'У тебя запланировано дежурство: ')
-    return message, user_list
-
-
-def create_weather_notification_message():
-    """
-    Создаем сообщение для уведомления о погоде.
-    """
-    today = datetime.now().strftime("%d.%m.%Y")
-
-    weather_list, temperatures_list = parse_weather_notification()
-    message = ''
-    if weather_list and temperatures_list:
-        message = (
-            f'Сегодня: {today}\n\n'
-            '💫Погода за окном:\n\n'
-        )
-
-        for index in range(len(WEATHER_TIMES)):
-            time = WEATHER_TIMES[index]
-            description = weather_list[index]
-            temperature = temperatures_list[index]
-            temperature_mess = f't={temperature} °C'
-            # Редактируем вывод информации в тлг.
-            if len(temperature_mess) == 6:
-                temperature_mess += '   '
-            elif len(temperature_mess) == 7:
-                temperature_mess += ' '
-            message += (
-                f'{time}:        {temperature_mess}       {description}\n'
-            )
-
-    return message
+import logging
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+from dotenv import load_dotenv
+from telebot.types import KeyboardButton, ReplyKeyboardMarkup
+
+from compact_schedule import (
+    CODE_DUTY_DAY,
+    CODE_DUTY_NIGHT,
+    CODE_GAIN,
+    CODE_NONE,
+    DUTY_TIME_BY_CODE
+)
+from constants import (
+    CURRENT_MONTH,
+    DUTY_EMOJI,
+    GAIN_EMOJI,
+    MONTHS,
+    NEXT_MONTH,
+    NOTIFICATION_TIME,
+    VACATION_EMOJI,
+    WEATHER_NOTIFICATION_TIME,
+    WEATHER_TIMES,
+    WEEK_DAYS
+)
+from metrics import summary
+from notification import create_notification_list, parse_weather_notification
+from roster import ROSTER
+from utils import (
+    MONTH_NUMBERS,
+    get_current_month,
+    get_day_events,
+    get_next_event,
+    get_next_month,
+    get_schedule,
+    get_schedule_cache_stats,
+    get_schedule_version,
+    get_timeline,
+    get_user_schedule
+)
+
+load_dotenv()
+# Логирование.
+logger = logging.getLogger(__name__)
+
+# Кэш готовых ответов на кнопки. Ключ - (пользователь, вид ответа, месяц,
+# день, версия графика, версия ленты событий, версия справочника).
+# При переполнении вытесняются давно не запрошенные ответы.
+_RENDER_CACHE = OrderedDict()
+_RENDER_LOCK = threading.Lock()
+_RENDER_DAY = None  # День, за который собраны ответы в кэше.
+# Наименьший размер кэша (ответов); кэш вмещает и все ответы
+# справочника: сотрудников x RENDER_VIEWS.
+RENDER_CACHE_SIZE = 10000
+# Видов ответа на сотрудника (кнопок), см. warm_render_cache.
+RENDER_VIEWS = 5
+# Счетчики попаданий и промахов кэша ответов.
+RENDER_STATS = {'hits': 0, 'misses': 0}
+# Код события дня -> описание в сообщении об изменении графика.
+CHANGE_EVENTS = {
+    CODE_NONE: 'выходной',
+    CODE_GAIN: 'смена',
+    CODE_DUTY_DAY: f'дежурство {DUTY_TIME_BY_CODE[CODE_DUTY_DAY]}',
+    CODE_DUTY_NIGHT: f'дежурство {DUTY_TIME_BY_CODE[CODE_DUTY_NIGHT]}',
+}
+
+
+def create_keyboard():
+    """
+    Оформление клавиатуры.
+    Параметр exlude - строка с названием кнопки, которую надо исключить.
+    """
+    keyboard = ReplyKeyboardMarkup(resize_keyboard=True)
+    button_gain = KeyboardButton(GAIN_EMOJI)
+    button_duty = KeyboardButton(DUTY_EMOJI)
+    button_vacation = KeyboardButton(VACATION_EMOJI)
+    button_current_month = KeyboardButton(CURRENT_MONTH)
+    button_next_month = KeyboardButton(NEXT_MONTH)
+    keyboard.row(button_gain, button_duty, button_vacation)
+    keyboard.row(button_current_month, button_next_month)
+
+    return keyboard
+
+
+# Клавиатура одна для всех ответов - собираем ее один раз.
+KEYBOARD = create_keyboard()
+
+
+def create_group_start_message() -> str:
+    """Создаем приветствие для группового чата."""
+    return (
+        'Привет! 👋\n'
+        '🤖: Мои возможности в групповом чате ограничены.\n\n'
+        '⏱️ Если завтра на работу, то пришлю тебе уведомление '
+        f'в {NOTIFICATION_TIME.strftime("%H:%M")}\n'
+        f'⏱️ Утром, в {WEATHER_NOTIFICATION_TIME.strftime("%H:%M")} '
+        'пришлю текущую погоду.\n\n'
+        'Чтобы посмотреть личную информацию из графика,\n'
+        'напишите мне в личном сообщении: 📲 @grafik_4o_bot'
+    )
+
+
+def create_start_message() -> str:
+    """Создаем приветствие для "одобренного" пользователя."""
+    return (
+        '👋 Добро пожаловать в главный интерфейс бота.\n\n'
+
+        'Вот список доступных команд:\n'
+        f'- {GAIN_EMOJI} Узнать когда будущие смены\n'
+        f'- {DUTY_EMOJI} Посмотреть данные о планируемом дежурстве\n'
+        f'- {VACATION_EMOJI} Проверить наличие отпуска в этом месяце\n'
+        f'- {CURRENT_MONTH} Увидеть свой график на текущий месяц\n'
+        f'- {NEXT_MONTH} И на следующий месяц, если он подготовлен\n'
+    )
+
+
+def create_unauthorized_message() -> str:
+    """Создаем сообщение для неизвестного пользователя."""
+    return (
+        'Этот 🤖 бот доступен только ограниченному кругу лиц.'
+        'Чтобы тебя авторизовали, обратись к @Zulfat_Gafurzyanov'
+    )
+
+
+def create_unknown_command_message() -> str:
+    """Создаем ответ на текст, который не является командой."""
+    return '🤖: Я могу отвечать только на команды, которые есть в меню.'
+
+
+def create_rate_limited_message() -> str:
+    """Создаем ответ пользователю, который пишет слишком часто."""
+    return '🤖: Слишком много запросов. Подожди немного и повтори.'
+
+
+def create_stats_message() -> str:
+    """Создаем отчет по метрикам бота (для администраторов)."""
+    lines = ['📊 Статистика бота:']
+    for title, stats in (('Кэш ответов', get_render_cache_stats()),
+                         ('Кэш графиков', get_schedule_cache_stats())):
+        lines.append(
+            f'{title}: {stats["hit_rate"]:.0%} попаданий '
+            f'({stats["hits"]}/{stats["hits"] + stats["misses"]}), '
+            f'записей: {stats["size"]}')
+    for name, labels, value in summary():
+        label = ', '.join(labels.values())
+        lines.append(f'{name}[{label}]: {value}' if label else
+                     f'{name}: {value}')
+    return '\n'.join(lines)
+
+
+def _render_key(user_id, view, month, today) -> tuple:
+    return (str(user_id), view, month, today, get_schedule_version(month),
+            get_timeline().version, ROSTER.version)
+
+
+def _render(user_id, view, month, build) -> str:
+    """
+    Получаем ответ пользователю из кэша или собираем его функцией build.
+    Ответ зависит от дня (прошедшие дни не показываем), версии графика
+    и версии справочника - они входят в ключ кэша.
+    """
+    today = datetime.now().day
+    key = _render_key(user_id, view, month, today)
+    with _RENDER_LOCK:
+        message = _RENDER_CACHE.get(key)
+        if message is not None:
+            _RENDER_CACHE.move_to_end(key)
+            RENDER_STATS['hits'] += 1
+            return message
+        RENDER_STATS['misses'] += 1
+
+    message = build(user_id, month)
+    # Сборка могла загрузить график или ленту событий (их версии
+    # выросли) - сохраняем ответ под актуальными версиями.
+    key = _render_key(user_id, view, month, today)
+
+    global _RENDER_DAY
+    with _RENDER_LOCK:
+        # Наступил новый день - ответы за прошлый день не нужны.
+        if today != _RENDER_DAY:
+            _RENDER_CACHE.clear()
+            _RENDER_DAY = today
+        _RENDER_CACHE[key] = message
+        limit = max(RENDER_CACHE_SIZE, len(ROSTER) * RENDER_VIEWS)
+        while len(_RENDER_CACHE) > limit:
+            _RENDER_CACHE.popitem(last=False)
+    return message
+
+
+def get_render_cache_stats() -> dict:
+    """Получаем статистику кэша ответов."""
+    with _RENDER_LOCK:
+        hits = RENDER_STATS['hits']
+        misses = RENDER_STATS['misses']
+        size = len(_RENDER_CACHE)
+    total = hits + misses
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_rate': hits / total if total else 0.0,
+        'size': size,
+    }
+
+
+def clear_render_cache():
+    """Очищаем кэш ответов."""
+    with _RENDER_LOCK:
+        _RENDER_CACHE.clear()
+
+
+def warm_render_cache() -> int:
+    """
+    Заранее собираем ответы на все кнопки для всех сотрудников
+    (например, перед утренним наплывом запросов).
+    Возвращаем количество собранных ответов.
+    """
+    current_month = get_current_month()
+    next_month = get_next_month()
+    # Сначала загружаем оба графика: загрузка меняет версии в ключах
+    # кэша, и ответы, собранные до нее, в кэше бы не нашлись.
+    get_schedule(current_month)
+    get_schedule(next_month)
+    count = 0
+    for user_id in list(ROSTER.users):
+        try:
+            create_gain_message(user_id)
+            create_duty_message(user_id)
+            create_vacation_message(user_id)
+            create_month_message(user_id, current_month)
+            create_month_message(user_id, next_month)
+        except Exception as e:
+            logging.error(
+                f'Ошибка при подготовке ответов для {user_id}: {e}')
+            continue
+        count += RENDER_VIEWS
+    stats = get_render_cache_stats()
+    logging.info(
+        f'Кэш ответов подготовлен: {count} ответов, '
+        f'попаданий {stats["hit_rate"]:.0%}')
+    return count
+
+
+def create_gain_message(user_id) -> str:
+    """Создаем сообщение по сменам."""
+    current_month = MONTHS.get(str(datetime.now().month))
+    return _render(user_id, 'gain', current_month, _build_gain_message)
+
+
+def _build_gain_message(user_id, current_month) -> str:
+    """Собираем сообщение по сменам."""
+    now = datetime.now()
+    today = now.day
+
+    # Получаем Ф.И.О пользователя, который написал боту:
+    user_name = ROSTER.get_name(user_id)
+    user_schedule = get_user_schedule(user_name, current_month)
+    if user_schedule is None:
+        message = f'График на {current_month} не загружен'
+        return message
+    user_gains = user_schedule['смена']
+
+    # Составляем сообщение:
+    parts = [f'{GAIN_EMOJI} Cмены на {current_month}:\n']
+    for [date, weekday] in user_gains:
+        if int(date) < today:  # Прошедшие дни не учитываем.
+            continue
+        formated_date = f'- {int(date)} ({weekday}) '
+        # Ответственные за эту дату.
+        bosses = get_day_events(
+            now.replace(day=int(date)))['ответственные']
+        if bosses:
+            parts.append(
+                f'\n{formated_date}, ответственный: {", ".join(bosses)}')
+        else:
+            # Без ": ", если ответственного нет.
+            parts.append(f'\n{formated_date}, ответственный')
+
+    if len(parts) == 1:  # Будущих смен нет.
+        parts.append('✅ закончились.')
+        parts.append(_next_event_line(user_name, 'смена', 'Следующая смена'))
+    return ''.join(parts)
+
+
+def _next_event_line(user_name, kind, title) -> str:
+    """
+    Строка о ближайшем событии в следующих месяцах (из ленты событий
+    или базы графиков). Пустая строка, если следующие месяцы еще
+    не загружены.
+    """
+    now = datetime.now()
+    next_month = (now.replace(day=1) + timedelta(days=32)).replace(day=1)
+    event = get_next_event(user_name, kind, next_month)
+    if event is None:
+        return ''
+    day, shift = event
+    weekday = WEEK_DAYS[day.weekday()]
+    line = f'\n{title}: {day.strftime("%d.%m.%Y")} ({weekday})'
+    if shift:
+        line += f', {shift}'
+    return line
+
+
+def create_duty_message(user_id) -> str:
+    """Создаем сообщение по дежурствам."""
+    current_month = MONTHS.get(str(datetime.now().month))
+    return _render(user_id, 'duty', current_month, _build_duty_message)
+
+
+def _build_duty_message(user_id, current_month) -> str:
+    """Собираем сообщение по дежурствам."""
+    today = datetime.now().day
+
+    # Получаем Ф.И.О пользователя, который написал боту:
+    user_name = ROSTER.get_name(user_id)
+    user_schedule = get_user_schedule(user_name, current_month)
+    if user_schedule is None:
+        message = f'График на {current_month} не загружен'
+        return message
+    user_duties = user_schedule['дежурство']
+
+    # Составляем сообщение:
+    parts = [f'{DUTY_EMOJI} Дежурства на {current_month}:\n\n']
+    for (date, weekday, time) in user_duties:
+        if int(date) >= today:  # Прошедшие дни не учитываем.
+            parts.append(f'- {int(date)} ({weekday}), {time} \n')
+
+    if len(parts) == 1:  # Будущих дежурств нет.
+        parts.append('✅ закончились.')
+        parts.append(
+            _next_event_line(user_name, 'дежурство', 'Следующее дежурство'))
+    return ''.join(parts)
+
+
+def create_vacation_message(user_id) -> str:
+    """Создаем сообщение с информацией об отпуске."""
+    current_month = MONTHS.get(str(datetime.now().month))
+    return _render(
+        user_id, 'vacation', current_month, _build_vacation_message)
+
+
+def _build_vacation_message(user_id, current_month) -> str:
+    """Собираем сообщение с информацией об отпуске."""
+    # Получаем Ф.И.О пользователя, который написал боту:
+    user_name = ROSTER.get_name(user_id)
+    user_schedule = get_user_schedule(user_name, current_month)
+    if user_schedule is None:
+        message = f'График на {current_month} не загружен'
+        return message
+    user_vacation = user_schedule['отпуск']
+
+    # Формируем сообщение:
+    if not user_vacation:
+        return f'{current_month}: 😔 отпуска нет.'
+    return ''.join(
+        f'{VACATION_EMOJI} {vacation.capitalize()}\n'
+        for vacation in user_vacation
+    )
+
+
+def create_month_message(user_id, month):
+    """
+    Создаем сообщение с графиком текущего месяца.
+    """
+    return _render(user_id, 'month', month, _build_month_message)
+
+
+def _build_month_message(user_id, month) -> str:
+    """Собираем сообщение с графиком на месяц."""
+    # Получаем Ф.И.О пользователя, который написал боту:
+    user_name = ROSTER.get_name(user_id)
+    user_shedule = get_user_schedule(user_name, month)  # Получаем график.
+    if user_shedule is None:
+        message = f'График на {month} еще не подготовлен'
+        return message
+
+    parts = [f'График на {month}:\n']
+
+    # Перебираем смены:
+    gain_list = user_shedule['смена']
+    if gain_list:
+        parts.append(f'\n{GAIN_EMOJI} Cмены:\n')
+        parts.extend(
+            f'- {int(date)} ({weekday}) \n' for (date, weekday) in gain_list)
+    else:
+        parts.append(f'{GAIN_EMOJI} Cмены:✅ отсутствуют\n\n')
+
+    # Перебираем дежурства:
+    duty_list = user_shedule['дежурство']
+    if duty_list:
+        parts.append(f'\n{DUTY_EMOJI} Дежурства:\n')
+        parts.extend(
+            f'- {int(date)} ({weekday}), {time} \n'
+            for (date, weekday, time) in duty_list
+        )
+    else:
+        parts.append(f'\n{DUTY_EMOJI} Дежурства:✅ отсутствуют\n')
+
+    # Перебираем отпуска:
+    vacation_list = user_shedule['отпуск']
+    if vacation_list:
+        parts.extend(
+            f'\n{VACATION_EMOJI} {vacation.capitalize()}\n'
+            for vacation in vacation_list
+        )
+    else:
+        parts.append('\n😔 отпуска нет.')
+
+    return ''.join(parts)
+
+
+def create_gain_notification_message():
+    """
+    Создаем сообщение для уведомления о смене.
+    """
+    next_day = datetime.now() + timedelta(days=1)  # Например: 16
+    next_day_format = next_day.strftime('%d.%m.%Y')  # Например: 16.04.2025
+    # Получаем список у кого завтра смена.
+    user_list, _ = create_notification_list()
+
+    # Cообщение c ответственным:
+    boss_list = []
+    employee_list = []
+    for user in user_list:
+        if ROSTER.is_boss(user):
+            boss_list.append(user)
+        else:
+            employee_list.append(user)
+    message_with_boss = ', '.join(boss_list)
+
+    # Основное сообщение:
+    message = (f'{GAIN_EMOJI} Завтра {next_day_format}\n\n'
+               'Cмена у следующих лиц:\n')
+    message += '\n'.join(f'- {name}' for name in employee_list)
+    message += f'\n\nОтветственный: {message_with_boss}'
+    return message, user_list
+
+
+def create_duty_notification_message():
+    """
+    Создаем сообщение для уведомления о дежурстве.
+    """
+    next_day = datetime.now() + timedelta(days=1)  # Например: 16
+    next_day_format = next_day.strftime('%d.%m.%Y')  # Например: 16.04.2025
+    # Получаем список у кого завтра дежурство.
+    _, user_list = create_notification_list()
+
+    # Основное сообщение:
+    message = (f'{DUTY_EMOJI} Завтра {next_day_format}\n\n '
+               'У тебя запланировано дежурство: ')
+    return message, user_list
+
+
+def create_schedule_change_message(month, year, changes) -> str:
+    """
+    Создаем личное сообщение об изменении графика сотрудника
+    (изменения - из schedule_diff.diff_schedules).
+    """
+    month_number = MONTH_NUMBERS[month]
+    lines = [f'📝 Изменился график на {month}:']
+    for day, before, after in changes['days']:
+        event_date = datetime(year, month_number, day)
+        lines.append(
+            f'{event_date.strftime("%d.%m.%Y")} '
+            f'({WEEK_DAYS[event_date.weekday()]}): '
+            f'{CHANGE_EVENTS.get(before, "выходной")} → '
+            f'{CHANGE_EVENTS.get(after, "выходной")}')
+    if changes['vacations'] is not None:
+        vacations = changes['vacations'][1]
+        lines.append(
+            f'{VACATION_EMOJI} Отпуск: '
+            f'{", ".join(map(str, vacations)) if vacations else "нет"}')
+    return '\n'.join(lines)
+
+
+def create_weather_notification_message(chat_id=None):
+    """
+    Создаем сообщение для уведомления о погоде в групповой чат.
+    Если для чата настроено несколько мест - прогноз по каждому.
+    """
+    today = datetime.now().strftime("%d.%m.%Y")
+
+    forecasts = [
+        (name, forecast)
+        for name, forecast in parse_weather_notification(chat_id)
+        if forecast and forecast[0] and forecast[1]
+    ]
+    message = ''
+    if forecasts:
+        message = f'Сегодня: {today}\n\n'
+
+    for number, (name, forecast) in enumerate(forecasts):
+        weather_list, temperatures_list = forecast
+        if number:
+            message += '\n'
+        if len(forecasts) > 1:
+            message += f'📍 {name}\n'
+        message += '💫Погода за окном:\n\n'
+
+        for index in range(len(WEATHER_TIMES)):
+            time = WEATHER_TIMES[index]
+            description = weather_list[index]
+            temperature = temperatures_list[index]
+            temperature_mess = f't={temperature} °C'
+            # Редактируем вывод информации в тлг.
+            if len(temperature_mess) == 6:
+                temperature_mess += '   '
+            elif len(temperature_mess) == 7:
+                temperature_mess += ' '
+            message += (
+                f'{time}:        {temperature_mess}       {description}\n'
+            )
+
+    return message
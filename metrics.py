@@ -0,0 +1,418 @@
+"""
+Метрики горячих путей бота.
+
+Счетчики и гистограммы хранятся в памяти процесса; запись значения -
+это одна блокировка и поиск корзины через bisect, поэтому метрики
+можно не выключать в работе. Наружу метрики отдаются:
+- в текстовом формате Prometheus через HTTP-сервер на localhost
+  (запускается, если задан METRICS_PORT): GET /metrics;
+- кратким отчетом для администраторов (команда /stats).
+"""
+import functools
+import inspect
+import logging
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+
+from dotenv import load_dotenv
+
+load_dotenv()
+# Логирование.
+logger = logging.getLogger(__name__)
+
+METRICS_HOST = os.getenv('METRICS_HOST', '127.0.0.1')
+# Порт HTTP-сервера метрик (не задан - сервер не запускается).
+METRICS_PORT = os.getenv('METRICS_PORT')
+METRICS_PATH = '/metrics'
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+# Границы корзин гистограмм по умолчанию (в секундах).
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5,
+           10, 30, 60)
+
+
+def _format_value(value) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value)
+
+
+def _format_labels(names, values, extra=()) -> str:
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ''
+    labels = ','.join(
+        '{}="{}"'.format(
+            name,
+            str(value).replace('\\', r'\\').replace('"', r'\"')
+            .replace('\n', r'\n'))
+        for name, value in pairs)
+    return '{' + labels + '}'
+
+
+class Metric(ABC):
+    """Метрика с набором меток: значения хранятся по кортежу меток."""
+
+    kind = 'untyped'
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels) -> tuple:
+        return tuple(str(labels.get(name, '')) for name in self.labelnames)
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+
+    @abstractmethod
+    def samples(self) -> list:
+        """
+        Строки метрики: (суффикс имени, значения меток,
+        дополнительные метки, значение).
+        """
+
+    def render(self) -> list:
+        """Строки метрики в текстовом формате Prometheus."""
+        lines = [
+            f'# HELP {self.name} {self.documentation}',
+            f'# TYPE {self.name} {self.kind}',
+        ]
+        for suffix, labels, extra, value in self.samples():
+            lines.append(
+                f'{self.name}{suffix}'
+                f'{_format_labels(self.labelnames, labels, extra)} '
+                f'{_format_value(value)}')
+        return lines
+
+
+class Counter(Metric):
+    """Счетчик: только растет."""
+
+    kind = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+    def samples(self) -> list:
+        with self._lock:
+            return [('', key, (), value)
+                    for key, value in sorted(self._values.items())]
+
+
+class _HistogramValue:
+    """Значения гистограммы для одного набора меток."""
+
+    __slots__ = ('buckets', 'count', 'sum')
+
+    def __init__(self, size):
+        self.buckets = [0] * size
+        self.count = 0
+        self.sum = 0.0
+
+
+class _Timer:
+    """Замер времени блока кода для гистограммы."""
+
+    __slots__ = ('histogram', 'labels', 'started')
+
+    def __init__(self, histogram, labels):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.histogram.observe(
+            time.perf_counter() - self.started, **self.labels)
+
+
+class Histogram(Metric):
+    """
+    Гистограмма (обычно - длительностей в секундах).
+    Корзины хранятся без накопления, суммируются при выводе.
+    """
+
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        # Последняя корзина - значения больше всех границ (+Inf).
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            histogram = self._values.get(key)
+            if histogram is None:
+                histogram = self._values[key] = _HistogramValue(
+                    len(self.buckets) + 1)
+            histogram.buckets[index] += 1
+            histogram.count += 1
+            histogram.sum += value
+
+    def time(self, **labels) -> _Timer:
+        """Контекстный менеджер: with HISTOGRAM.time(метка=...): ..."""
+        return _Timer(self, labels)
+
+    def snapshot(self) -> dict:
+        """Копия значений: кортеж меток -> (корзины, количество, сумма)."""
+        with self._lock:
+            return {
+                key: (list(value.buckets), value.count, value.sum)
+                for key, value in self._values.items()
+            }
+
+    def samples(self) -> list:
+        samples = []
+        for key, (buckets, count, total) in sorted(self.snapshot().items()):
+            cumulative = 0
+            for bound, bucket in zip(self.buckets + (float('inf'),),
+                                     buckets):
+                cumulative += bucket
+                samples.append(
+                    ('_bucket', key, (('le', _format_value(
+                        float(bound))),), cumulative))
+            samples.append(('_sum', key, (), total))
+            samples.append(('_count', key, (), count))
+        return samples
+
+
+def _bucket_quantile(bounds, value, q):
+    buckets, count, _ = value
+    if not count:
+        return None
+    rank = q * count
+    cumulative = 0
+    for bound, bucket in zip(bounds + (float('inf'),), buckets):
+        cumulative += bucket
+        if cumulative >= rank:
+            return bound
+    return float('inf')
+
+
+class Registry:
+    """Набор метрик процесса."""
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric) -> Metric:
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f'Метрика {metric.name} уже есть')
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, documentation, labelnames=()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(),
+                  buckets=BUCKETS) -> Histogram:
+        return self.register(
+            Histogram(name, documentation, labelnames, buckets))
+
+    def metrics(self) -> list:
+        with self._lock:
+            return list(self._metrics.values())
+
+    def render(self) -> str:
+        """Все метрики в текстовом формате Prometheus."""
+        lines = []
+        for metric in self.metrics():
+            lines += metric.render()
+        return '\n'.join(lines) + '\n'
+
+    def clear(self):
+        for metric in self.metrics():
+            metric.clear()
+
+
+REGISTRY = Registry()
+
+HANDLER_SECONDS = REGISTRY.histogram(
+    'bot_handler_seconds', 'Время обработки сообщения', ('handler',))
+HANDLER_ERRORS = REGISTRY.counter(
+    'bot_handler_errors_total', 'Ошибки обработчиков сообщений',
+    ('handler',))
+HANDLER_REJECTED = REGISTRY.counter(
+    'bot_handler_rejected_total',
+    'Сообщения, не дошедшие до обработчика, по причине', ('reason',))
+SCHEDULE_LOAD_SECONDS = REGISTRY.histogram(
+    'bot_schedule_load_seconds',
+    'Время чтения скомпилированного графика с диска')
+SCHEDULE_COMPILE_SECONDS = REGISTRY.histogram(
+    'bot_schedule_compile_seconds', 'Время компиляции графика из xlsx')
+WEATHER_FETCH_SECONDS = REGISTRY.histogram(
+    'bot_weather_fetch_seconds', 'Время загрузки прогноза погоды',
+    ('location',))
+WEATHER_ERRORS = REGISTRY.counter(
+    'bot_weather_errors_total', 'Ошибки загрузки прогноза погоды',
+    ('location',))
+SEND_SECONDS = REGISTRY.histogram(
+    'bot_send_seconds',
+    'Время от постановки сообщения в очередь до завершения отправки',
+    ('status',))
+SEND_ATTEMPTS = REGISTRY.counter(
+    'bot_send_attempts_total', 'Попытки отправки сообщений по результату',
+    ('result',))
+SCHEDULER_LAG_SECONDS = REGISTRY.histogram(
+    'bot_scheduler_lag_seconds',
+    'Задержка запуска задачи планировщика относительно расписания',
+    ('job',))
+SCHEDULER_ERRORS = REGISTRY.counter(
+    'bot_scheduler_errors_total', 'Ошибки задач планировщика', ('job',))
+
+
+def instrumented(handler_name):
+    """
+    Декоратор обработчика сообщений: время обработки и ошибки.
+    Подходит и для обычных функций, и для корутин.
+    """
+    def decorator(func):
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                started = time.perf_counter()
+                try:
+                    return await func(*args, **kwargs)
+                except Exception:
+                    HANDLER_ERRORS.inc(handler=handler_name)
+                    raise
+                finally:
+                    HANDLER_SECONDS.observe(
+                        time.perf_counter() - started, handler=handler_name)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            except Exception:
+                HANDLER_ERRORS.inc(handler=handler_name)
+                raise
+            finally:
+                HANDLER_SECONDS.observe(
+                    time.perf_counter() - started, handler=handler_name)
+        return wrapper
+    return decorator
+
+
+def summary(registry=REGISTRY) -> list:
+    """
+    Краткий отчет по метрикам: для гистограмм - количество, среднее,
+    p50 и p95 (по корзинам), для счетчиков - значения.
+    Список (имя, метки, описание значения).
+    """
+    lines = []
+    for metric in registry.metrics():
+        if isinstance(metric, Histogram):
+            for key, value in sorted(metric.snapshot().items()):
+                _, count, total = value
+                if not count:
+                    continue
+                p50 = _bucket_quantile(metric.buckets, value, 0.5)
+                p95 = _bucket_quantile(metric.buckets, value, 0.95)
+                lines.append((
+                    metric.name, dict(zip(metric.labelnames, key)),
+                    f'{count} шт., среднее {total / count * 1000:.1f} мс, '
+                    f'p50 ≤ {_format_bound(p50)}, '
+                    f'p95 ≤ {_format_bound(p95)}'))
+        else:
+            for _, key, _, value in metric.samples():
+                lines.append((
+                    metric.name, dict(zip(metric.labelnames, key)),
+                    _format_value(value)))
+    return lines
+
+
+def _format_bound(seconds) -> str:
+    if seconds == float('inf'):
+        return '∞'
+    return f'{seconds * 1000:g} мс'
+
+
+class MetricsServer:
+    """HTTP-сервер метрик в формате Prometheus (GET /metrics)."""
+
+    def __init__(self, host=METRICS_HOST, port=METRICS_PORT,
+                 registry=REGISTRY):
+        from http.server import ThreadingHTTPServer
+
+        self.registry = registry
+        self.httpd = ThreadingHTTPServer(
+            (host, int(port)), _make_handler(self))
+        self.httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def address(self) -> tuple:
+        """Адрес, на котором слушает сервер (хост, порт)."""
+        return self.httpd.server_address[:2]
+
+    def start(self):
+        """Запускаем сервер в фоновом потоке."""
+        self._thread = threading.Thread(
+            target=self.httpd.serve_forever, name='metrics', daemon=True)
+        self._thread.start()
+        logging.info(f'Сервер метрик запущен на {self.address}')
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def _make_handler(server):
+    """Создаем класс обработчика HTTP-запросов для сервера метрик."""
+    from http.server import BaseHTTPRequestHandler
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+
+        def do_GET(self):
+            if self.path.split('?')[0] != METRICS_PATH:
+                self.send_error(404)
+                return
+            body = server.registry.render().encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', CONTENT_TYPE)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            # Не засоряем журнал строкой на каждый запрос.
+            pass
+
+    return MetricsHandler
+
+
+def start_metrics_server():
+    """Запускаем сервер метрик, если задан METRICS_PORT (иначе None)."""
+    if not METRICS_PORT:
+        return None
+    try:
+        server = MetricsServer()
+    except OSError as e:
+        logging.error(f'Сервер метрик не запущен: {e}')
+        return None
+    server.start()
+    return server
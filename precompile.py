@@ -0,0 +1,167 @@
+"""
+Компиляция всех графиков разом.
+
+Находит в папке schedule/ все файлы вида <Месяц>_<ГГГГ>.xlsx
+(за любые годы) и компилирует их параллельно в пуле процессов -
+по процессу на ядро. Файл, содержимое которого не изменилось
+с прошлой компиляции (хэш SHA-256 в schedule/manifest.json),
+пропускается. Скомпилированные графики и манифест записываются
+атомарно.
+
+Запуск из папки бота:
+    python precompile.py [--workers N] [--force]
+"""
+import argparse
+import hashlib
+import json
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+from utils import (
+    MONTH_NUMBERS,
+    SCHEDULE_FORMAT,
+    _compiled_path,
+    atomic_write,
+    compile_and_store
+)
+
+# Логирование.
+logger = logging.getLogger(__name__)
+
+SCHEDULE_DIR = Path('schedule')
+# Хэши уже скомпилированных xlsx: имя файла -> {'sha256', 'format'}.
+MANIFEST_FILE = SCHEDULE_DIR / 'manifest.json'
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def content_hash(filepath) -> str:
+    """SHA-256 содержимого файла."""
+    digest = hashlib.sha256()
+    with open(filepath, 'rb') as file:
+        for chunk in iter(lambda: file.read(HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def find_workbooks(directory=SCHEDULE_DIR) -> list:
+    """Файлы графиков: список (путь, месяц, год), по годам и месяцам."""
+    workbooks = []
+    for filepath in Path(directory).glob('*_*.xlsx'):
+        month, _, year = filepath.stem.rpartition('_')
+        if month in MONTH_NUMBERS and year.isdigit() and len(year) == 4:
+            workbooks.append((filepath, month, int(year)))
+    workbooks.sort(key=lambda item: (item[2], MONTH_NUMBERS[item[1]]))
+    return workbooks
+
+
+def load_manifest() -> dict:
+    try:
+        with open(MANIFEST_FILE, 'r', encoding='utf-8') as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_manifest(manifest):
+    content = json.dumps(manifest, ensure_ascii=False, indent=4)
+    atomic_write(str(MANIFEST_FILE), content.encode('utf-8'))
+
+
+def is_up_to_date(manifest, filepath, month, year, digest) -> bool:
+    """Содержимое xlsx не менялось, и скомпилированный график на месте."""
+    entry = manifest.get(filepath.name)
+    return (
+        entry is not None
+        and entry['sha256'] == digest
+        and entry['format'] == SCHEDULE_FORMAT
+        and os.path.isfile(_compiled_path(month, year))
+    )
+
+
+def compile_workbook(month, year) -> tuple:
+    """
+    Компилируем один график (выполняется в процессе пула).
+    Возвращаем (месяц, год, сотрудников, секунд).
+    """
+    started = time.perf_counter()
+    schedule = compile_and_store(month, year)
+    return month, year, len(schedule), time.perf_counter() - started
+
+
+def precompile(workers=None, force=False) -> dict:
+    """
+    Компилируем все новые и измененные графики.
+    Возвращаем {'compiled': [...], 'skipped': [...], 'failed': [...]}
+    с именами xlsx файлов.
+    """
+    manifest = load_manifest()
+    result = {'compiled': [], 'skipped': [], 'failed': []}
+    pending = {}
+    for filepath, month, year in find_workbooks():
+        digest = content_hash(filepath)
+        if not force and is_up_to_date(
+            manifest, filepath, month, year, digest
+        ):
+            # Файл могли пересохранить без изменений - обновляем время
+            # скомпилированного графика, чтобы он не считался устаревшим.
+            compiled_file = _compiled_path(month, year)
+            if os.path.getmtime(compiled_file) < os.path.getmtime(filepath):
+                os.utime(compiled_file)
+            result['skipped'].append(filepath.name)
+            continue
+        pending[(month, year)] = (filepath, digest)
+
+    if not pending:
+        return result
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            pool.submit(compile_workbook, month, year): (month, year)
+            for month, year in pending
+        }
+        for future in as_completed(futures):
+            filepath, digest = pending[futures[future]]
+            try:
+                month, year, users, seconds = future.result()
+            except Exception as e:
+                logging.error(f'Ошибка при компиляции "{filepath}": {e}')
+                result['failed'].append(filepath.name)
+                continue
+            manifest[filepath.name] = {
+                'sha256': digest,
+                'format': SCHEDULE_FORMAT,
+            }
+            result['compiled'].append(filepath.name)
+            logging.info(
+                f'График "{filepath}" скомпилирован: {users} сотрудников '
+                f'за {seconds:.2f} c.')
+
+    save_manifest(manifest)
+    return result
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        '--workers', type=int, help='число процессов (по умолчанию - ядер)')
+    parser.add_argument(
+        '--force', action='store_true', help='компилировать все файлы')
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    started = time.perf_counter()
+    result = precompile(workers=args.workers, force=args.force)
+    print(
+        f'Скомпилировано: {len(result["compiled"])}, '
+        f'без изменений: {len(result["skipped"])}, '
+        f'с ошибками: {len(result["failed"])} '
+        f'({time.perf_counter() - started:.2f} c).')
+    return 1 if result['failed'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
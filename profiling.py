@@ -0,0 +1,155 @@
+"""
+Профилирование обработчиков и задач по расписанию (по запросу).
+
+Включается переменными окружения:
+- PROFILE_SAMPLE_RATE - доля вызовов, которые профилируются
+  и записываются всегда (например, 0.01 - каждый сотый);
+- PROFILE_SLOW_MS - записываются вызовы дольше порога (в мс).
+  Заранее медленный вызов не узнать, поэтому при заданном пороге
+  профилируется каждый вызов, а сохраняются только медленные;
+- PROFILE_DIR - папка для профилей (по умолчанию profiles).
+
+В папку пишутся профили отдельных вызовов (<имя>-<время>-<мс>ms.prof,
+открываются pstats или snakeviz) и сводка summary.txt: самые затратные
+функции по последним PROFILE_KEEP профилям. Старые профили удаляются.
+
+Если профилирование выключено (по умолчанию), декоратор profiled
+возвращает функцию без изменений и ничего не стоит.
+"""
+import cProfile
+import functools
+import inspect
+import io
+import logging
+import os
+import pstats
+import random
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+from dotenv import load_dotenv
+
+load_dotenv()
+# Логирование.
+logger = logging.getLogger(__name__)
+
+PROFILE_SAMPLE_RATE = float(os.getenv('PROFILE_SAMPLE_RATE', 0))
+PROFILE_SLOW_MS = float(os.getenv('PROFILE_SLOW_MS', 0))
+PROFILE_DIR = os.getenv('PROFILE_DIR', 'profiles')
+# Сколько последних профилей храним и учитываем в сводке.
+PROFILE_KEEP = int(os.getenv('PROFILE_KEEP', 50))
+# Сколько функций показываем в сводке.
+PROFILE_TOP = 30
+SUMMARY_FILE = 'summary.txt'
+
+
+class Profiler:
+    """
+    Профилирование вызовов через cProfile с записью профилей в папку.
+    В один момент профилируется только один вызов (cProfile не допускает
+    одновременной работы нескольких профилировщиков); вызовы из других
+    потоков в это время выполняются без профилирования.
+    """
+
+    def __init__(self, directory=PROFILE_DIR, sample_rate=PROFILE_SAMPLE_RATE,
+                 slow_ms=PROFILE_SLOW_MS, keep=PROFILE_KEEP, top=PROFILE_TOP):
+        self.directory = directory
+        self.sample_rate = sample_rate
+        self.slow_ms = slow_ms
+        self.keep = keep
+        self.top = top
+        self._busy = threading.Lock()
+        self._files_lock = threading.Lock()
+        self._files = deque()  # (путь, имя, длительность в мс).
+
+    @property
+    def enabled(self) -> bool:
+        return self.sample_rate > 0 or self.slow_ms > 0
+
+    def call(self, name, func, *args, **kwargs):
+        """Выполняем функцию, профилируя ее, если вызов попал в выборку."""
+        sampled = random.random() < self.sample_rate
+        if not (sampled or self.slow_ms > 0):
+            return func(*args, **kwargs)
+        if not self._busy.acquire(blocking=False):
+            return func(*args, **kwargs)
+        try:
+            profile = cProfile.Profile()
+            started = time.perf_counter()
+            try:
+                profile.enable()
+            except ValueError:
+                # Уже работает другой профилировщик (например, отладчик).
+                return func(*args, **kwargs)
+            try:
+                return func(*args, **kwargs)
+            finally:
+                profile.disable()
+                elapsed_ms = (time.perf_counter() - started) * 1000
+                if sampled or elapsed_ms >= self.slow_ms:
+                    self._save(name, profile, elapsed_ms)
+        finally:
+            self._busy.release()
+
+    def _save(self, name, profile, elapsed_ms):
+        """Записываем профиль вызова и обновляем сводку."""
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            stamp = datetime.now().strftime('%Y%m%d-%H%M%S-%f')
+            filepath = os.path.join(
+                self.directory, f'{name}-{stamp}-{elapsed_ms:.0f}ms.prof')
+            profile.dump_stats(filepath)
+            with self._files_lock:
+                self._files.append((filepath, name, elapsed_ms))
+                while len(self._files) > self.keep:
+                    old_file, _, _ = self._files.popleft()
+                    try:
+                        os.remove(old_file)
+                    except OSError:
+                        pass
+                files = list(self._files)
+                self._write_summary(files)
+            logging.info(
+                f'Профиль {name} ({elapsed_ms:.0f} мс) записан: {filepath}')
+        except Exception as e:
+            logging.error(f'Ошибка при записи профиля {name}: {e}')
+
+    def _write_summary(self, files):
+        """Сводка по последним профилям: вызовы и самые затратные функции."""
+        stream = io.StringIO()
+        stream.write(
+            f'Профилей: {len(files)} '
+            f'(обновлено {datetime.now():%d.%m.%Y %H:%M:%S})\n\n')
+        for _, name, elapsed_ms in files:
+            stream.write(f'{name}: {elapsed_ms:.0f} мс\n')
+        stream.write('\n')
+        stats = pstats.Stats(files[0][0], stream=stream)
+        for filepath, _, _ in files[1:]:
+            stats.add(filepath)
+        stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(self.top)
+        with open(os.path.join(self.directory, SUMMARY_FILE), 'w',
+                  encoding='utf-8') as file:
+            file.write(stream.getvalue())
+
+
+PROFILER = Profiler()
+
+
+def profiled(name, profiler=PROFILER):
+    """
+    Декоратор: профилируем вызовы функции под именем name.
+    При выключенном профилировании функция возвращается как есть.
+    Корутины не профилируются: cProfile считает и время чужих задач,
+    выполнявшихся во время await.
+    """
+    def decorator(func):
+        if not profiler.enabled or inspect.iscoroutinefunction(func):
+            return func
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            return profiler.call(name, func, *args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,178 @@
+"""
+Справочник сотрудников.
+
+Один экземпляр ROSTER на процесс хранит индексы в обе стороны
+(id -> Ф.И.О и Ф.И.О -> id), список ответственных (боссов) и состав
+групповых чатов.
+
+Источник данных:
+- файл ROSTER_FILE (JSON), если он задан:
+  {
+      "department": {"<id>": "<Ф.И.О>", ...},
+      "bosses": ["<Ф.И.О>", ...],
+      "groups": {"<id чата>": ["<Ф.И.О>", ...]},
+      "admins": [<id>, ...]
+  }
+  Файл перечитывается без перезапуска бота, если он изменился;
+- иначе переменные окружения DEPARTMENT_IDS, BOSS_LIST и GROUP_CHAT_ID
+  (в группе - весь отдел).
+Администраторы бота (им доступна команда /stats) - ключ "admins"
+файла или переменная окружения ADMIN_IDS (JSON-список id).
+"""
+import json
+import logging
+import os
+import threading
+import time
+
+from dotenv import load_dotenv
+
+load_dotenv()
+# Логирование.
+logger = logging.getLogger(__name__)
+
+# Как часто (в секундах) проверяем, изменился ли файл справочника.
+ROSTER_CHECK_INTERVAL = 5
+
+
+class RosterData:
+    """Неизменяемый снимок справочника с индексами."""
+
+    def __init__(self, department, bosses, groups, admins=()):
+        # id (строкой) -> Ф.И.О.
+        self.names = {str(key): name for key, name in department.items()}
+        # Ф.И.О -> id.
+        self.ids = {name: int(key) for key, name in self.names.items()}
+        self.bosses = list(bosses)
+        self.boss_set = frozenset(bosses)
+        # id чата (строкой) -> Ф.И.О участников.
+        self.groups = {
+            str(chat_id): list(members) for chat_id, members in groups.items()
+        }
+        # id администраторов бота (строками).
+        self.admins = frozenset(str(user_id) for user_id in admins)
+        self.user_groups = {}
+        for chat_id, members in self.groups.items():
+            for name in members:
+                self.user_groups.setdefault(name, []).append(chat_id)
+
+
+class Roster:
+    """Справочник сотрудников с перечитыванием файла при изменении."""
+
+    def __init__(self, roster_file=None):
+        self.roster_file = roster_file
+        self.version = 1  # Растет при каждой успешной загрузке.
+        self._signature = None
+        self._checked = 0
+        self._lock = threading.Lock()
+        self._data = self._load()
+        if roster_file:
+            self._signature = self._file_signature()
+
+    def _load(self) -> RosterData:
+        """Загружаем справочник из файла или окружения."""
+        if self.roster_file:
+            with open(self.roster_file, 'r', encoding='utf-8') as file:
+                content = json.load(file)
+            return RosterData(
+                content.get('department', {}),
+                content.get('bosses', []),
+                content.get('groups', {}),
+                content.get('admins', json.loads(
+                    os.getenv('ADMIN_IDS', '[]'))),
+            )
+
+        department = json.loads(os.environ['DEPARTMENT_IDS'])
+        group_id = os.getenv('GROUP_CHAT_ID')
+        groups = {group_id: list(department.values())} if group_id else {}
+        return RosterData(
+            department, json.loads(os.environ['BOSS_LIST']), groups,
+            json.loads(os.getenv('ADMIN_IDS', '[]')))
+
+    def _file_signature(self):
+        try:
+            stat = os.stat(self.roster_file)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def reload_if_changed(self):
+        """Перечитываем файл справочника, если он изменился."""
+        if not self.roster_file:
+            return
+        now = time.monotonic()
+        if now - self._checked < ROSTER_CHECK_INTERVAL:
+            return
+        with self._lock:
+            self._checked = now
+            signature = self._file_signature()
+            if signature is None or signature == self._signature:
+                return
+            try:
+                data = self._load()
+            except Exception as e:
+                # Оставляем прежний справочник и его версию: ключи кэша
+                # ответов не меняются.
+                logging.error(f'Ошибка при чтении справочника: {e}')
+                return
+            self._data = data
+            self.version += 1
+            self._signature = signature
+            logging.info(
+                f'Справочник сотрудников обновлен: {len(self)} чел.')
+
+    @property
+    def data(self) -> RosterData:
+        """Актуальный снимок справочника."""
+        self.reload_if_changed()
+        return self._data
+
+    def __len__(self) -> int:
+        return len(self._data.names)
+
+    def is_member(self, user_id) -> bool:
+        """Пользователь есть в справочнике."""
+        return str(user_id) in self.data.names
+
+    def get_name(self, user_id):
+        """Ф.И.О по id (или None)."""
+        return self.data.names.get(str(user_id))
+
+    def get_id(self, name):
+        """id по Ф.И.О (или None)."""
+        return self.data.ids.get(name)
+
+    def is_boss(self, name) -> bool:
+        """Сотрудник - ответственный."""
+        return name in self.data.boss_set
+
+    def is_admin(self, user_id) -> bool:
+        """Пользователь - администратор бота."""
+        return str(user_id) in self.data.admins
+
+    @property
+    def bosses(self) -> list:
+        """Ответственные в порядке из справочника."""
+        return self.data.bosses
+
+    @property
+    def users(self) -> dict:
+        """Все сотрудники: id (строкой) -> Ф.И.О."""
+        return self.data.names
+
+    @property
+    def groups(self) -> list:
+        """id групповых чатов."""
+        return list(self.data.groups)
+
+    def group_members(self, chat_id) -> list:
+        """Ф.И.О участников группового чата."""
+        return self.data.groups.get(str(chat_id), [])
+
+    def user_groups(self, name) -> list:
+        """Групповые чаты сотрудника."""
+        return self.data.user_groups.get(name, [])
+
+
+ROSTER = Roster(os.getenv('ROSTER_FILE'))
@@ -0,0 +1,205 @@
+"""
+Маршрутизация входящих сообщений бота.
+
+Команды ('/start') и тексты кнопок - ключи словаря маршрутов:
+обработчик находится одним поиском по тексту сообщения, сколько бы
+команд ни было. Сообщения без маршрута уходят в обработчик
+по умолчанию.
+
+Вокруг каждого обработчика выполняется цепочка middleware. Middleware -
+функция (route, message, call_next): она может выполнить код до и после
+call_next(message) или не вызывать его вовсе (отказ). Цепочка для
+маршрута собирается один раз - при регистрации.
+
+Готовые middleware:
+- error_capture - ошибка обработчика пишется в журнал, а не в polling;
+- timing - время обработки и ошибки в метриках (HANDLER_SECONDS);
+- RateLimiter - ограничение частоты запросов пользователя;
+- authorization - обработчик только для "одобренных" пользователей.
+
+RateLimiter и authorization только возвращают результат обработчика
+(или ответа об отказе), поэтому подходят и для корутин: асинхронный бот
+вызывает dispatch_async. Время и ошибки корутин учитывает
+metrics.instrumented.
+"""
+import functools
+import inspect
+import logging
+import threading
+import time
+
+from metrics import HANDLER_ERRORS, HANDLER_REJECTED, HANDLER_SECONDS
+from sender import TokenBucket
+
+# Логирование.
+logger = logging.getLogger(__name__)
+
+# Запросов в секунду от одного пользователя и сколько можно подряд.
+USER_RATE = 1
+USER_BURST = 5
+# Сколько баков пользователей храним до очистки полных баков.
+MAX_USER_BUCKETS = 10000
+
+
+class Route:
+    """Маршрут: имя (для журнала и метрик), обработчик и его настройки."""
+
+    def __init__(self, name, handler, auth=True):
+        self.name = name
+        self.handler = handler
+        # False - обработчик доступен всем (например, /start).
+        self.auth = auth
+        self.call = handler  # Обработчик с цепочкой middleware.
+
+
+class Router:
+    """Маршруты по тексту сообщения и цепочка middleware."""
+
+    def __init__(self, middlewares=()):
+        # Первый middleware - внешний: выполняется первым.
+        self.middlewares = list(middlewares)
+        self.routes = {}
+        self.default = None
+
+    def _chain(self, route):
+        call = route.handler
+        for middleware in reversed(self.middlewares):
+            call = functools.partial(middleware, route, call_next=call)
+        return call
+
+    def add(self, keys, name, handler, auth=True) -> Route:
+        """Регистрируем обработчик для команд и текстов кнопок keys."""
+        route = Route(name, handler, auth)
+        route.call = self._chain(route)
+        for key in keys:
+            if key in self.routes:
+                raise ValueError(f'Маршрут "{key}" уже зарегистрирован')
+            self.routes[key] = route
+        return route
+
+    def route(self, *keys, name=None, auth=True):
+        """Декоратор: router.route('/start', name='start', auth=False)."""
+        def decorator(func):
+            self.add(keys, name or func.__name__, func, auth)
+            return func
+        return decorator
+
+    def fallback(self, name='unknown', auth=False):
+        """Декоратор обработчика сообщений без маршрута."""
+        def decorator(func):
+            self.default = Route(name, func, auth)
+            self.default.call = self._chain(self.default)
+            return func
+        return decorator
+
+    def resolve(self, message):
+        """Маршрут сообщения или маршрут по умолчанию (None - нет)."""
+        text = message.text or ''
+        if text.startswith('/'):
+            # '/start@bot_name аргументы' -> '/start'.
+            text = text.split(maxsplit=1)[0].partition('@')[0]
+        return self.routes.get(text, self.default)
+
+    def dispatch(self, message):
+        """Обрабатываем сообщение."""
+        route = self.resolve(message)
+        if route is not None:
+            return route.call(message)
+
+    async def dispatch_async(self, message):
+        """Обрабатываем сообщение корутиной-обработчиком."""
+        result = self.dispatch(message)
+        if inspect.isawaitable(result):
+            result = await result
+        return result
+
+
+def error_capture(route, message, call_next):
+    """Ошибку обработчика пишем в журнал."""
+    try:
+        return call_next(message)
+    except Exception as e:
+        logging.error(
+            f'Ошибка обработчика "{route.name}" '
+            f'(чат {message.chat.id}): {e}')
+
+
+def timing(route, message, call_next):
+    """Время обработки и ошибки в метриках."""
+    started = time.perf_counter()
+    try:
+        return call_next(message)
+    except Exception:
+        HANDLER_ERRORS.inc(handler=route.name)
+        raise
+    finally:
+        HANDLER_SECONDS.observe(
+            time.perf_counter() - started, handler=route.name)
+
+
+def authorization(is_allowed, on_denied):
+    """
+    Middleware авторизации: is_allowed(user_id) проверяет пользователя,
+    on_denied(message) отвечает тем, кому обработчик недоступен.
+    """
+    def middleware(route, message, call_next):
+        if not route.auth or is_allowed(message.chat.id):
+            return call_next(message)
+        HANDLER_REJECTED.inc(reason='unauthorized')
+        return on_denied(message)
+    return middleware
+
+
+class RateLimiter:
+    """
+    Middleware: не больше rate запросов в секунду от пользователя
+    (и burst подряд). Лишние сообщения не обрабатываются; о превышении
+    пользователю сообщаем один раз - on_limited(message).
+    """
+
+    def __init__(self, on_limited=None, rate=USER_RATE, burst=USER_BURST,
+                 clock=time.monotonic):
+        self.on_limited = on_limited
+        self.rate = rate
+        self.burst = burst
+        self.clock = clock
+        self._buckets = {}
+        self._warned = set()
+        self._lock = threading.Lock()
+
+    def _prune(self):
+        """Убираем полные баки: их пользователи давно ничего не писали."""
+        for user_id, bucket in list(self._buckets.items()):
+            if bucket.wait_time() == 0 and bucket.tokens >= bucket.capacity:
+                del self._buckets[user_id]
+                self._warned.discard(user_id)
+
+    def allow(self, user_id) -> tuple:
+        """(обрабатываем ли запрос, нужно ли предупредить пользователя)."""
+        with self._lock:
+            bucket = self._buckets.get(user_id)
+            if bucket is None:
+                if len(self._buckets) >= MAX_USER_BUCKETS:
+                    self._prune()
+                bucket = TokenBucket(
+                    self.rate, capacity=self.burst, clock=self.clock)
+                self._buckets[user_id] = bucket
+            if bucket.wait_time() == 0:
+                bucket.consume()
+                self._warned.discard(user_id)
+                return True, False
+            if user_id in self._warned:
+                return False, False
+            self._warned.add(user_id)
+            return False, True
+
+    def __call__(self, route, message, call_next):
+        # В группе ограничиваем автора сообщения, а не весь чат.
+        user = message.from_user
+        allowed, warn = self.allow(
+            user.id if user is not None else message.chat.id)
+        if allowed:
+            return call_next(message)
+        HANDLER_REJECTED.inc(reason='rate_limited')
+        if warn and self.on_limited is not None:
+            return self.on_limited(message)
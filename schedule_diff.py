@@ -0,0 +1,92 @@
+"""
+Сравнение двух версий графика на месяц.
+
+Графики сравниваются в компактном виде "сотрудник x день" (коды
+из compact_schedule): строка кодов сотрудника - это bytes, и строки
+без изменений отсеиваются одним сравнением bytes. Посуточно разбираются
+только изменившиеся строки. Если обе версии - CompactSchedule с
+одинаковыми массивами кодов и отпусками, сравнение заканчивается
+сразу.
+
+Результат - изменения по сотрудникам:
+    {ФИО: {'days': [(день, старый код, новый код), ...],
+           'vacations': (старые отпуска, новые отпуска) или None}}
+"""
+import calendar
+
+from compact_schedule import (
+    CODE_DUTY_DAY,
+    CODE_GAIN,
+    CODE_NONE,
+    CODE_VACATION,
+    DUTY_TIME_BY_CODE,
+    CompactSchedule
+)
+
+# Время дежурства в словаре графика -> код дня.
+DUTY_CODES = {time: code for code, time in DUTY_TIME_BY_CODE.items()}
+# Отпуск в словаре графика к дню не привязан, поэтому дни отпуска
+# не сравниваются - сравниваются тексты отпусков.
+_IGNORE_VACATION_DAYS = bytes(
+    CODE_NONE if code == CODE_VACATION else code for code in range(256))
+
+
+def _user_codes(schedule, name, n_days) -> bytes:
+    """Коды событий сотрудника по дням."""
+    if isinstance(schedule, CompactSchedule):
+        return schedule.codes_of(name).translate(_IGNORE_VACATION_DAYS)
+    codes = bytearray(n_days)
+    user = schedule[name]
+    for gain in user['смена']:
+        codes[int(gain[0]) - 1] = CODE_GAIN
+    for duty in user['дежурство']:
+        codes[int(duty[0]) - 1] = DUTY_CODES.get(duty[2], CODE_DUTY_DAY)
+    return bytes(codes)
+
+
+def _user_vacations(schedule, name) -> list:
+    if isinstance(schedule, CompactSchedule):
+        return schedule.vacations_of(name)
+    return list(schedule[name]['отпуск'])
+
+
+def _same_compact(old, new) -> bool:
+    """Обе версии - компактные графики с одинаковым содержимым."""
+    return (
+        isinstance(old, CompactSchedule)
+        and isinstance(new, CompactSchedule)
+        and old.names == new.names
+        and old.codes == new.codes
+        and old.vacations == new.vacations
+    )
+
+
+def diff_schedules(old, new, year, month) -> dict:
+    """Изменения графика на месяц по сотрудникам (см. описание модуля)."""
+    if _same_compact(old, new):
+        return {}
+
+    n_days = calendar.monthrange(year, month)[1]
+    empty = bytes(n_days)
+    changes = {}
+    for name in list(old) + [name for name in new if name not in old]:
+        before = _user_codes(old, name, n_days) if name in old else empty
+        after = _user_codes(new, name, n_days) if name in new else empty
+        days = []
+        if before != after:
+            days = [
+                (day, old_code, new_code)
+                for day, (old_code, new_code) in enumerate(
+                    zip(before, after), start=1)
+                if old_code != new_code
+            ]
+
+        old_vacations = _user_vacations(old, name) if name in old else []
+        new_vacations = _user_vacations(new, name) if name in new else []
+        vacations = None
+        if old_vacations != new_vacations:
+            vacations = (old_vacations, new_vacations)
+
+        if days or vacations:
+            changes[name] = {'days': days, 'vacations': vacations}
+    return changes
@@ -0,0 +1,194 @@
+"""
+Хранилище графиков в SQLite (необязательное, SCHEDULE_STORE=sqlite).
+
+Каждое событие графика - строка таблицы events:
+(сотрудник, дата, вид события, время дежурства или текст отпуска).
+Индексы по (дата, вид) и (сотрудник, дата) позволяют отвечать на вопросы
+вроде "у кого завтра смена" или "следующее дежурство сотрудника"
+без загрузки месяца целиком, в том числе через границы месяцев и лет.
+
+Таблица months хранит "подпись" файлов, из которых загружен месяц,
+и номер версии графика.
+"""
+import json
+import sqlite3
+import threading
+from datetime import date
+
+from constants import WEEK_DAYS
+
+# Виды событий (как в словаре графика).
+KIND_GAIN = 'смена'
+KIND_DUTY = 'дежурство'
+KIND_VACATION = 'отпуск'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    user TEXT NOT NULL,
+    date TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    shift TEXT NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS idx_events_date_kind ON events (date, kind);
+CREATE INDEX IF NOT EXISTS idx_events_user_date ON events (user, date);
+CREATE TABLE IF NOT EXISTS months (
+    year INTEGER NOT NULL,
+    month INTEGER NOT NULL,
+    signature TEXT,
+    version INTEGER NOT NULL,
+    loaded INTEGER NOT NULL,
+    PRIMARY KEY (year, month)
+);
+"""
+
+
+def _month_bounds(year, month) -> tuple:
+    """Первый день месяца и первый день следующего месяца (ISO)."""
+    start = date(year, month, 1)
+    end = date(year + month // 12, month % 12 + 1, 1)
+    return start.isoformat(), end.isoformat()
+
+
+def _iso(day) -> str:
+    """Дата (date или datetime) в формате базы: ГГГГ-ММ-ДД."""
+    return day.strftime('%Y-%m-%d')
+
+
+def _weekday(iso_date) -> str:
+    return WEEK_DAYS[date.fromisoformat(iso_date).weekday()]
+
+
+class ScheduleStore:
+    """
+    Графики всех загруженных месяцев в одной базе SQLite.
+    Одно соединение на процесс, доступ к нему - под блокировкой.
+    """
+
+    def __init__(self, db_path=':memory:'):
+        self.db_path = db_path
+        self._connection = sqlite3.connect(
+            db_path, check_same_thread=False, isolation_level=None)
+        if db_path != ':memory:':
+            self._connection.execute('PRAGMA journal_mode=WAL')
+        self._connection.executescript(SCHEMA)
+        self._lock = threading.Lock()
+
+    def _query(self, sql, params=()) -> list:
+        with self._lock:
+            return self._connection.execute(sql, params).fetchall()
+
+    def replace_month(self, year, month, schedule, signature=None,
+                      version=0):
+        """
+        Заменяем события месяца событиями из графика
+        (словарь {ФИО: {'смена': ..., 'дежурство': ..., 'отпуск': ...}}).
+        """
+        first_day = date(year, month, 1)
+        events = []
+        for user_name, value in schedule.items():
+            for gain in value[KIND_GAIN]:
+                day = first_day.replace(day=int(gain[0])).isoformat()
+                events.append((user_name, day, KIND_GAIN, ''))
+            for duty in value[KIND_DUTY]:
+                day = first_day.replace(day=int(duty[0])).isoformat()
+                events.append((user_name, day, KIND_DUTY, duty[2]))
+            # День отпуска в графике не хранится - относим к 1 числу.
+            for vacation in value[KIND_VACATION]:
+                events.append((
+                    user_name, first_day.isoformat(), KIND_VACATION,
+                    vacation))
+
+        start, end = _month_bounds(year, month)
+        with self._lock:
+            connection = self._connection
+            connection.execute('BEGIN')
+            try:
+                connection.execute(
+                    'DELETE FROM events WHERE date >= ? AND date < ?',
+                    (start, end))
+                connection.executemany(
+                    'INSERT INTO events (user, date, kind, shift) '
+                    'VALUES (?, ?, ?, ?)', events)
+                connection.execute(
+                    'INSERT OR REPLACE INTO months '
+                    '(year, month, signature, version, loaded) '
+                    'VALUES (?, ?, ?, ?, ?)',
+                    (year, month, json.dumps(signature), version,
+                     int(bool(schedule))))
+                connection.execute('COMMIT')
+            except BaseException:
+                connection.execute('ROLLBACK')
+                raise
+
+    def month_state(self, year, month):
+        """
+        Состояние месяца в базе: (подпись файлов, версия, загружен ли)
+        или None, если месяц в базу не попадал.
+        """
+        rows = self._query(
+            'SELECT signature, version, loaded FROM months '
+            'WHERE year = ? AND month = ?', (year, month))
+        if not rows:
+            return None
+        signature, version, loaded = rows[0]
+        signature = json.loads(signature)
+        return (
+            tuple(tuple(item) if isinstance(item, list) else item
+                  for item in signature) if signature else signature,
+            version,
+            bool(loaded),
+        )
+
+    def day_events(self, day) -> dict:
+        """
+        События дня: {'смена': [ФИО, ...],
+                      'дежурство': [(ФИО, [день, день недели, время]), ...]}
+        """
+        iso_date = _iso(day)
+        weekday = _weekday(iso_date)
+        events = {KIND_GAIN: [], KIND_DUTY: []}
+        for user, kind, shift in self._query(
+            'SELECT user, kind, shift FROM events '
+            'WHERE date = ? AND kind IN (?, ?) ORDER BY rowid',
+            (iso_date, KIND_GAIN, KIND_DUTY)
+        ):
+            if kind == KIND_GAIN:
+                events[KIND_GAIN].append(user)
+            else:
+                events[KIND_DUTY].append(
+                    (user, [day.day, weekday, shift]))
+        return events
+
+    def next_event(self, user_name, kind, after):
+        """Ближайшее событие сотрудника не раньше after: (дата, смена)."""
+        rows = self._query(
+            'SELECT date, shift FROM events '
+            'WHERE user = ? AND date >= ? AND kind = ? '
+            'ORDER BY date, rowid LIMIT 1',
+            (user_name, _iso(after), kind))
+        if not rows:
+            return None
+        day, shift = rows[0]
+        return date.fromisoformat(day), shift
+
+    def user_month(self, user_name, year, month) -> dict:
+        """График сотрудника на месяц в виде словаря графика."""
+        start, end = _month_bounds(year, month)
+        user_schedule = {KIND_GAIN: [], KIND_DUTY: [], KIND_VACATION: []}
+        for day, kind, shift in self._query(
+            'SELECT date, kind, shift FROM events '
+            'WHERE user = ? AND date >= ? AND date < ? ORDER BY date, rowid',
+            (user_name, start, end)
+        ):
+            if kind == KIND_VACATION:
+                user_schedule[KIND_VACATION].append(shift)
+                continue
+            event = [date.fromisoformat(day).day, _weekday(day)]
+            if kind == KIND_DUTY:
+                event.append(shift)
+            user_schedule[kind].append(event)
+        return user_schedule
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
@@ -0,0 +1,275 @@
+import asyncio
+import heapq
+import itertools
+import json
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from metrics import SCHEDULER_ERRORS, SCHEDULER_LAG_SECONDS
+from profiling import profiled
+from utils import atomic_write
+
+# Логирование.
+logger = logging.getLogger(__name__)
+
+# Максимальное ожидание за один раз (в секундах): после него сверяемся
+# с системными часами заново, чтобы перевод часов не сбивал расписание.
+MAX_WAIT = 60
+
+
+class SystemClock:
+    """Источник времени по умолчанию: системные часы."""
+
+    def now(self) -> datetime:
+        return datetime.now()
+
+    def wait(self, condition, timeout):
+        """Ждем на условии (ожидание идет по монотонным часам)."""
+        condition.wait(timeout)
+
+
+class SimulatedClock:
+    """
+    Имитация часов: ожидание не блокирует поток, а сдвигает время.
+    Позволяет "прогнать" месяц расписания за миллисекунды.
+    """
+
+    def __init__(self, start):
+        self._now = start
+
+    def now(self) -> datetime:
+        return self._now
+
+    def wait(self, condition, timeout):
+        if timeout is None:
+            # Задач нет - ждем, пока их добавят или остановят планировщик.
+            condition.wait(0.01)
+        else:
+            self._now += timedelta(seconds=timeout)
+
+
+class Job:
+    """
+    Задача планировщика, похожая на cron:
+    - at - время запуска;
+    - weekdays - дни недели (0 - понедельник), None - каждый день;
+    - catch_up - сколько времени после пропущенного запуска (например,
+      бот был выключен) его еще стоит выполнить; None - не выполнять.
+    """
+
+    def __init__(self, name, func, at, weekdays=None, catch_up=None):
+        self.name = name
+        # При включенном профилировании (profiling.py) запуски
+        # задачи профилируются.
+        self.func = profiled(f'job_{name}')(func)
+        self.at = at
+        self.weekdays = set(weekdays) if weekdays is not None else None
+        self.catch_up = catch_up
+
+    def next_after(self, moment) -> datetime:
+        """Ближайший запуск строго после moment."""
+        for days in range(8):
+            candidate = datetime.combine(
+                moment.date() + timedelta(days=days), self.at)
+            if candidate <= moment:
+                continue
+            if self.weekdays is None or candidate.weekday() in self.weekdays:
+                return candidate
+        raise ValueError(f'У задачи {self.name} не заданы дни запуска.')
+
+    def previous_before(self, moment) -> datetime:
+        """Последний запуск не позже moment."""
+        for days in range(8):
+            candidate = datetime.combine(
+                moment.date() - timedelta(days=days), self.at)
+            if candidate > moment:
+                continue
+            if self.weekdays is None or candidate.weekday() in self.weekdays:
+                return candidate
+        raise ValueError(f'У задачи {self.name} не заданы дни запуска.')
+
+
+def daily(name, func, at, catch_up=None) -> Job:
+    """Ежедневная задача."""
+    return Job(name, func, at, catch_up=catch_up)
+
+
+def weekly(name, func, weekdays, at, catch_up=None) -> Job:
+    """Задача по дням недели."""
+    return Job(name, func, at, weekdays=weekdays, catch_up=catch_up)
+
+
+class Scheduler:
+    """
+    Планировщик задач на одной очереди с приоритетом (куча по времени
+    запуска) и условной переменной.
+
+    Поток спит до ближайшего запуска; добавление задачи или остановка
+    будят его сразу. Время последних запусков хранится в state_file,
+    чтобы после перезапуска выполнить пропущенные задачи (catch-up).
+    """
+
+    def __init__(self, clock=None, state_file=None):
+        self.clock = clock or SystemClock()
+        self.state_file = Path(state_file) if state_file else None
+        self._heap = []
+        self._counter = itertools.count()  # Порядок задач с равным временем.
+        self._condition = threading.Condition()
+        self._stopped = False
+        self._thread = None
+        self._last_runs = self._load_state()
+
+    def add_job(self, job):
+        """Добавляем задачу в очередь."""
+        now = self.clock.now()
+        run_at = job.next_after(now)
+        missed = self._missed_run(job, now)
+        if missed is not None:
+            logging.info(
+                f'Задача {job.name}: пропущен запуск {missed}, выполняем.')
+            run_at = missed
+        with self._condition:
+            heapq.heappush(self._heap, (run_at, next(self._counter), job))
+            self._condition.notify()
+
+    def _missed_run(self, job, now):
+        """Пропущенный запуск, который еще стоит выполнить (или None)."""
+        if job.catch_up is None:
+            return None
+        previous = job.previous_before(now)
+        last_run = self._last_runs.get(job.name)
+        if last_run is not None and last_run >= previous:
+            return None
+        if now - previous > job.catch_up:
+            return None
+        return previous
+
+    def start(self):
+        """Запускаем планировщик в фоновом потоке."""
+        self._thread = threading.Thread(
+            target=self.run, name='scheduler', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=None):
+        """Останавливаем планировщик и ждем завершения потока."""
+        with self._condition:
+            self._stopped = True
+            self._condition.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def run(self):
+        """Основной цикл: ждем ближайшую задачу и выполняем ее."""
+        while True:
+            with self._condition:
+                due = self._next_due_job()
+            if due is None:
+                return
+            run_at, job = due
+            self._run_job(job, run_at)
+
+    def _next_due_job(self):
+        """Ждем, пока подойдет время первой задачи в очереди."""
+        while not self._stopped:
+            if not self._heap:
+                self.clock.wait(self._condition, None)
+                continue
+            run_at, _, job = self._heap[0]
+            delay = (run_at - self.clock.now()).total_seconds()
+            if delay > 0:
+                self.clock.wait(self._condition, min(delay, MAX_WAIT))
+                continue
+            heapq.heappop(self._heap)
+            return run_at, job
+        return None
+
+    def _run_job(self, job, run_at):
+        """Выполняем задачу и ставим ее следующий запуск в очередь."""
+        started = time.perf_counter()
+        try:
+            job.func()
+        except Exception as e:
+            SCHEDULER_ERRORS.inc(job=job.name)
+            logging.error(f'Ошибка при выполнении задачи {job.name}: {e}')
+        self._finish_job(job, run_at, started)
+        self._save_state()
+
+    def _finish_job(self, job, run_at, started):
+        """
+        Запоминаем запуск задачи и ставим следующий в очередь.
+        Состояние на диск записывает вызывающий код (_save_state).
+        """
+        lag = (self.clock.now() - run_at).total_seconds()
+        SCHEDULER_LAG_SECONDS.observe(lag, job=job.name)
+        logging.info(
+            f'Задача {job.name} выполнена: задержка {lag:.1f} c, '
+            f'длительность {time.perf_counter() - started:.2f} c.')
+
+        self._last_runs[job.name] = run_at
+        # Следующий запуск - после текущего момента, чтобы после простоя
+        # не выполнять задачу несколько раз подряд.
+        next_run = job.next_after(max(run_at, self.clock.now()))
+        with self._condition:
+            heapq.heappush(self._heap, (next_run, next(self._counter), job))
+
+    def _load_state(self) -> dict:
+        """Читаем время последних запусков задач."""
+        if self.state_file is None or not self.state_file.is_file():
+            return {}
+        try:
+            state = json.loads(self.state_file.read_text(encoding='utf-8'))
+            return {
+                name: datetime.fromisoformat(last_run)
+                for name, last_run in state.items()
+            }
+        except Exception as e:
+            logging.error(f'Ошибка при чтении состояния планировщика: {e}')
+            return {}
+
+    def _save_state(self):
+        """Сохраняем время последних запусков задач."""
+        if self.state_file is None:
+            return
+        state = {
+            name: last_run.isoformat()
+            for name, last_run in self._last_runs.items()
+        }
+        content = json.dumps(state, ensure_ascii=False, indent=4)
+        try:
+            atomic_write(str(self.state_file), content.encode('utf-8'))
+        except Exception as e:
+            logging.error(f'Ошибка при записи состояния планировщика: {e}')
+
+
+class AsyncScheduler(Scheduler):
+    """
+    Планировщик для asyncio: та же очередь задач, но ожидание идет
+    через asyncio.sleep, а задачи - корутинные функции.
+    """
+
+    async def run_async(self):
+        """Основной цикл планировщика в цикле событий."""
+        while not self._stopped:
+            if not self._heap:
+                await asyncio.sleep(MAX_WAIT)
+                continue
+            run_at, _, job = self._heap[0]
+            delay = (run_at - self.clock.now()).total_seconds()
+            if delay > 0:
+                await asyncio.sleep(min(delay, MAX_WAIT))
+                continue
+            heapq.heappop(self._heap)
+
+            started = time.perf_counter()
+            try:
+                await job.func()
+            except Exception as e:
+                SCHEDULER_ERRORS.inc(job=job.name)
+                logging.error(
+                    f'Ошибка при выполнении задачи {job.name}: {e}')
+            self._finish_job(job, run_at, started)
+            # Запись файла с fsync - в потоке, не блокируя цикл событий.
+            await asyncio.to_thread(self._save_state)
@@ -0,0 +1,305 @@
+"""
+Очередь исходящих сообщений с ограничением скорости.
+
+Лимиты Bot API:
+- около 30 сообщений в секунду на бота;
+- 1 сообщение в секунду в личный чат;
+- 20 сообщений в минуту в группу.
+
+Каждое сообщение проходит через общий "бак токенов" и бак своего чата.
+Ответ 429 (Too Many Requests) не теряет сообщение: оно повторяется
+через retry_after секунд, а до тех пор отправка приостанавливается
+и в остальные чаты. Сообщения одного чата отправляются по порядку.
+"""
+import heapq
+import itertools
+import logging
+import threading
+import time
+from collections import deque
+
+from requests.exceptions import RequestException
+
+from metrics import SEND_ATTEMPTS, SEND_SECONDS
+
+# Логирование.
+logger = logging.getLogger(__name__)
+
+# Сообщений в секунду на бота (с запасом до лимита Telegram).
+GLOBAL_RATE = 28
+PRIVATE_RATE = 1  # Сообщений в секунду в личный чат.
+GROUP_RATE = 20 / 60  # Сообщений в секунду в группу.
+SEND_WORKERS = 3
+MAX_RETRIES = 5
+# Пауза перед повтором после сетевой ошибки (в секундах, удваивается).
+RETRY_DELAY = 1
+# Наименьшая пауза после ответа 429 (если retry_after нет или он 0).
+MIN_RETRY_AFTER = 1
+# Сколько баков чатов храним до очистки полных баков.
+MAX_CHAT_BUCKETS = 10000
+
+# Статусы доставки сообщения.
+QUEUED = 'queued'
+SENT = 'sent'
+FAILED = 'failed'
+
+
+class TokenBucket:
+    """Бак токенов: rate токенов в секунду, не больше capacity в запасе."""
+
+    def __init__(self, rate, capacity=1, clock=time.monotonic):
+        self.rate = rate
+        self.capacity = capacity
+        self.clock = clock
+        self.tokens = capacity
+        self.updated = clock()
+
+    def _refill(self):
+        now = self.clock()
+        self.tokens = min(
+            self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self) -> float:
+        """Через сколько секунд будет доступен токен (0 - уже доступен)."""
+        self._refill()
+        if self.tokens >= 1:
+            return 0
+        return (1 - self.tokens) / self.rate
+
+    def consume(self):
+        """Забираем токен."""
+        self._refill()
+        self.tokens -= 1
+
+    def pause(self, seconds):
+        """
+        Не выдаем токены ближайшие seconds секунд (после ответа 429).
+        Паузы не суммируются: действует самая длинная.
+        """
+        self._refill()
+        self.tokens = min(self.tokens, -seconds * self.rate)
+
+
+class Delivery:
+    """Статус доставки одного сообщения."""
+
+    def __init__(self, chat_id, text, kwargs):
+        self.chat_id = chat_id
+        self.text = text
+        self.kwargs = kwargs
+        self.status = QUEUED
+        self.attempts = 0
+        self.error = None
+        self.result = None
+        self.created = time.monotonic()
+        self.finished = None
+        self._done = threading.Event()
+
+    def wait(self, timeout=None) -> bool:
+        """Ждем завершения доставки. True - доставлено."""
+        self._done.wait(timeout)
+        return self.status == SENT
+
+    def _finish(self, status, result=None, error=None):
+        self.status = status
+        self.result = result
+        self.error = error
+        self.finished = time.monotonic()
+        self._done.set()
+
+
+def retry_after(error):
+    """Время ожидания из ответа 429 (или None, если это другая ошибка)."""
+    if getattr(error, 'error_code', None) != 429:
+        return None
+    result_json = getattr(error, 'result_json', None) or {}
+    pause = result_json.get('parameters', {}).get('retry_after')
+    return max(pause or 0, MIN_RETRY_AFTER)
+
+
+def is_network_error(error) -> bool:
+    """Ошибка сети (а не ответ API) - сообщение стоит повторить."""
+    return isinstance(
+        error, (ConnectionError, TimeoutError, RequestException))
+
+
+class SendQueue:
+    """
+    Очередь отправки сообщений.
+
+    send_func - функция отправки (например, bot.send_message).
+    Сообщение ставится в очередь методом send, который сразу возвращает
+    объект Delivery со статусом доставки.
+    """
+
+    def __init__(self, send_func, workers=SEND_WORKERS,
+                 global_rate=GLOBAL_RATE, private_rate=PRIVATE_RATE,
+                 group_rate=GROUP_RATE, max_retries=MAX_RETRIES,
+                 clock=time.monotonic):
+        self.send_func = send_func
+        self.workers = workers
+        self.private_rate = private_rate
+        self.group_rate = group_rate
+        self.max_retries = max_retries
+        self.clock = clock
+        self.global_bucket = TokenBucket(global_rate, clock=clock)
+        self._chat_buckets = {}
+        self._chats = {}  # Чат -> очередь сообщений чата.
+        self._heap = []  # (время готовности, порядок, чат).
+        self._scheduled = set()  # Чаты в куче или в отправке.
+        self._counter = itertools.count()
+        self._condition = threading.Condition()
+        self._threads = []
+        self._stopped = False
+        self.stats = {'sent': 0, 'failed': 0, 'retried': 0}
+
+    def send(self, chat_id, text, **kwargs) -> Delivery:
+        """Ставим сообщение в очередь."""
+        delivery = Delivery(chat_id, text, kwargs)
+        with self._condition:
+            if not self._threads:
+                self._start_workers()
+            self._chats.setdefault(chat_id, deque()).append(delivery)
+            if chat_id not in self._scheduled:
+                self._schedule(chat_id, self.clock())
+        return delivery
+
+    def stop(self, wait=True, timeout=None):
+        """Останавливаем очередь (по умолчанию - после отправки всего)."""
+        with self._condition:
+            if wait:
+                deadline = None if timeout is None else (
+                    time.monotonic() + timeout)
+                while self._scheduled:
+                    remaining = None if deadline is None else (
+                        deadline - time.monotonic())
+                    if remaining is not None and remaining <= 0:
+                        break
+                    self._condition.wait(remaining)
+            self._stopped = True
+            self._condition.notify_all()
+        for thread in self._threads:
+            thread.join(timeout)
+
+    def _start_workers(self):
+        for number in range(self.workers):
+            thread = threading.Thread(
+                target=self._worker, name=f'sender-{number}', daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def _prune_buckets(self):
+        """Убираем полные баки чатов, которым сейчас нечего отправлять."""
+        for chat_id, bucket in list(self._chat_buckets.items()):
+            if chat_id in self._scheduled:
+                continue
+            if bucket.wait_time() == 0 and bucket.tokens >= bucket.capacity:
+                del self._chat_buckets[chat_id]
+
+    def _chat_bucket(self, chat_id) -> TokenBucket:
+        bucket = self._chat_buckets.get(chat_id)
+        if bucket is None:
+            if len(self._chat_buckets) >= MAX_CHAT_BUCKETS:
+                self._prune_buckets()
+            # У групп отрицательный id, у каналов может быть @username.
+            is_group = str(chat_id).startswith(('-', '@'))
+            rate = self.group_rate if is_group else self.private_rate
+            bucket = TokenBucket(rate, clock=self.clock)
+            self._chat_buckets[chat_id] = bucket
+        return bucket
+
+    def _schedule(self, chat_id, ready_at):
+        heapq.heappush(self._heap, (ready_at, next(self._counter), chat_id))
+        self._scheduled.add(chat_id)
+        self._condition.notify_all()
+
+    def _next_delivery(self):
+        """Ждем чат, которому можно отправить сообщение."""
+        while not self._stopped:
+            if not self._heap:
+                self._condition.wait()
+                continue
+            ready_at, _, chat_id = self._heap[0]
+            delay = ready_at - self.clock()
+            if delay > 0:
+                self._condition.wait(delay)
+                continue
+            heapq.heappop(self._heap)
+
+            wait = max(
+                self._chat_bucket(chat_id).wait_time(),
+                self.global_bucket.wait_time(),
+            )
+            if wait > 0:
+                heapq.heappush(
+                    self._heap,
+                    (self.clock() + wait, next(self._counter), chat_id))
+                continue
+            self._chat_bucket(chat_id).consume()
+            self.global_bucket.consume()
+            return self._chats[chat_id].popleft()
+        return None
+
+    def _worker(self):
+        while True:
+            with self._condition:
+                delivery = self._next_delivery()
+            if delivery is None:
+                return
+            self._deliver(delivery)
+
+    def _deliver(self, delivery):
+        """Отправляем сообщение и решаем, что делать дальше с чатом."""
+        delivery.attempts += 1
+        retry = False
+        flood = False  # Ответ 429: ждать должны все чаты.
+        delay = 0
+        try:
+            result = self.send_func(
+                delivery.chat_id, delivery.text, **delivery.kwargs)
+        except Exception as e:
+            pause = retry_after(e)
+            flood = pause is not None
+            if pause is None and is_network_error(e):
+                pause = RETRY_DELAY * 2 ** (delivery.attempts - 1)
+            if pause is not None and delivery.attempts <= self.max_retries:
+                retry = True
+                delay = pause
+                SEND_ATTEMPTS.inc(result='retry')
+                logging.warning(
+                    f'Повтор отправки в чат {delivery.chat_id} '
+                    f'через {pause} c: {e}')
+            else:
+                delivery._finish(FAILED, error=e)
+                SEND_ATTEMPTS.inc(result=FAILED)
+                SEND_SECONDS.observe(
+                    delivery.finished - delivery.created, status=FAILED)
+                logging.error(
+                    f'Сообщение в чат {delivery.chat_id} не отправлено: {e}')
+        else:
+            delivery._finish(SENT, result=result)
+            SEND_ATTEMPTS.inc(result=SENT)
+            SEND_SECONDS.observe(
+                delivery.finished - delivery.created, status=SENT)
+
+        with self._condition:
+            chat_id = delivery.chat_id
+            if retry:
+                # Повторяем первым, чтобы не нарушить порядок сообщений.
+                self.stats['retried'] += 1
+                self._chats[chat_id].appendleft(delivery)
+                self._chat_bucket(chat_id).pause(delay)
+                if flood:
+                    self.global_bucket.pause(delay)
+            elif delivery.status == SENT:
+                self.stats['sent'] += 1
+            else:
+                self.stats['failed'] += 1
+
+            if self._chats[chat_id]:
+                self._schedule(chat_id, self.clock() + delay)
+            else:
+                del self._chats[chat_id]
+                self._scheduled.discard(chat_id)
+                self._condition.notify_all()
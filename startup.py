@@ -0,0 +1,118 @@
+"""
+Замеры запуска бота.
+
+BootTimer собирает время этапов запуска (импорт модулей, загрузка
+скомпилированных графиков, запуск потоков) для строки в журнале.
+
+Разбор импорта по модулям (python -X importtime в отдельном процессе)
+и время загрузки графиков:
+    python startup.py [bot|async_bot]
+"""
+import os
+import subprocess
+import sys
+import time
+
+# Тяжелые зависимости, которые не должны загружаться при запуске бота.
+LAZY_MODULES = ('openpyxl', 'numpy', 'lxml', 'http.server')
+# Сколько модулей показываем в разборе импорта.
+IMPORT_TOP = 15
+
+
+def process_uptime():
+    """Сколько секунд прошло с запуска процесса (Linux) или None."""
+    try:
+        with open('/proc/self/stat', 'r') as file:
+            stat = file.read()
+        with open('/proc/uptime', 'r') as file:
+            uptime = float(file.read().split()[0])
+    except OSError:
+        return None
+    # Имя процесса в скобках может содержать пробелы - считаем поля
+    # после него. starttime (22-е поле) - в тиках с загрузки системы.
+    start_ticks = int(stat.rsplit(')', 1)[1].split()[19])
+    return max(uptime - start_ticks / os.sysconf('SC_CLK_TCK'), 0)
+
+
+class BootTimer:
+    """Этапы запуска бота и их длительность."""
+
+    def __init__(self):
+        # До создания таймера процесс импортировал модули бота.
+        self.imported = process_uptime()
+        self.stages = []  # (этап, секунды).
+        self._last = time.perf_counter()
+
+    def mark(self, stage):
+        """Отмечаем окончание этапа запуска."""
+        now = time.perf_counter()
+        self.stages.append((stage, now - self._last))
+        self._last = now
+
+    def report(self) -> str:
+        """Строка для журнала: длительность этапов и общее время."""
+        parts = []
+        total = sum(seconds for _, seconds in self.stages)
+        if self.imported is not None:
+            parts.append(f'импорт модулей {self.imported * 1000:.0f} мс')
+            total += self.imported
+        parts += [
+            f'{stage} {seconds * 1000:.0f} мс'
+            for stage, seconds in self.stages
+        ]
+        return f'Запуск: {", ".join(parts)}; всего {total * 1000:.0f} мс.'
+
+
+def import_breakdown(module='bot') -> tuple:
+    """
+    Импортируем модуль в отдельном процессе с -X importtime.
+    Возвращаем общее время импорта (в мс), список модулей, которые
+    модуль импортирует напрямую: (модуль, время с вложенными импортами
+    в мс) по убыванию времени, и полный вывод -X importtime.
+    """
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        capture_output=True, text=True,
+        cwd=os.path.dirname(os.path.abspath(__file__)))
+    if result.returncode:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+
+    total = 0
+    modules = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or '[us]' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip())) // 2
+        name = name.strip()
+        if name == module:
+            total = int(cumulative) / 1000
+        elif depth == 1:
+            modules.append((name, int(cumulative) / 1000))
+    modules.sort(key=lambda item: item[1], reverse=True)
+    return total, modules, result.stderr
+
+
+def main(argv):
+    module = argv[0] if argv else 'bot'
+    total, modules, raw = import_breakdown(module)
+    print(f'Импорт {module}: {total:.0f} мс')
+    for name, milliseconds in modules[:IMPORT_TOP]:
+        print(f'  {name:<30} {milliseconds:8.1f} мс')
+    imported = {
+        line.rsplit('|', 1)[1].strip()
+        for line in raw.splitlines() if line.startswith('import time:')
+    }
+    loaded = [name for name in LAZY_MODULES if name in imported]
+    print(f'Отложенные модули загружены при импорте: {loaded or "нет"}')
+
+    from utils import warm_start
+
+    for month, seconds in warm_start().items():
+        print(f'График на {month}: ' + (
+            f'{seconds * 1000:.1f} мс' if seconds is not None
+            else 'скомпилированного графика нет'))
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
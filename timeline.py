@@ -0,0 +1,133 @@
+"""
+Общая лента событий всех скомпилированных месяцев.
+
+Смены и дежурства хранятся в отсортированных по дате массивах:
+по каждому сотруднику и виду события и по каждому виду события
+для всего отдела. Запросы ("следующие 5 смен", "у кого завтра
+дежурство") выполняются через bisect за O(log n) и не зависят
+от границ месяцев и лет.
+
+События одного месяца занимают в каждом массиве непрерывный отрезок
+дат, поэтому при загрузке нового графика месяца заменяется только
+этот отрезок.
+"""
+import threading
+from bisect import bisect_left, bisect_right
+from datetime import date, datetime
+
+# Виды событий в ленте (отпуск в графике не привязан к дате).
+KIND_GAIN = 'смена'
+KIND_DUTY = 'дежурство'
+KINDS = (KIND_GAIN, KIND_DUTY)
+
+
+def _as_date(day) -> date:
+    """date или datetime -> date."""
+    return date(day.year, day.month, day.day)
+
+
+def _month_range(year, month) -> tuple:
+    """Первый день месяца и первый день следующего месяца."""
+    return (
+        date(year, month, 1),
+        date(year + month // 12, month % 12 + 1, 1),
+    )
+
+
+class _Series:
+    """Отсортированный по дате ряд событий: даты и данные событий."""
+
+    __slots__ = ('dates', 'items')
+
+    def __init__(self):
+        self.dates = []
+        self.items = []
+
+    def replace(self, start, end, events):
+        """Заменяем события в полуинтервале дат [start, end)."""
+        left = bisect_left(self.dates, start)
+        right = bisect_left(self.dates, end)
+        self.dates[left:right] = [day for day, _ in events]
+        self.items[left:right] = [item for _, item in events]
+
+    def after(self, start, count) -> list:
+        """Первые count событий не раньше start: (дата, данные)."""
+        left = bisect_left(self.dates, start)
+        return list(zip(
+            self.dates[left:left + count], self.items[left:left + count]))
+
+    def on(self, day) -> list:
+        """Данные событий дня day."""
+        return self.items[
+            bisect_left(self.dates, day):bisect_right(self.dates, day)]
+
+
+class Timeline:
+    """Лента событий графиков по всем загруженным месяцам."""
+
+    def __init__(self):
+        self.version = 0  # Растет при каждом изменении ленты.
+        self._months = {}  # (год, месяц) -> версия графика месяца.
+        # (ФИО, вид) -> ряд событий сотрудника (данные - время дежурства).
+        self._users = {}
+        # Вид -> ряд событий отдела (данные - (ФИО, время дежурства)).
+        self._kinds = {kind: _Series() for kind in KINDS}
+        self._lock = threading.Lock()
+
+    def has_month(self, year, month, version=None) -> bool:
+        """Месяц есть в ленте (с версией графика version, если задана)."""
+        with self._lock:
+            if (year, month) not in self._months:
+                return False
+            return version is None or self._months[(year, month)] == version
+
+    def update_month(self, year, month, schedule, version=None):
+        """
+        Заменяем события месяца событиями из графика
+        (словарь {ФИО: {'смена': ..., 'дежурство': ...}}).
+        Ряды остальных месяцев не перестраиваются.
+        """
+        start, end = _month_range(year, month)
+        user_events = {}
+        kind_events = {kind: [] for kind in KINDS}
+        for user_name, value in schedule.items():
+            for gain in value[KIND_GAIN]:
+                day = start.replace(day=int(gain[0]))
+                user_events.setdefault((user_name, KIND_GAIN), []).append(
+                    (day, ''))
+                kind_events[KIND_GAIN].append((day, (user_name, '')))
+            for duty in value[KIND_DUTY]:
+                day = start.replace(day=int(duty[0]))
+                user_events.setdefault((user_name, KIND_DUTY), []).append(
+                    (day, duty[2]))
+                kind_events[KIND_DUTY].append((day, (user_name, duty[2])))
+
+        with self._lock:
+            for key, series in self._users.items():
+                if key not in user_events:
+                    series.replace(start, end, [])
+            for key, events in user_events.items():
+                events.sort(key=lambda event: event[0])
+                self._users.setdefault(key, _Series()).replace(
+                    start, end, events)
+            for kind, events in kind_events.items():
+                # Сортировка устойчивая: порядок строк графика сохраняется.
+                events.sort(key=lambda event: event[0])
+                self._kinds[kind].replace(start, end, events)
+            self._months[(year, month)] = version
+            self.version += 1
+
+    def next_events(self, user_name, kind, count=5, after=None) -> list:
+        """Ближайшие count событий сотрудника с даты after: (дата, время)."""
+        after = _as_date(after or datetime.now())
+        with self._lock:
+            series = self._users.get((user_name, kind))
+            return series.after(after, count) if series else []
+
+    def on_day(self, day, kind) -> list:
+        """События дня у отдела: список (ФИО, время дежурства)."""
+        with self._lock:
+            return self._kinds[kind].on(_as_date(day))
+
+
+TIMELINE = Timeline()
@@ -1,154 +1,702 @@
-import json
-import logging
-import os
-from datetime import datetime
-from pathlib import Path
-
-import pandas as pd
-from dotenv import load_dotenv
-
-from constants import DUTY_DAY, DUTY_NIGHT, HOLIDAYS, WEEK_DAYS
-
-load_dotenv()
-DEPARTMENT = json.loads(os.environ['DEPARTMENT_IDS'])
-# Логирование.
-logger = logging.getLogger(__name__)
-
-
-def check_department(user_id) -> bool:
-    """
-    Проверяем ID пользователя. Возвращаем - True, eсли он разрешен.
-    """
-    if str(user_id) in DEPARTMENT.keys():
-        return True
-    return False
-
-
-def read_xlsx(month_name) -> list:
-    """Считываем данные с xlsx файла."""
-    current_year = datetime.now().year
-    # Путь к файлу с названием вида "Апрель_2025.xlsx"
-    filepath = f'schedule/{month_name}_{current_year}.xlsx'
-
-    try:
-        if not os.path.exists(filepath):
-            raise FileNotFoundError(f'Файл "{filepath}" не найден.')
-        df = pd.read_excel(filepath)
-        data = df.to_dict('records')
-        logging.info(f'График на: {month_name} успешно прочитан.')
-    except FileNotFoundError as fe:
-        logging.error(fe)
-        return []
-    except Exception as e:
-        logging.error(e)
-    return data
-
-
-def day_of_the_week(input_date) -> str:
-    """Получаем название дня недели."""
-    date = datetime.strptime(input_date, '%d.%m.%Y')
-    # Получаем номер дня недели (0—6), затем название.
-    weekday_number = date.weekday()
-    weekday = WEEK_DAYS[weekday_number]
-    return weekday
-
-
-def get_holiday(date) -> bool:
-    """Проверяем, является ли дата - праздником."""
-    current_month = str(datetime.now().month)
-    if int(date) in HOLIDAYS[current_month]:
-        return True
-    return False
-
-
-def create_schedule(month_name):
-    """
-    Создаем график.
-    - для смен берем только выходные дни.
-    """
-    file = read_xlsx(month_name)
-
-    if not file:
-        logging.error('График на текущий месяц не загружен')
-        return {}
-    else:
-        # Создаем словарь вида:
-        schedule = {row['ФИО']: {'смена': [], 'дежурство': [], 'отпуск': []}
-                    for row in file}
-
-        for line in file:
-            user_name = line.pop('ФИО')
-            for column, value in line.items():
-                # Приводим столбец к формату даты.
-                # Для дальнейшей проверки дня недели.
-                if column.isdigit():
-                    column_format = datetime(
-                        day=int(column),
-                        month=datetime.now().month,
-                        year=datetime.now().year,
-                    ).strftime('%d.%m.%Y')
-
-                    # Ищем смену:
-                    if value == '+':
-                        # Получаем день недели.
-                        gain_weekday = day_of_the_week(column_format)
-                        # Добавляем смену в общий список, если она попадает на:
-                        # субботу, воскресенье или праздник:
-                        if gain_weekday in WEEK_DAYS[5:] or (
-                            get_holiday(column)
-                        ):
-                            schedule[user_name]['смена'].append(
-                                (int(column), gain_weekday))
-
-                    # Ищем дежурства:
-                    elif value in (DUTY_NIGHT+DUTY_DAY):
-                        duty_weekday = day_of_the_week(column_format)
-                        if value in DUTY_NIGHT:
-                            duty_time = '🌑 в ночь'
-                        else:
-                            duty_time = '☀️ в день'
-                        schedule[user_name]['дежурство'].append(
-                                (int(column), duty_weekday, duty_time))
-
-                    # Ищем отпуск:
-                    elif 'отпуск' in str(value):
-                        schedule[user_name]['отпуск'].append((value))
-                else:
-                    continue
-
-        return schedule
-
-
-def get_schedule(month) -> dict:
-    """Записываем график в формате JSON в файл и получаем запрашиваемый."""
-    # Проверка наличия файла с графиком.
-    current_year = datetime.now().year
-    SCHEDULE_FILE = f'schedule/json/{month}_{current_year}.json'
-
-    try:
-        # Если файл существует
-        if Path(SCHEDULE_FILE).is_file():
-            with open(SCHEDULE_FILE, 'r', encoding='utf-8') as f:
-                content = f.read()
-
-                # Если файл пуст, создаём новый график и перезаписываем файл
-                if len(content.strip()) == 2:  # len({}) == 2
-                    schedule_json = create_schedule(month)
-                    with open(SCHEDULE_FILE, 'w', encoding='utf-8') as file:
-                        json.dump(
-                            schedule_json, file, ensure_ascii=False, indent=4)
-                else:
-                    # Иначе загружаем имеющийся график
-                    schedule_json = json.loads(content)
-        else:
-            # Если файла нет, создаём новый график и записываем его
-            schedule_json = create_schedule(month)
-            with open(SCHEDULE_FILE, 'w', encoding='utf-8') as file:
-                json.dump(schedule_json, file, ensure_ascii=False, indent=4)
-
-        return schedule_json
-
-    except Exception as e:
-        logging.error(f'Ошибка: {e}')
-
-    return {}
+import calendar
+import itertools
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from contextlib import suppress
+from datetime import datetime
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+from compact_schedule import (
+    CODE_DUTY_DAY,
+    CODE_DUTY_NIGHT,
+    CODE_GAIN,
+    CODE_VACATION,
+    CompactSchedule
+)
+from constants import DUTY_DAY, DUTY_NIGHT, MONTHS, WEEK_DAYS
+from metrics import SCHEDULE_COMPILE_SECONDS, SCHEDULE_LOAD_SECONDS
+from roster import ROSTER
+from schedule_store import ScheduleStore
+from timeline import TIMELINE, Timeline
+from work_calendar import WORK_CALENDAR
+
+load_dotenv()
+# Логирование.
+logger = logging.getLogger(__name__)
+
+# Кэш графиков. Ключ - (месяц, год), значение - словарь с графиком,
+# "подписью" файлов (mtime и размер JSON и xlsx) и временем последней
+# проверки.
+_SCHEDULE_CACHE = {}
+_CACHE_LOCK = threading.Lock()
+# Как часто (в секундах) сверяем подпись файлов, не чаще.
+CACHE_CHECK_INTERVAL = 2
+# Счетчики попаданий и промахов кэша.
+CACHE_STATS = {'hits': 0, 'misses': 0}
+# Номер версии графика: растет при каждой загрузке графика в кэш.
+_SCHEDULE_VERSIONS = itertools.count(1)
+
+# Код дежурства -> время дежурства.
+DUTY_TIMES = {
+    **{code: '🌑 в ночь' for code in DUTY_NIGHT},
+    **{code: '☀️ в день' for code in DUTY_DAY},
+}
+# Код дежурства -> код события в компактном графике.
+DUTY_CODES = {
+    **{code: CODE_DUTY_NIGHT for code in DUTY_NIGHT},
+    **{code: CODE_DUTY_DAY for code in DUTY_DAY},
+}
+
+# Формат скомпилированных графиков:
+# 'json' - schedule/json/<Месяц>_<год>.json;
+# 'compact' - schedule/bin/<Месяц>_<год>.bin (+ экспорт в JSON).
+SCHEDULE_FORMAT = os.getenv('SCHEDULE_FORMAT', 'json')
+# Компилировать xlsx при обработке запроса, если график не готов.
+# Выключается, когда работает фоновый наблюдатель (watcher.py).
+LAZY_COMPILE = True
+
+# Где выполняются запросы к графику:
+# 'files' - графики месяцев в кэше (словари);
+# 'sqlite' - таблица событий в базе SCHEDULE_DB (schedule_store.py).
+SCHEDULE_STORE = os.getenv('SCHEDULE_STORE', 'files')
+SCHEDULE_DB = os.getenv('SCHEDULE_DB', 'schedule/schedule.db')
+_STORE = None
+_STORE_LOCK = threading.Lock()
+# Когда (time.monotonic) сверяли подпись файлов месяца с базой.
+_STORE_CHECKED = {}
+# Название месяца -> номер месяца.
+MONTH_NUMBERS = {name: int(number) for number, name in MONTHS.items()}
+
+# Подписи скомпилированных файлов, события которых уже в ленте событий.
+_TIMELINE_SIGNATURES = {}
+_TIMELINE_CHECKED = 0  # Когда (time.monotonic) искали новые файлы.
+_TIMELINE_LOCK = threading.Lock()
+
+
+def check_department(user_id) -> bool:
+    """
+    Проверяем ID пользователя. Возвращаем - True, eсли он разрешен.
+    """
+    return ROSTER.is_member(user_id)
+
+
+def get_current_month() -> str:
+    """Получаем название текущего месяца."""
+    return MONTHS[str(datetime.now().month)]
+
+
+def get_next_month() -> str:
+    """Получаем название следующего месяца."""
+    current_month_num = datetime.now().month
+    if current_month_num == 12:
+        return MONTHS['1']  # Январь
+    return MONTHS[str(current_month_num + 1)]
+
+
+def get_month_year(month) -> int:
+    """
+    Год графика на месяц по названию: текущий, а в декабре для января -
+    следующий (бот работает с графиками текущего и следующего месяца).
+    """
+    now = datetime.now()
+    if now.month == 12 and MONTH_NUMBERS[month] == 1:
+        return now.year + 1
+    return now.year
+
+
+def read_xlsx(month_name, year=None):
+    """
+    Считываем данные с xlsx файла (по умолчанию - за год графика
+    на месяц, см. get_month_year).
+    Возвращаем итератор по строкам - словарям вида {столбец: значение}.
+    """
+    year = year or get_month_year(month_name)
+    # Путь к файлу с названием вида "Апрель_2025.xlsx"
+    filepath = f'schedule/{month_name}_{year}.xlsx'
+
+    if not os.path.exists(filepath):
+        logging.error(f'Файл "{filepath}" не найден.')
+        return iter(())
+    return iter_xlsx_rows(filepath)
+
+
+def iter_xlsx_rows(filepath):
+    """
+    Построчно читаем xlsx файл (в памяти - только текущая строка).
+    Первая строка - заголовок таблицы.
+    """
+    # openpyxl (вместе с numpy) импортируется долго - загружаем его,
+    # только когда xlsx действительно нужно прочитать.
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(filepath, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        # Номера дней могут быть записаны в заголовке числами.
+        header = [
+            str(column) if isinstance(column, int) else column
+            for column in header
+        ]
+        for values in rows:
+            yield dict(zip(header, values))
+        logging.info(f'Файл "{filepath}" успешно прочитан.')
+    finally:
+        workbook.close()
+
+
+def day_of_the_week(input_date) -> str:
+    """Получаем название дня недели."""
+    date = datetime.strptime(input_date, '%d.%m.%Y')
+    # Получаем номер дня недели (0—6), затем название.
+    weekday_number = date.weekday()
+    weekday = WEEK_DAYS[weekday_number]
+    return weekday
+
+
+def get_holiday(date, month=None, year=None) -> bool:
+    """
+    Проверяем, является ли день месяца (по умолчанию - текущего)
+    выходным или праздником.
+    """
+    now = datetime.now()
+    return WORK_CALENDAR.is_day_off(
+        year or now.year, month or now.month, int(date))
+
+
+def create_schedule(month_name, year=None):
+    """
+    Создаем график (по умолчанию - на год графика, см. get_month_year).
+    - для смен берем только выходные дни.
+    """
+    year = year or get_month_year(month_name)
+    rows = read_xlsx(month_name, year)
+    schedule = compile_schedule(rows, MONTH_NUMBERS[month_name], year)
+
+    if not schedule:
+        logging.error(f'График на {month_name} {year} не загружен')
+    return schedule
+
+
+def _day_columns(columns, month, year) -> list:
+    """
+    Считаем признаки столбцов-дней один раз на таблицу.
+    Список кортежей: (столбец, день, день недели, выходной/праздник).
+    """
+    # Нерабочие дни месяца - битовая маска производственного календаря.
+    days_off = WORK_CALENDAR.month_mask(year, month)
+    day_columns = []
+    for column in columns:
+        if not (isinstance(column, str) and column.isdigit()):
+            continue
+        day = int(column)
+        weekday = WEEK_DAYS[
+            datetime(day=day, month=month, year=year).weekday()]
+        day_columns.append(
+            (column, day, weekday, bool(days_off >> (day - 1) & 1)))
+    return day_columns
+
+
+def compile_schedule(rows, month, year) -> dict:
+    """
+    Создаем график из потока строк таблицы.
+    - признаки дня (день недели, выходной/праздник) считаем один раз
+      на столбец, по первой строке;
+    - коды ячеек ('+', Нн/Нд, отпуск) определяем поиском в словаре.
+    """
+    schedule = {}
+    day_columns = None
+
+    for row in rows:
+        if day_columns is None:
+            day_columns = _day_columns(row.keys(), month, year)
+        user_name = row.get('ФИО')
+        # Пропускаем пустые строки.
+        if user_name is None:
+            continue
+
+        # Создаем словарь вида:
+        user_schedule = schedule.setdefault(
+            user_name, {'смена': [], 'дежурство': [], 'отпуск': []})
+
+        for column, day, weekday, day_off in day_columns:
+            value = row.get(column)
+            # Ищем смену (только в выходные и праздники):
+            if value == '+':
+                if day_off:
+                    user_schedule['смена'].append((day, weekday))
+            # Ищем дежурства:
+            elif value in DUTY_TIMES:
+                user_schedule['дежурство'].append(
+                    (day, weekday, DUTY_TIMES[value]))
+            # Ищем отпуск:
+            elif 'отпуск' in str(value):
+                user_schedule['отпуск'].append(value)
+
+    return schedule
+
+
+def compile_compact(rows, month, year) -> CompactSchedule:
+    """
+    Создаем компактный график из потока строк таблицы:
+    по одному коду события на каждый день каждой строки.
+    """
+    n_days = calendar.monthrange(year, month)[1]
+    names = []
+    codes = bytearray()
+    vacations = []
+    day_columns = None
+
+    for row in rows:
+        if day_columns is None:
+            day_columns = _day_columns(row.keys(), month, year)
+        user_name = row.get('ФИО')
+        # Пропускаем пустые строки.
+        if user_name is None:
+            continue
+
+        row_codes = bytearray(n_days)
+        row_vacations = []
+        for column, day, _, day_off in day_columns:
+            value = row.get(column)
+            if value == '+':
+                if day_off:
+                    row_codes[day - 1] = CODE_GAIN
+            elif value in DUTY_CODES:
+                row_codes[day - 1] = DUTY_CODES[value]
+            elif 'отпуск' in str(value):
+                row_codes[day - 1] = CODE_VACATION
+                row_vacations.append(value)
+
+        names.append(user_name)
+        codes += row_codes
+        vacations.append(row_vacations)
+
+    return CompactSchedule(year, month, n_days, names, codes, vacations)
+
+
+def _file_signature(filepath):
+    """Получаем "подпись" файла: время изменения и размер (или None)."""
+    try:
+        stat = os.stat(filepath)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _compiled_path(month, year) -> str:
+    """Путь к скомпилированному графику в текущем формате."""
+    if SCHEDULE_FORMAT == 'compact':
+        return f'schedule/bin/{month}_{year}.bin'
+    return f'schedule/json/{month}_{year}.json'
+
+
+def _schedule_signature(month, year) -> tuple:
+    """Подпись пары файлов графика: скомпилированного и исходного xlsx."""
+    return (
+        _file_signature(_compiled_path(month, year)),
+        _file_signature(f'schedule/{month}_{year}.xlsx'),
+    )
+
+
+def get_schedule_cache_stats() -> dict:
+    """Получаем статистику кэша графиков."""
+    with _CACHE_LOCK:
+        hits = CACHE_STATS['hits']
+        misses = CACHE_STATS['misses']
+        size = len(_SCHEDULE_CACHE)
+    total = hits + misses
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_rate': hits / total if total else 0.0,
+        'size': size,
+    }
+
+
+def clear_schedule_cache():
+    """Очищаем кэш графиков."""
+    with _CACHE_LOCK:
+        _SCHEDULE_CACHE.clear()
+
+
+def _get_cache_entry(month) -> dict:
+    """
+    Получаем запись кэша с графиком.
+    Если файлы графика изменились (или графика нет в кэше) - загружаем заново.
+    """
+    year = get_month_year(month)
+    key = (month, year)
+
+    with _CACHE_LOCK:
+        entry = _SCHEDULE_CACHE.get(key)
+        # Файлы недавно проверялись - отдаем график без обращения к диску.
+        if entry and time.monotonic() - entry['checked'] < (
+            CACHE_CHECK_INTERVAL
+        ):
+            CACHE_STATS['hits'] += 1
+            return entry
+
+    signature = _schedule_signature(month, year)
+    with _CACHE_LOCK:
+        entry = _SCHEDULE_CACHE.get(key)
+        if entry and entry['signature'] == signature:
+            entry['checked'] = time.monotonic()
+            CACHE_STATS['hits'] += 1
+            return entry
+        CACHE_STATS['misses'] += 1
+
+    return _store_cache_entry(month, year, load_schedule(month))
+
+
+def _store_cache_entry(month, year, schedule) -> dict:
+    """Кладем график в кэш."""
+    # Файлы могли быть перезаписаны при загрузке - берем новую подпись.
+    entry = {
+        'schedule': schedule,
+        'signature': _schedule_signature(month, year),
+        'checked': time.monotonic(),
+        'version': next(_SCHEDULE_VERSIONS),
+    }
+    with _CACHE_LOCK:
+        _SCHEDULE_CACHE[(month, year)] = entry
+    _update_timeline(month, year, schedule, entry['version'])
+    return entry
+
+
+def warm_start(months=None) -> dict:
+    """
+    Загружаем в кэш уже скомпилированные графики (по умолчанию - текущего
+    и следующего месяца), не читая xlsx: бот отвечает сразу после запуска,
+    а устаревшие графики потом перекомпилирует наблюдатель.
+    Возвращаем время загрузки каждого месяца (в секундах) или None,
+    если скомпилированного графика нет.
+    """
+    timings = {}
+    for month in months or (get_current_month(), get_next_month()):
+        started = time.perf_counter()
+        year = get_month_year(month)
+        compiled_file = _compiled_path(month, year)
+        try:
+            if SCHEDULE_STORE == 'sqlite':
+                # Месяцы уже лежат в базе - достаточно открыть ее.
+                get_store()
+            elif Path(compiled_file).is_file():
+                _store_cache_entry(
+                    month, year, _read_compiled(compiled_file))
+            else:
+                timings[month] = None
+                continue
+        except Exception as e:
+            logging.error(f'Ошибка при загрузке графика на {month}: {e}')
+            timings[month] = None
+            continue
+        timings[month] = time.perf_counter() - started
+    return timings
+
+
+def get_schedule(month) -> dict:
+    """Получаем график на месяц (из кэша)."""
+    return _get_cache_entry(month)['schedule']
+
+
+def get_schedule_version(month) -> int:
+    """
+    Получаем версию графика на месяц.
+    Версия меняется, когда график загружается заново.
+    """
+    if SCHEDULE_STORE == 'sqlite':
+        return _sync_store(month)[1]
+    return _get_cache_entry(month)['version']
+
+
+def get_store() -> ScheduleStore:
+    """Получаем хранилище графиков SQLite (открываем при первом вызове)."""
+    global _STORE
+    with _STORE_LOCK:
+        if _STORE is None:
+            os.makedirs(os.path.dirname(SCHEDULE_DB) or '.', exist_ok=True)
+            _STORE = ScheduleStore(SCHEDULE_DB)
+        return _STORE
+
+
+def _sync_store(month) -> tuple:
+    """
+    Сверяем месяц (за год графика, см. get_month_year) в базе
+    с файлами графика.
+    Если файлы изменились - загружаем график и заменяем события месяца.
+    Возвращаем состояние месяца: (подпись, версия, загружен ли).
+    """
+    store = get_store()
+    year = get_month_year(month)
+    month_number = MONTH_NUMBERS[month]
+    state = store.month_state(year, month_number)
+    now = time.monotonic()
+    if state and now - _STORE_CHECKED.get((month, year), 0) < (
+        CACHE_CHECK_INTERVAL
+    ):
+        return state
+
+    _STORE_CHECKED[(month, year)] = now
+    if state and state[0] == _schedule_signature(month, year):
+        return state
+    schedule = load_schedule(month)
+    version = next(_SCHEDULE_VERSIONS)
+    store.replace_month(
+        year, month_number, schedule, _schedule_signature(month, year),
+        version)
+    _update_timeline(month, year, schedule, version)
+    return store.month_state(year, month_number)
+
+
+def _update_timeline(month, year, schedule, version):
+    """Заменяем в ленте событий месяц, график которого загружен заново."""
+    with _TIMELINE_LOCK:
+        TIMELINE.update_month(year, MONTH_NUMBERS[month], schedule, version)
+        _TIMELINE_SIGNATURES[(month, year)] = _file_signature(
+            _compiled_path(month, year))
+
+
+def get_timeline() -> Timeline:
+    """
+    Получаем ленту событий всех скомпилированных месяцев.
+    Месяцы, скомпилированные после прошлой проверки, добавляются в ленту.
+    """
+    global _TIMELINE_CHECKED
+    if time.monotonic() - _TIMELINE_CHECKED < CACHE_CHECK_INTERVAL:
+        return TIMELINE
+
+    # Проверяет и обновляет ленту один поток: остальные не читают
+    # те же файлы второй раз.
+    with _TIMELINE_LOCK:
+        now = time.monotonic()
+        if now - _TIMELINE_CHECKED < CACHE_CHECK_INTERVAL:
+            return TIMELINE
+        _TIMELINE_CHECKED = now
+
+        compiled_file = Path(_compiled_path('', 0))
+        for filepath in compiled_file.parent.glob(
+            f'*_*{compiled_file.suffix}'
+        ):
+            month, _, year = filepath.stem.rpartition('_')
+            if month not in MONTH_NUMBERS or not year.isdigit():
+                continue
+            key = (month, int(year))
+            signature = _file_signature(str(filepath))
+            if _TIMELINE_SIGNATURES.get(key) == signature:
+                continue
+            try:
+                schedule = _read_compiled(str(filepath))
+            except Exception as e:
+                logging.error(f'Ошибка при чтении графика {filepath}: {e}')
+                continue
+            TIMELINE.update_month(int(year), MONTH_NUMBERS[month], schedule)
+            _TIMELINE_SIGNATURES[key] = signature
+    return TIMELINE
+
+
+def get_user_schedule(user_name, month):
+    """
+    Получаем график сотрудника на месяц:
+    {'смена': [...], 'дежурство': [...], 'отпуск': [...]}.
+    None - график на месяц не загружен.
+    """
+    if SCHEDULE_STORE == 'sqlite':
+        if not _sync_store(month)[2]:
+            return None
+        return get_store().user_month(
+            user_name, get_month_year(month), MONTH_NUMBERS[month])
+
+    schedule = get_schedule(month)
+    if not schedule:
+        return None
+    return schedule.get(
+        user_name, {'смена': [], 'дежурство': [], 'отпуск': []})
+
+
+def get_next_event(user_name, kind, after):
+    """
+    Ближайшее событие сотрудника ('смена' или 'дежурство') не раньше
+    after: (дата, время дежурства) или None.
+    """
+    if SCHEDULE_STORE == 'sqlite':
+        _sync_store(MONTHS[str(after.month)])
+        return get_store().next_event(user_name, kind, after)
+    events = get_timeline().next_events(user_name, kind, 1, after=after)
+    return events[0] if events else None
+
+
+def get_day_events(day) -> dict:
+    """
+    Получаем события дня (date или datetime):
+    {'смена': [ФИО, ...],
+     'дежурство': [(ФИО, [день, день недели, время]), ...],
+     'ответственные': [ФИО босса, ...]}
+    """
+    month = MONTHS[str(day.month)]
+    if SCHEDULE_STORE == 'sqlite':
+        if day.year == get_month_year(month):
+            _sync_store(month)
+        events = get_store().day_events(day)
+    else:
+        if day.year == get_month_year(month):
+            # Загружаем график месяца (если он изменился - он попадет
+            # в ленту событий).
+            _get_cache_entry(month)
+        timeline = get_timeline()
+        weekday = WEEK_DAYS[day.weekday()]
+        events = {
+            'смена': [name for name, _ in timeline.on_day(day, 'смена')],
+            'дежурство': [
+                (name, [day.day, weekday, shift])
+                for name, shift in timeline.on_day(day, 'дежурство')
+            ],
+        }
+    gain_users = set(events['смена'])
+    events['ответственные'] = [
+        boss for boss in ROSTER.bosses if boss in gain_users]
+    return events
+
+
+def atomic_write(filepath, data):
+    """
+    Атомарно записываем файл: во временный файл рядом, затем переименование.
+    Читатели видят либо старый файл, либо новый - но не недописанный.
+    """
+    directory = os.path.dirname(filepath) or '.'
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as file:
+            file.write(data)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(tmp_path, filepath)
+    except BaseException:
+        with suppress(OSError):
+            os.remove(tmp_path)
+        raise
+
+
+def _write_schedule(filepath, schedule) -> dict:
+    """
+    Записываем график в JSON файл.
+    Возвращаем график в том же виде, в котором он читается из файла
+    (кортежи становятся списками), чтобы в кэше он не зависел от источника.
+    """
+    content = json.dumps(schedule, ensure_ascii=False, indent=4)
+    atomic_write(filepath, content.encode('utf-8'))
+    return json.loads(content)
+
+
+def _is_outdated(compiled_file, xlsx_file) -> bool:
+    """xlsx загружен позже, чем создан скомпилированный график."""
+    compiled_signature = _file_signature(compiled_file)
+    xlsx_signature = _file_signature(xlsx_file)
+    return bool(
+        compiled_signature and xlsx_signature
+        and xlsx_signature[0] > compiled_signature[0]
+    )
+
+
+def needs_compile(month) -> bool:
+    """Скомпилированного графика нет или он старее xlsx."""
+    year = get_month_year(month)
+    compiled_file = _compiled_path(month, year)
+    return not Path(compiled_file).is_file() or _is_outdated(
+        compiled_file, f'schedule/{month}_{year}.xlsx')
+
+
+def set_lazy_compile(enabled):
+    """
+    Включаем/выключаем компиляцию xlsx при обработке запросов.
+    Выключается, когда графики компилирует фоновый наблюдатель.
+    """
+    global LAZY_COMPILE
+    LAZY_COMPILE = enabled
+
+
+def compile_and_store(month, year=None):
+    """
+    Компилируем xlsx (по умолчанию - за год графика) и атомарно
+    записываем скомпилированный график.
+    """
+    with SCHEDULE_COMPILE_SECONDS.time():
+        return _compile_and_store(month, year or get_month_year(month))
+
+
+def _compile_and_store(month, year):
+    JSON_FILE = f'schedule/json/{month}_{year}.json'
+
+    if SCHEDULE_FORMAT == 'compact':
+        schedule = compile_compact(
+            read_xlsx(month, year), MONTH_NUMBERS[month], year)
+        if not schedule:
+            logging.error(f'График на {month} {year} не загружен')
+        atomic_write(_compiled_path(month, year), schedule.to_bytes())
+        # Экспорт в JSON.
+        _write_schedule(JSON_FILE, schedule.to_dict())
+        return schedule
+
+    return _write_schedule(JSON_FILE, create_schedule(month, year))
+
+
+def _read_compiled(filepath):
+    """Читаем скомпилированный график в текущем формате."""
+    if SCHEDULE_FORMAT == 'compact':
+        # На Windows нельзя заменить файл, пока он отображен в память.
+        return CompactSchedule.load(filepath, use_mmap=os.name != 'nt')
+    with open(filepath, 'r', encoding='utf-8') as file:
+        return json.loads(file.read())
+
+
+def load_schedule(month) -> dict:
+    """
+    Получаем скомпилированный график с диска.
+    Если файла нет, он пуст или устарел - компилируем xlsx
+    (только если компиляция при запросах разрешена).
+    """
+    year = get_month_year(month)
+    SCHEDULE_FILE = _compiled_path(month, year)
+    XLSX_FILE = f'schedule/{month}_{year}.xlsx'
+
+    try:
+        # Если файл существует (и не устарел)
+        if Path(SCHEDULE_FILE).is_file() and not (
+            LAZY_COMPILE and _is_outdated(SCHEDULE_FILE, XLSX_FILE)
+        ):
+            with SCHEDULE_LOAD_SECONDS.time():
+                schedule = _read_compiled(SCHEDULE_FILE)
+            # Пустой график пересоздаем.
+            if schedule or not LAZY_COMPILE:
+                return schedule
+        elif not LAZY_COMPILE:
+            return {}
+
+        # Если файла нет (или он устарел), создаём новый график
+        # и записываем его
+        return compile_and_store(month)
+
+    except Exception as e:
+        logging.error(f'Ошибка: {e}')
+
+    return {}
+
+
+def refresh_schedule(month):
+    """
+    Компилируем график вне обработки запросов и подменяем его в кэше.
+    Пользователи до подмены получают предыдущую версию графика.
+    """
+    schedule = compile_and_store(month)
+    _store_cache_entry(month, get_month_year(month), schedule)
+    logging.info(f'График на {month} скомпилирован и обновлен в кэше.')
+    return schedule
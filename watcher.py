@@ -0,0 +1,114 @@
+import logging
+import threading
+import time
+from pathlib import Path
+
+from constants import MONTHS
+from schedule_diff import diff_schedules
+from utils import (
+    MONTH_NUMBERS,
+    get_month_year,
+    get_schedule,
+    needs_compile,
+    refresh_schedule,
+    set_lazy_compile
+)
+
+# Логирование.
+logger = logging.getLogger(__name__)
+
+# Интервал опроса папки с графиками (в секундах).
+WATCH_INTERVAL = 5
+
+
+class ScheduleWatcher(threading.Thread):
+    """
+    Фоновый наблюдатель за папкой schedule/.
+
+    Раз в interval секунд сверяет mtime и размер xlsx файлов.
+    Новый или измененный файл компилируется вне обработки запросов
+    (при первой проверке - только если график устарел),
+    результат атомарно записывается на диск и подменяется в кэше.
+    Пока наблюдатель работает, запросы пользователей xlsx не читают.
+
+    Если задан on_change, при замене уже скомпилированного графика
+    новая версия сравнивается с предыдущей, и изменения передаются
+    в on_change(месяц, год, изменения по сотрудникам) - см. schedule_diff.
+    """
+
+    def __init__(self, directory='schedule', interval=WATCH_INTERVAL,
+                 on_change=None):
+        super().__init__(name='schedule-watcher', daemon=True)
+        self.directory = Path(directory)
+        self.interval = interval
+        self.on_change = on_change
+        self._stop_event = threading.Event()
+        self._seen = {}  # Путь к xlsx -> подпись уже обработанного файла.
+
+    def run(self):
+        set_lazy_compile(False)
+        try:
+            while not self._stop_event.is_set():
+                self.scan()
+                self._stop_event.wait(self.interval)
+        finally:
+            set_lazy_compile(True)
+
+    def stop(self):
+        """Останавливаем наблюдателя."""
+        self._stop_event.set()
+
+    def scan(self):
+        """Проверяем xlsx файлы и компилируем новые или измененные."""
+        for filepath in self.directory.glob('*.xlsx'):
+            month, _, year = filepath.stem.partition('_')
+            # Наблюдатель обновляет графики текущего года (и января
+            # следующего - в декабре), остальные - precompile.py.
+            if month not in MONTHS.values() or year != str(
+                get_month_year(month)
+            ):
+                continue
+
+            try:
+                stat = filepath.stat()
+            except OSError:
+                continue
+            signature = (stat.st_mtime_ns, stat.st_size)
+            seen = self._seen.get(filepath)
+            if seen == signature:
+                continue
+            # Файл еще могут дописывать - ждем, пока он "успокоится".
+            if time.time() - stat.st_mtime < self.interval:
+                continue
+
+            try:
+                # Файл заменен при работе бота - компилируем, даже если
+                # его mtime старше скомпилированного графика (cp -p,
+                # rsync, распаковка архива сохраняют время файла).
+                if seen is not None or needs_compile(month):
+                    self.recompile(month, int(year))
+                else:
+                    # График уже скомпилирован - только прогреваем кэш.
+                    get_schedule(month)
+            except Exception as e:
+                logging.error(f'Ошибка при компиляции "{filepath}": {e}')
+                continue
+            self._seen[filepath] = signature
+
+    def recompile(self, month, year):
+        """Компилируем график и сообщаем об изменениях в нем."""
+        # Предыдущая скомпилированная версия ({} - графика еще не было).
+        previous = get_schedule(month) if self.on_change else None
+        schedule = refresh_schedule(month)
+        if not previous or not schedule:
+            return
+        changes = diff_schedules(
+            previous, schedule, year, MONTH_NUMBERS[month])
+        logging.info(
+            f'График на {month} изменился у {len(changes)} сотрудников.')
+        if changes:
+            try:
+                self.on_change(month, year, changes)
+            except Exception as e:
+                logging.error(
+                    f'Ошибка при уведомлении об изменении графика: {e}')
@@ -0,0 +1,433 @@
+"""
+Прогноз погоды для утреннего уведомления.
+
+Прогноз берется из источника (WeatherProvider): страница gismeteo
+или сохраненная страница для проверок без сети. Места для прогноза
+настраиваются по групповым чатам (см. load_locations).
+
+Страницы загружаются через общую сессию requests (с пулом
+соединений) со строгими таймаутами. Разобранный прогноз хранится в кэше
+WEATHER_TTL секунд, а за несколько минут до отправки уведомления
+загружается заранее (prefetch). Если сайт недоступен - отдаем последний
+удачный прогноз, если он не старше WEATHER_MAX_AGE.
+"""
+import json
+import logging
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+from io import BytesIO
+
+import requests
+from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+
+from metrics import WEATHER_ERRORS, WEATHER_FETCH_SECONDS
+
+load_dotenv()
+# Логирование.
+logger = logging.getLogger(__name__)
+
+WEATHER_URL = os.getenv(
+    'WEATHER_URL', 'https://www.gismeteo.ru/weather-shkotovo-189197/')
+WEATHER_HEADERS = {'User-Agent': 'Mozilla/5.0'}
+# Таймауты запроса (в секундах): на соединение и на чтение ответа.
+WEATHER_TIMEOUT = (3.05, 10)
+# Сколько (в секундах) прогноз считается свежим.
+WEATHER_TTL = 30 * 60
+# Последний удачный прогноз старше этого (в секундах) не показываем.
+WEATHER_MAX_AGE = 6 * 60 * 60
+# Попытки загрузки заранее и пауза между ними (в секундах).
+PREFETCH_ATTEMPTS = 3
+PREFETCH_RETRY_DELAY = 60
+# Сколько мест загружаем одновременно (и размер пула соединений).
+WEATHER_WORKERS = int(os.getenv('WEATHER_WORKERS', 4))
+# Срок загрузки прогноза для одного места (в секундах).
+WEATHER_DEADLINE = 15
+# Файл с местами для прогноза по групповым чатам.
+WEATHER_LOCATIONS_FILE = os.getenv('WEATHER_LOCATIONS_FILE')
+# Ключ места по умолчанию (WEATHER_URL).
+DEFAULT_LOCATION = 'default'
+# Класс виджета температуры воздуха на странице gismeteo.
+TEMPERATURE_WIDGET = (
+    'widget-row widget-row-chart widget-row-chart-temperature-air'
+    ' row-with-caption')
+
+
+def create_session() -> requests.Session:
+    """Создаем сессию с пулом соединений (keep-alive между запросами)."""
+    session = requests.Session()
+    session.headers.update(WEATHER_HEADERS)
+    adapter = HTTPAdapter(
+        pool_connections=WEATHER_WORKERS, pool_maxsize=WEATHER_WORKERS)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+def _has_class(element, name) -> bool:
+    """У элемента есть CSS-класс name."""
+    return name in (element.get('class') or '').split()
+
+
+def parse_forecast(html):
+    """
+    Разбираем страницу прогноза.
+    Возвращаем (weather_list, temperatures_list) или None.
+
+    Страница читается потоково (lxml iterparse): берем подсказки
+    о состоянии погоды из элементов row-item и температуры из виджета
+    температуры воздуха. Разобранные элементы вне виджета сразу
+    удаляются, а после виджета разбор останавливается.
+    """
+    weather = []
+    temperatures_list = []  # Для заполнения температурами.
+    in_widget = False  # Внутри виджета температуры.
+    in_values = False  # Внутри блока значений виджета.
+    widget_done = False
+
+    # lxml нужен только при загрузке прогноза - не замедляем запуск бота.
+    from lxml import etree
+
+    events = etree.iterparse(
+        BytesIO(html.encode('utf-8')), events=('start', 'end'),
+        html=True, encoding='utf-8', recover=True)
+    for event, element in events:
+        tag = element.tag
+        if event == 'start':
+            if tag == 'div':
+                if len(weather) < 8 and _has_class(element, 'row-item'):
+                    # Получаем состояние погоды.
+                    condition = element.get('data-tooltip')
+                    if condition:
+                        weather.append(condition)
+                elif not widget_done:
+                    if element.get('class') == TEMPERATURE_WIDGET:
+                        in_widget = True
+                    elif in_widget and _has_class(element, 'values'):
+                        in_values = True
+            elif tag == 'temperature-value' and in_values:
+                # Получаем температуру.
+                temperatures_list.append(element.get('value'))
+            continue
+
+        if tag == 'div' and in_widget:
+            if in_values and _has_class(element, 'values'):
+                in_values = False
+            elif element.get('class') == TEMPERATURE_WIDGET:
+                in_widget = False
+                widget_done = True
+        if widget_done and len(weather) >= 8:
+            break
+        if not in_widget:
+            # Освобождаем память: разобранные элементы больше не нужны.
+            element.clear()
+            while element.getprevious() is not None:
+                del element.getparent()[0]
+
+    if not widget_done and not in_widget:
+        return None
+    weather_list = weather[0:8]
+    if weather_list and temperatures_list:
+        return weather_list[2:], temperatures_list[2:]
+    return None
+
+
+class WeatherProvider(ABC):
+    """
+    Источник прогноза погоды.
+    fetch возвращает (weather_list, temperatures_list) или None.
+    """
+
+    @abstractmethod
+    def fetch(self, session, timeout):
+        """Загружаем и разбираем прогноз."""
+
+
+class GismeteoProvider(WeatherProvider):
+    """Прогноз со страницы gismeteo."""
+
+    def __init__(self, url=WEATHER_URL):
+        self.url = url
+
+    def fetch(self, session, timeout):
+        response = session.get(self.url, timeout=timeout)
+        if response.status_code != 200:
+            raise requests.HTTPError(
+                f'Ошибка при получении страницы: {response.status_code}',
+                response=response)
+        return parse_forecast(response.text)
+
+
+class FixtureProvider(WeatherProvider):
+    """
+    Прогноз из сохраненной страницы (для проверок без сети).
+    delay - задержка ответа в секундах.
+    """
+
+    def __init__(self, path, delay=0):
+        self.path = path
+        self.delay = delay
+
+    def fetch(self, session, timeout):
+        if self.delay:
+            time.sleep(self.delay)
+        with open(self.path, 'r', encoding='utf-8') as file:
+            return parse_forecast(file.read())
+
+
+# Название источника в настройках -> класс источника.
+PROVIDERS = {
+    'gismeteo': GismeteoProvider,
+    'fixture': FixtureProvider,
+}
+
+
+def create_provider(config) -> WeatherProvider:
+    """Создаем источник по настройкам: {"provider": "gismeteo", ...}."""
+    params = dict(config)
+    params.pop('name', None)
+    params.pop('deadline', None)
+    provider = PROVIDERS[params.pop('provider', 'gismeteo')]
+    return provider(**params)
+
+
+class WeatherService:
+    """
+    Прогноз погоды для одного места с кэшем.
+    get() отдает свежий прогноз из кэша или загружает его; при ошибке -
+    последний удачный прогноз (не старше max_age).
+    """
+
+    def __init__(self, provider=None, session=None, ttl=WEATHER_TTL,
+                 max_age=WEATHER_MAX_AGE, timeout=WEATHER_TIMEOUT,
+                 clock=time.monotonic, name=''):
+        self.provider = provider or GismeteoProvider()
+        self.session = session or create_session()
+        self.ttl = ttl
+        self.max_age = max_age
+        self.timeout = timeout
+        self.clock = clock
+        self.name = name
+        self._forecast = None  # Последний удачный прогноз.
+        self._fetched = None  # Когда он был загружен.
+        self._lock = threading.Lock()
+
+    def refresh(self):
+        """Загружаем прогноз заново. Возвращаем его или None при ошибке."""
+        try:
+            with WEATHER_FETCH_SECONDS.time(location=self.name):
+                forecast = self.provider.fetch(self.session, self.timeout)
+        except Exception as e:
+            WEATHER_ERRORS.inc(location=self.name)
+            logging.error(
+                f'Ошибка при загрузке прогноза погоды {self.name}: {e}')
+            return None
+        if forecast is None:
+            WEATHER_ERRORS.inc(location=self.name)
+            logging.error(f'Прогноз погоды {self.name} не найден.')
+            return None
+        with self._lock:
+            self._forecast = forecast
+            self._fetched = self.clock()
+        logging.info(f'Данные о погоде {self.name} успешно извлечены.')
+        return forecast
+
+    def _cached(self, max_age):
+        """Прогноз из кэша, если он не старше max_age (или None)."""
+        with self._lock:
+            if self._fetched is None:
+                return None
+            if self.clock() - self._fetched > max_age:
+                return None
+            return self._forecast
+
+    def last_good(self):
+        """Последний удачный прогноз (не старше max_age) или None."""
+        forecast = self._cached(self.max_age)
+        if forecast is not None:
+            logging.warning(
+                f'Прогноз погоды {self.name} недоступен, берем прошлый.')
+        return forecast
+
+    def get(self):
+        """Получаем прогноз: (weather_list, temperatures_list) или None."""
+        forecast = self._cached(self.ttl)
+        if forecast is not None:
+            return forecast
+        forecast = self.refresh()
+        if forecast is not None:
+            return forecast
+        return self.last_good()
+
+    def prefetch(self, attempts=PREFETCH_ATTEMPTS,
+                 delay=PREFETCH_RETRY_DELAY):
+        """Загружаем прогноз заранее (с повторами при ошибке)."""
+        for attempt in range(attempts):
+            if attempt:
+                time.sleep(delay)
+            if self.refresh() is not None:
+                return True
+        return False
+
+
+def load_locations() -> dict:
+    """
+    Загружаем места для прогноза погоды.
+
+    Из файла WEATHER_LOCATIONS_FILE (JSON), если он задан:
+    {
+        "locations": {
+            "<ключ>": {"name": "Шкотово", "provider": "gismeteo",
+                       "url": "https://...", "deadline": 15},
+            ...
+        },
+        "chats": {"<id чата>": ["<ключ>", ...]}
+    }
+    Иначе - одно место (WEATHER_URL) для группы GROUP_CHAT_ID.
+    """
+    if WEATHER_LOCATIONS_FILE:
+        with open(WEATHER_LOCATIONS_FILE, 'r', encoding='utf-8') as file:
+            return json.load(file)
+    group_id = os.getenv('GROUP_CHAT_ID')
+    return {
+        'locations': {
+            DEFAULT_LOCATION: {
+                'name': 'Шкотово', 'provider': 'gismeteo', 'url': WEATHER_URL
+            },
+        },
+        'chats': {group_id: [DEFAULT_LOCATION]} if group_id else {},
+    }
+
+
+class WeatherLocations:
+    """
+    Прогнозы погоды для нескольких мест и списки мест по групповым чатам.
+
+    Места загружаются параллельно в ограниченном пуле потоков. У каждого
+    места свой срок (deadline): если прогноз не успел загрузиться,
+    берем последний удачный. Общее время загрузки - около времени
+    самого медленного источника, а не сумма всех.
+    """
+
+    def __init__(self, config, workers=WEATHER_WORKERS,
+                 deadline=WEATHER_DEADLINE, session=None, **service_params):
+        session = session or create_session()
+        self.services = {}  # Ключ места -> WeatherService.
+        self.deadlines = {}  # Ключ места -> срок загрузки (в секундах).
+        for key, location in config.get('locations', {}).items():
+            self.services[key] = WeatherService(
+                create_provider(location), session=session,
+                name=location.get('name', key), **service_params)
+            self.deadlines[key] = location.get('deadline', deadline)
+        self.chat_locations = {
+            str(chat_id): list(keys)
+            for chat_id, keys in config.get('chats', {}).items()
+        }
+        self.workers = workers
+        self._pool = None
+        self._pool_lock = threading.Lock()
+        self._prefetch_thread = None
+
+    @property
+    def chats(self) -> list:
+        """id чатов, для которых настроена погода."""
+        return list(self.chat_locations)
+
+    def _executor(self) -> ThreadPoolExecutor:
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(
+                    max_workers=self.workers, thread_name_prefix='weather')
+            return self._pool
+
+    def _run_all(self, method, keys=None, use_deadlines=True) -> dict:
+        """
+        Вызываем метод method каждого места параллельно.
+        Возвращаем словарь: ключ места -> результат (или None, если
+        место не уложилось в свой срок).
+        """
+        keys = list(self.services if keys is None else keys)
+        started = time.monotonic()
+        futures = {
+            key: self._executor().submit(getattr(self.services[key], method))
+            for key in keys
+        }
+        results = {}
+        # Ждем места в порядке их сроков.
+        for key in sorted(keys, key=self.deadlines.get):
+            timeout = None
+            if use_deadlines:
+                timeout = max(
+                    started + self.deadlines[key] - time.monotonic(), 0)
+            try:
+                results[key] = futures[key].result(timeout=timeout)
+            except FutureTimeout:
+                logging.error(
+                    f'Прогноз погоды {self.services[key].name} '
+                    f'не загружен за {self.deadlines[key]} c')
+                results[key] = None
+        return results
+
+    def get_all(self, keys=None) -> dict:
+        """Прогнозы для мест (по умолчанию - всех): ключ -> прогноз."""
+        results = self._run_all('get', keys)
+        for key, forecast in results.items():
+            if forecast is None:
+                results[key] = self.services[key].last_good()
+        return results
+
+    def prefetch(self, attempts=PREFETCH_ATTEMPTS,
+                 delay=PREFETCH_RETRY_DELAY) -> bool:
+        """
+        Загружаем прогнозы всех мест заранее. Места с ошибкой загружаем
+        повторно через delay секунд; пока ждем, потоки пула свободны.
+        """
+        keys = list(self.services)
+        for attempt in range(attempts):
+            if attempt:
+                time.sleep(delay)
+            results = self._run_all('refresh', keys, use_deadlines=False)
+            keys = [key for key, forecast in results.items()
+                    if forecast is None]
+            if not keys:
+                return True
+        return False
+
+    def start_prefetch(self) -> threading.Thread:
+        """
+        Запускаем prefetch в отдельном потоке: повторы загрузки
+        не задерживают задачи планировщика.
+        """
+        with self._pool_lock:
+            thread = self._prefetch_thread
+            if thread is None or not thread.is_alive():
+                thread = threading.Thread(
+                    target=self.prefetch, name='weather-prefetch',
+                    daemon=True)
+                thread.start()
+                self._prefetch_thread = thread
+            return thread
+
+    def forecasts(self, chat_id=None) -> list:
+        """
+        Прогнозы для группового чата: список (название места, прогноз).
+        Для чата без настроек - первое место из списка.
+        """
+        keys = self.chat_locations.get(str(chat_id)) or list(
+            self.services)[:1]
+        results = self.get_all(keys)
+        return [(self.services[key].name, results[key]) for key in keys]
+
+    def stop(self):
+        """Останавливаем пул потоков."""
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False)
+                self._pool = None
+
+
+WEATHER = WeatherLocations(load_locations())
@@ -0,0 +1,166 @@
+"""
+Прием обновлений Telegram через webhook.
+
+Встроенный HTTP-сервер принимает POST с обновлениями, проверяет
+секретный токен (заголовок X-Telegram-Bot-Api-Secret-Token) и передает
+обновления в пул потоков-обработчиков. Ответ Telegram отправляется сразу,
+не дожидаясь обработки. Без секрета (WEBHOOK_SECRET) сервер
+не запускается: иначе обновления мог бы прислать кто угодно.
+
+Для проверки без Telegram записанные обновления можно отправить
+на локальный сервер:
+    python webhook.py http://127.0.0.1:8443/webhook updates.json
+"""
+import hmac
+import json
+import logging
+import os
+import sys
+import threading
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from dotenv import load_dotenv
+from telebot.types import Update
+
+load_dotenv()
+# Логирование.
+logger = logging.getLogger(__name__)
+
+WEBHOOK_HOST = os.getenv('WEBHOOK_HOST', '127.0.0.1')
+WEBHOOK_PORT = int(os.getenv('WEBHOOK_PORT', 8443))
+WEBHOOK_PATH = os.getenv('WEBHOOK_PATH', '/webhook')
+# Публичный адрес (за обратным прокси), который регистрируется в Telegram.
+WEBHOOK_URL = os.getenv('WEBHOOK_URL')
+WEBHOOK_SECRET = os.getenv('WEBHOOK_SECRET', '')
+WEBHOOK_WORKERS = int(os.getenv('WEBHOOK_WORKERS', 4))
+# Максимальный размер тела запроса (в байтах).
+MAX_BODY_SIZE = 1024 * 1024
+SECRET_HEADER = 'X-Telegram-Bot-Api-Secret-Token'
+
+
+class WebhookServer:
+    """
+    HTTP-сервер для обновлений Telegram.
+    Параметр dispatch - функция, принимающая список обновлений
+    (например, bot.process_new_updates).
+    """
+
+    def __init__(self, dispatch, host=WEBHOOK_HOST, port=WEBHOOK_PORT,
+                 path=WEBHOOK_PATH, secret=WEBHOOK_SECRET,
+                 workers=WEBHOOK_WORKERS):
+        # http.server импортируется долго - только в режиме webhook.
+        from http.server import ThreadingHTTPServer
+
+        if not secret:
+            raise ValueError(
+                'Не задан WEBHOOK_SECRET: webhook без секрета не запускаем')
+        self.dispatch = dispatch
+        self.path = path
+        self.secret = secret
+        self.pool = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix='webhook')
+        self.httpd = ThreadingHTTPServer((host, port), _make_handler(self))
+        self.httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def address(self) -> tuple:
+        """Адрес, на котором слушает сервер (хост, порт)."""
+        return self.httpd.server_address[:2]
+
+    def check_secret(self, token) -> bool:
+        """Проверяем секретный токен из заголовка запроса."""
+        # Байты, а не строки: compare_digest не принимает строки
+        # с не-ASCII символами.
+        return hmac.compare_digest(
+            (token or '').encode('utf-8'), self.secret.encode('utf-8'))
+
+    def submit(self, body):
+        """Передаем обновление в пул обработчиков."""
+        self.pool.submit(self._process, body)
+
+    def _process(self, body):
+        """Разбираем обновление и передаем его боту."""
+        try:
+            update = Update.de_json(body.decode('utf-8'))
+            self.dispatch([update])
+        except Exception as e:
+            logging.error(f'Ошибка при обработке обновления: {e}')
+
+    def start(self):
+        """Запускаем сервер в фоновом потоке."""
+        self._thread = threading.Thread(
+            target=self.httpd.serve_forever, name='webhook', daemon=True)
+        self._thread.start()
+        logging.info(f'Webhook-сервер запущен на {self.address}')
+
+    def stop(self):
+        """Останавливаем сервер и дожидаемся обработки принятых обновлений."""
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        self.pool.shutdown(wait=True)
+
+
+def _make_handler(server):
+    """Создаем класс обработчика HTTP-запросов для сервера."""
+    from http.server import BaseHTTPRequestHandler
+
+    class WebhookHandler(BaseHTTPRequestHandler):
+
+        def do_POST(self):
+            if self.path != server.path:
+                self.send_error(404)
+                return
+            if not server.check_secret(self.headers.get(SECRET_HEADER)):
+                self.send_error(403)
+                return
+            try:
+                length = int(self.headers.get('Content-Length') or 0)
+            except ValueError:
+                length = 0
+            if not 0 < length <= MAX_BODY_SIZE:
+                self.send_error(400)
+                return
+            server.submit(self.rfile.read(length))
+            self.send_response(200)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+
+        def log_message(self, format, *args):
+            # Не засоряем журнал строкой на каждый запрос.
+            pass
+
+    return WebhookHandler
+
+
+def post_updates(url, updates, secret=WEBHOOK_SECRET) -> list:
+    """
+    Отправляем записанные обновления на webhook (локальный тест).
+    Возвращаем список HTTP-статусов ответов.
+    """
+    statuses = []
+    for update in updates:
+        request = urllib.request.Request(
+            url,
+            data=json.dumps(update, ensure_ascii=False).encode('utf-8'),
+            headers={
+                'Content-Type': 'application/json',
+                SECRET_HEADER: secret,
+            },
+            method='POST',
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=10) as response:
+                statuses.append(response.status)
+        except urllib.error.HTTPError as e:
+            statuses.append(e.code)
+    return statuses
+
+
+if __name__ == '__main__':
+    url, filepath = sys.argv[1], sys.argv[2]
+    with open(filepath, 'r', encoding='utf-8') as file:
+        recorded_updates = json.load(file)
+    print(post_updates(url, recorded_updates))
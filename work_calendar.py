@@ -0,0 +1,108 @@
+"""
+Производственный календарь: выходные и праздничные дни по годам.
+
+Данные - из локального файла HOLIDAYS_FILE (JSON):
+{
+    "2026": {
+        "holidays": {"<месяц>": [<день>, ...], ...},
+        "workdays": {"<месяц>": [<день>, ...], ...}
+    }
+}
+holidays - нерабочие праздничные дни и дни, на которые перенесены
+выходные; workdays - рабочие субботы и воскресенья (переносы).
+Для лет, которых нет в файле, праздники берутся из HOLIDAYS
+(constants.py), без переносов.
+
+Для каждого (год, месяц) один раз считается битовая маска нерабочих
+дней: бит day - 1 установлен, если день - выходной или праздник.
+Проверка дня - один сдвиг маски.
+"""
+import calendar
+import json
+import logging
+import os
+import threading
+
+from dotenv import load_dotenv
+
+from constants import HOLIDAYS
+
+load_dotenv()
+# Логирование.
+logger = logging.getLogger(__name__)
+
+# Файл календаря по умолчанию лежит рядом с ботом (не зависит от того,
+# из какой папки бот запущен).
+HOLIDAYS_FILE = os.getenv('HOLIDAYS_FILE', os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), 'holidays.json'))
+
+
+class WorkCalendar:
+    """Нерабочие дни по годам и месяцам (битовые маски)."""
+
+    def __init__(self, years=None):
+        # Год -> {'holidays': {...}, 'workdays': {...}}.
+        self.years = {int(year): data for year, data in (years or {}).items()}
+        self._masks = {}
+        self._lock = threading.Lock()
+        self._fallback_years = set()  # Годы, о которых уже предупредили.
+        for year in self.years:
+            for month in range(1, 13):
+                self._masks[(year, month)] = self._build_mask(year, month)
+
+    @classmethod
+    def load(cls, filepath=HOLIDAYS_FILE) -> 'WorkCalendar':
+        """Загружаем календарь из файла (нет файла - только HOLIDAYS)."""
+        try:
+            with open(filepath, 'r', encoding='utf-8') as file:
+                return cls(json.load(file))
+        except FileNotFoundError:
+            logger.warning(
+                f'Календарь "{filepath}" не найден: праздники берутся '
+                f'из HOLIDAYS, без переносов выходных.')
+            return cls()
+        except (OSError, ValueError) as e:
+            logger.error(f'Ошибка при чтении календаря "{filepath}": {e}')
+            return cls()
+
+    def _build_mask(self, year, month) -> int:
+        """Маска нерабочих дней месяца: выходные и праздники без переносов."""
+        data = self.years.get(year)
+        if data is None:
+            if year not in self._fallback_years:
+                self._fallback_years.add(year)
+                logger.warning(
+                    f'Года {year} нет в календаре: праздники берутся '
+                    f'из HOLIDAYS, без переносов выходных.')
+            holidays, workdays = HOLIDAYS[str(month)], []
+        else:
+            holidays = data.get('holidays', {}).get(str(month), [])
+            workdays = data.get('workdays', {}).get(str(month), [])
+
+        first_weekday, n_days = calendar.monthrange(year, month)
+        mask = 0
+        for day in range(1, n_days + 1):
+            # Суббота и воскресенье.
+            if (first_weekday + day - 1) % 7 >= 5:
+                mask |= 1 << (day - 1)
+        for day in holidays:
+            mask |= 1 << (int(day) - 1)
+        for day in workdays:
+            mask &= ~(1 << (int(day) - 1))
+        return mask
+
+    def month_mask(self, year, month) -> int:
+        """Битовая маска нерабочих дней месяца."""
+        mask = self._masks.get((year, month))
+        if mask is None:
+            mask = self._build_mask(year, month)
+            with self._lock:
+                self._masks[(year, month)] = mask
+        return mask
+
+    def is_day_off(self, year, month, day) -> bool:
+        """День - выходной или праздник."""
+        return bool(self.month_mask(year, month) >> (day - 1) & 1)
+
+
+WORK_CALENDAR = WorkCalendar.load()